@@ -0,0 +1,79 @@
+"""Time a zone's per-tick actor update by actor count.
+
+"objects" runs stamina regeneration, bleeding and effect timers the way
+Actor.update does, one Python object at a time; "store" is the actor
+store's batch tick over the same state. "each" calls update() on every
+entity, as Zone.update used to, and "zone" is Zone.update, which skips
+actors out of the player's wake range and runs the batch tick. Times are
+milliseconds per tick; a 60 FPS frame has 16.7.
+
+Run from the repository root:
+    python -m stalker_roguelike.benchmarks.bench_actor_store
+"""
+import random
+import time
+from types import SimpleNamespace
+from stalker_roguelike.src.components.stats import Stats
+from stalker_roguelike.src.components.combat import Combat
+from stalker_roguelike.src.entities.enemies import Enemy
+from stalker_roguelike.src.entities.player import Player
+from stalker_roguelike.src.map.zone import Zone
+
+COUNTS = (100, 1000, 5000)
+TICKS = 200
+BLEEDING = 0.3  # Share of actors bleeding and under an effect at the start
+
+
+def populate(count, rng):
+    zone = Zone(200, 200, "wilderness")
+    player = Player(100, 100)
+    game_state = SimpleNamespace(player=player, current_zone=zone,
+                                 add_message=lambda text, color: None)
+    player.game_state = game_state
+    player.stats = Stats(10 ** 9)  # Survives the whole run with enemies around
+    zone.game_state = game_state
+    zone.add_entity(player)
+    for _ in range(count):
+        enemy = Enemy(rng.randrange(zone.width), rng.randrange(zone.height),
+                      "Z", (0, 255, 0), "zombie")
+        enemy.game_state = game_state
+        enemy.stats.current_stamina = rng.randrange(enemy.stats.max_stamina)
+        if rng.random() < BLEEDING:
+            enemy.combat.bleeding_rate = rng.uniform(0.5, 3.0)
+            enemy.combat.status_effects["poisoned"] = rng.randrange(1, TICKS)
+        zone.add_entity(enemy)
+    return zone
+
+
+def tick_objects(actors):
+    # Actor.update's systems, for plain Stats and Combat
+    for stats, combat in actors:
+        if stats.current_stamina < stats.max_stamina:
+            stats.modify_stamina(1)
+        damage = combat.update_effects()
+        if damage > 0:
+            stats.modify_health(-damage)
+
+
+def timed(function, ticks=TICKS):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        function()
+    return (time.perf_counter() - start) * 1e3 / ticks
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'actors':>6} {'objects':>8} {'store':>7} {'each':>7} {'zone':>7}")
+    for count in COUNTS:
+        zone = populate(count, rng)
+        plain = [(entity.stats.detach(), entity.combat.detach()) for entity in zone.entities]
+        objects = timed(lambda: tick_objects(plain))
+        store = timed(zone.actors.tick)
+        each = timed(lambda: [entity.update() for entity in zone.entities], TICKS // 10)
+        whole = timed(zone.update, TICKS // 10)
+        print(f"{count:6d} {objects:8.3f} {store:7.3f} {each:7.2f} {whole:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
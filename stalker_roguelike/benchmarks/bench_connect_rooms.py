@@ -0,0 +1,72 @@
+"""Time underground room placement and corridor spanning trees by zone size.
+
+"carve ms" includes digging the corridors; "tree ms" is edge selection only,
+comparable with the legacy column.
+
+Run from the repository root:
+    python -m stalker_roguelike.benchmarks.bench_connect_rooms
+"""
+import time
+import numpy as np
+from stalker_roguelike.src.map.map_generator import MapGenerator
+from stalker_roguelike.src.map.tile import WALL_PROPERTIES
+from stalker_roguelike.src.map.zone import Zone
+from stalker_roguelike.src.constants import TERRAIN_WALL
+
+SIZES = (64, 128, 256, 512)
+LEGACY_MAX_ROOMS = 250  # The old scan is cubic; skip it beyond this
+
+
+def legacy_spanning_tree(rooms):
+    """The previous _connect_rooms edge selection, without carving"""
+    connections = []
+    for i, room1 in enumerate(rooms[:-1]):
+        for j, room2 in enumerate(rooms[i+1:], i+1):
+            center1 = (room1["x"] + room1["width"]//2, room1["y"] + room1["height"]//2)
+            center2 = (room2["x"] + room2["width"]//2, room2["y"] + room2["height"]//2)
+            distance = abs(center1[0] - center2[0]) + abs(center1[1] - center2[1])
+            connections.append((distance, (i, j)))
+    connections.sort(key=lambda x: x[0])
+
+    edges = []
+    connected_indices = {0}
+    while len(connected_indices) < len(rooms):
+        for distance, (i, j) in connections:
+            if (i in connected_indices) != (j in connected_indices):
+                edges.append((i, j))
+                connected_indices.add(i)
+                connected_indices.add(j)
+                break
+    return edges
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    generator = MapGenerator(1, 1)
+    generator.seed = 0
+    print(f"{'zone':>9} {'rooms':>6} {'place ms':>9} {'carve ms':>9} "
+          f"{'tree ms':>8} {'legacy tree ms':>15}")
+    for size in SIZES:
+        zone = Zone(size, size, "underground")
+        zone.store.assign(np.s_[:, :], TERRAIN_WALL, WALL_PROPERTIES)
+        rng = generator.zone_rng(0, 0, "benchmark")
+
+        rooms, place_ms = timed(generator._generate_rooms, zone, rng)
+        _, carve_ms = timed(generator._connect_rooms, zone, rooms, rng)
+        _, tree_ms = timed(generator._corridor_edges, generator._room_centers(rooms))
+        if len(rooms) <= LEGACY_MAX_ROOMS:
+            _, legacy_ms = timed(legacy_spanning_tree, rooms)
+            legacy = f"{legacy_ms:15.1f}"
+        else:
+            legacy = f"{'skipped':>15}"
+        print(f"{size:>4}x{size:<4} {len(rooms):6d} {place_ms:9.1f} {carve_ms:9.1f} "
+              f"{tree_ms:8.1f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
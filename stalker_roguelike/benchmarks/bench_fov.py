@@ -0,0 +1,42 @@
+"""Time shadowcast field of view by sight radius and zone type.
+
+"cast" is a fresh computation, "cached" a repeat lookup from the same spot
+with the zone unchanged. Times are microseconds per field of view.
+
+Run from the repository root:
+    python -m stalker_roguelike.benchmarks.bench_fov
+"""
+import random
+import time
+from stalker_roguelike.src.map.map_generator import MapGenerator
+from stalker_roguelike.src.map.zone import TIER_TERRAIN
+
+RADII = (5, 10, 15, 20)
+ZONE_TYPES = ("wilderness", "forest", "underground")
+ORIGINS = 200
+
+
+def main():
+    generator = MapGenerator(100, 100)
+    rng = random.Random(0)
+    print(f"{'zone':>11} {'radius':>6} {'cast':>8} {'cached':>7} {'visible':>8}")
+    for zone_type in ZONE_TYPES:
+        zone = generator.build_zone(0, 0, zone_type, tier=TIER_TERRAIN)
+        walkable = zone.walkable_bitboard().cells()
+        origins = rng.sample(walkable, ORIGINS)
+        for radius in RADII:
+            start = time.perf_counter()
+            visible = sum(int(zone.field_of_view(x, y, radius).sum()) for x, y in origins)
+            cast = (time.perf_counter() - start) * 1e6 / ORIGINS
+
+            x, y = origins[-1]
+            start = time.perf_counter()
+            for _ in range(ORIGINS):
+                zone.field_of_view(x, y, radius)
+            cached = (time.perf_counter() - start) * 1e6 / ORIGINS
+            print(f"{zone_type:>11} {radius:6d} {cast:8.1f} {cached:7.2f} "
+                  f"{visible // ORIGINS:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Time entity queries against a zone's spatial hash by entity count.
+
+Each column is microseconds per query; "scan" columns are the linear scans
+over zone.entities the hash replaced. Hash queries should stay flat as the
+zone fills up, apart from the growing number of results they return.
+
+Run from the repository root:
+    python -m stalker_roguelike.benchmarks.bench_spatial_hash
+"""
+import random
+import time
+from stalker_roguelike.src.entities.entity import Entity
+from stalker_roguelike.src.map.zone import Zone
+
+COUNTS = (10, 100, 1000, 5000)
+QUERIES = 2000
+FACTIONS = ("bandits", "military", "mutants", "loners")
+VIEW = 25  # Side of the rectangle rendered around each query point
+MELEE_RANGE = 1.5
+VIEW_DISTANCE = 10
+
+
+def populate(count, rng):
+    zone = Zone(64, 64, "wilderness")
+    for _ in range(count):
+        entity = Entity(rng.randrange(zone.width), rng.randrange(zone.height), "E", (255, 0, 0))
+        entity.faction = rng.choice(FACTIONS)
+        zone.add_entity(entity)
+    return zone
+
+
+def per_query(func, points):
+    start = time.perf_counter()
+    for x, y in points:
+        func(x, y)
+    return (time.perf_counter() - start) * 1e6 / len(points)
+
+
+def scan_nearest(zone, x, y):
+    best = None
+    for entity in zone.entities:
+        distance = (entity.x - x) ** 2 + (entity.y - y) ** 2
+        if (entity.faction != "loners" and distance <= VIEW_DISTANCE ** 2 and
+                (best is None or distance < best[0])):
+            best = (distance, entity)
+    return best
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'entities':>8} {'point':>7} {'scan':>8} {'melee':>7} {'nearest':>8} "
+          f"{'scan':>8} {'view':>7} {'scan':>8}")
+    for count in COUNTS:
+        zone = populate(count, rng)
+        index = zone.entity_index
+        points = [(rng.randrange(zone.width), rng.randrange(zone.height))
+                  for _ in range(QUERIES)]
+
+        def hostile(entity):
+            return entity.faction != "loners"
+
+        point = per_query(index.at, points)
+        point_scan = per_query(
+            lambda x, y: [e for e in zone.entities if e.x == x and e.y == y], points)
+        melee = per_query(lambda x, y: index.in_radius(x, y, MELEE_RANGE, where=hostile),
+                          points)
+        nearest = per_query(lambda x, y: index.nearest(x, y, max_radius=VIEW_DISTANCE,
+                                                       where=hostile), points)
+        nearest_scan = per_query(lambda x, y: scan_nearest(zone, x, y), points)
+        view = per_query(lambda x, y: index.in_rect(x, y, x + VIEW, y + VIEW), points)
+        view_scan = per_query(
+            lambda x, y: [e for e in zone.entities
+                          if x <= e.x < x + VIEW and y <= e.y < y + VIEW], points)
+        print(f"{count:8d} {point:7.2f} {point_scan:8.1f} {melee:7.2f} {nearest:8.2f} "
+              f"{nearest_scan:8.1f} {view:7.1f} {view_scan:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Time a frame of hazard checks by anomaly and entity count.
+
+Each frame a tenth of the entities take a step. "poll" is the previous
+approach: every anomaly looks up who stands on it, every frame. "events"
+re-checks only the entities that moved and visits only occupied anomalies.
+Times are microseconds per frame.
+
+Run from the repository root:
+    python -m stalker_roguelike.benchmarks.bench_triggers
+"""
+import random
+import time
+from stalker_roguelike.src.entities.entity import Entity
+from stalker_roguelike.src.map.zone import Zone, TIER_FULL
+
+ANOMALY_COUNTS = (10, 100, 1000)
+ENTITY_COUNTS = (10, 100, 1000)
+FRAMES = 200
+MOVING = 0.1  # Share of entities that step each frame
+
+
+def populate(anomalies, entities, rng):
+    zone = Zone(100, 100, "wilderness")
+    for cell in rng.sample(range(zone.width * zone.height), anomalies):
+        zone.add_anomaly(cell // zone.height, cell % zone.height, "thermal", 0.5)
+    for _ in range(entities):
+        zone.add_entity(Entity(rng.randrange(zone.width), rng.randrange(zone.height),
+                               "E", (255, 0, 0)))
+    zone.tier = TIER_FULL
+    zone.rebuild_triggers()
+    return zone
+
+
+def walk(zone, rng):
+    """Move a share of the entities one step, clamped to the zone"""
+    moved = rng.sample(zone.entities, max(1, int(len(zone.entities) * MOVING)))
+    for entity in moved:
+        entity.x = min(max(entity.x + rng.choice((-1, 1)), 0), zone.width - 1)
+        entity.y = min(max(entity.y + rng.choice((-1, 1)), 0), zone.height - 1)
+        zone.entity_index.update(entity)
+    return moved
+
+
+def poll(zone, moved):
+    hits = 0
+    for anomaly in zone.anomalies:
+        hits += len(zone.get_entities_at(anomaly["x"], anomaly["y"]))
+    return hits
+
+
+def events(zone, moved):
+    for entity in moved:
+        zone.triggers.move(entity)
+    return len(zone.triggers.stays("anomaly"))
+
+
+def per_frame(zone, check, seed):
+    rng = random.Random(seed)
+    elapsed = 0.0
+    hits = 0
+    for _ in range(FRAMES):
+        moved = walk(zone, rng)
+        start = time.perf_counter()
+        hits += check(zone, moved)
+        elapsed += time.perf_counter() - start
+    return elapsed * 1e6 / FRAMES, hits
+
+
+def main():
+    print(f"{'anomalies':>9} {'entities':>8} {'poll':>8} {'events':>8}")
+    for anomalies in ANOMALY_COUNTS:
+        for entities in ENTITY_COUNTS:
+            rng = random.Random(anomalies * 31 + entities)
+            polled, poll_hits = per_frame(populate(anomalies, entities, rng), poll, 1)
+            rng = random.Random(anomalies * 31 + entities)
+            evented, event_hits = per_frame(populate(anomalies, entities, rng), events, 1)
+            assert poll_hits == event_hits
+            print(f"{anomalies:9d} {entities:8d} {polled:8.1f} {evented:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
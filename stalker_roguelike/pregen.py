@@ -0,0 +1,57 @@
+"""Bake a region of the world into an atlas the game maps zones from.
+
+Run from the repository root, e.g.:
+    python -m stalker_roguelike.pregen --seed 1234 --region -10 -10 10 10
+"""
+import argparse
+import os
+import sys
+import time
+from stalker_roguelike.src.map.atlas import bake_atlas
+from stalker_roguelike.src.map.map_generator import MapGenerator
+from stalker_roguelike.src.map.prefabs import PrefabLibrary
+from stalker_roguelike.src.constants import WORLD_ATLAS_PATH, PREFAB_LIBRARY_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, required=True,
+                        help="world seed; the game adopts it when loading the atlas")
+    parser.add_argument("--region", type=int, nargs=4, default=(-50, -50, 50, 50),
+                        metavar=("X0", "Y0", "X1", "Y1"),
+                        help="zones X0 <= x < X1, Y0 <= y < Y1 (default: the 100x100 "
+                             "zones around the start)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="generator processes (default: one per CPU)")
+    parser.add_argument("--output", default=WORLD_ATLAS_PATH,
+                        help=f"atlas file to write (default: {WORLD_ATLAS_PATH})")
+    parser.add_argument("--prefabs", default=PREFAB_LIBRARY_PATH,
+                        help=f"prefab blueprint library to write (default: {PREFAB_LIBRARY_PATH})")
+    args = parser.parse_args()
+
+    x0, y0, x1, y1 = args.region
+    positions = [(x, y) for y in range(y0, y1) for x in range(x0, x1)]
+    if not positions:
+        parser.error("region is empty")
+
+    def progress(done: int, total: int) -> None:
+        if done == total or done % 100 == 0:
+            print(f"\r{done}/{total} zones", end="", file=sys.stderr, flush=True)
+
+    # Bake with the same blueprints the game will load
+    library = PrefabLibrary()
+    count = library.precompute()
+    library.save(args.prefabs)
+    print(f"Saved {count} prefab blueprints into {args.prefabs}", file=sys.stderr)
+
+    generator = MapGenerator(100, 100)
+    generator.prefabs = library
+    start = time.perf_counter()
+    count = bake_atlas(args.output, args.seed, positions,
+                       workers=args.workers, progress=progress, generator=generator)
+    print(f"\nBaked {count} zones into {args.output} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Generate zones and report how long each generation pass took.
+
+Run from the repository root, e.g.:
+    python -m stalker_roguelike.profile_zones --seed 1234 --zones 20
+    python -m stalker_roguelike.profile_zones --seed 1234 --disable underground:rooms
+"""
+import argparse
+import sys
+from stalker_roguelike.src.map.map_generator import MapGenerator
+from stalker_roguelike.src.map.generation_pipeline import GenerationProfiler
+
+ZONE_TYPES = ("wilderness", "forest", "underground", "swamp", "urban")
+
+
+def profile(seed: int, zone_types, zone_count: int, disabled,
+            track_allocations: bool) -> GenerationProfiler:
+    """Build zone_count zones of each type with the given passes switched off"""
+    generator = MapGenerator(100, 100)
+    generator.seed = seed
+    generator.profiler = GenerationProfiler(track_allocations)
+    for zone_type, name in disabled:
+        generator.pipeline.set_enabled(zone_type, name, False)
+
+    for zone_type in zone_types:
+        for index in range(zone_count):
+            try:
+                generator.build_zone(index, 0, zone_type)
+            except Exception as error:
+                # Report the zone and keep profiling the rest
+                print(f"{zone_type} zone ({index}, 0) failed: {error!r}", file=sys.stderr)
+    return generator.profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zones", type=int, default=10,
+                        help="zones generated per zone type (default: 10)")
+    parser.add_argument("--types", nargs="+", default=ZONE_TYPES, choices=ZONE_TYPES,
+                        help="zone types to profile (default: all)")
+    parser.add_argument("--disable", action="append", default=[], metavar="TYPE:PASS",
+                        help="switch a pass off and report against the full "
+                             "pipeline; may be repeated")
+    parser.add_argument("--allocations", action="store_true",
+                        help="also record peak memory per pass (slower)")
+    args = parser.parse_args()
+
+    disabled = []
+    for entry in args.disable:
+        zone_type, _, name = entry.partition(":")
+        if not name:
+            parser.error(f"--disable expects TYPE:PASS, got {entry}")
+        disabled.append((zone_type, name))
+
+    try:
+        baseline = profile(args.seed, args.types, args.zones, [], args.allocations)
+        print(baseline.report("Full pipeline"))
+        if disabled:
+            variant = profile(args.seed, args.types, args.zones, disabled, args.allocations)
+            print()
+            print(variant.report("Without " + ", ".join(args.disable)))
+    except KeyError as error:
+        parser.error(error.args[0])
+
+
+if __name__ == "__main__":
+    main()
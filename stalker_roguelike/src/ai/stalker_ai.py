@@ -4,6 +4,9 @@ import math
 from .behavior_tree import *
 from ..environment.weather import WeatherType
 from ..entities.actor import Actor
+from ..map.bitboard import Bitboard
+from ..map.fov import view_radius
+from ..constants import VIEW_RADIUS
 from .squad import Squad
 
 class StalkerAI:
@@ -106,16 +109,25 @@ class StalkerAI:
         # Look for buildings or covered areas nearby
         game_state = context["game_state"]
         current_zone = game_state.current_zone
-        
-        # Search in increasing radius
-        for radius in range(1, 10):
-            for x in range(self.actor.x - radius, self.actor.x + radius + 1):
-                for y in range(self.actor.y - radius, self.actor.y + radius + 1):
-                    if (0 <= x < current_zone.width and 0 <= y < current_zone.height and
-                        current_zone.tiles[x][y].tile_type in ["building", "cave"]):
-                        self.memory["shelter_position"] = (x, y)
-                        return NodeStatus.SUCCESS
-                        
+        store = current_zone.store
+        
+        # Caves are shelter throughout; elsewhere take cover against walls,
+        # trees and buildings, out of any radiation
+        walkable = current_zone.walkable_bitboard()
+        shelter = walkable - Bitboard.from_mask(store.radiation_level > 0)
+        if current_zone.zone_type != "underground":
+            shelter &= Bitboard.from_mask(store.blocks_sight).dilate(diagonal=True)
+            
+        # Search outwards, one step of walking at a time
+        reached = Bitboard.from_cells(current_zone.width, current_zone.height,
+                                      [(self.actor.x, self.actor.y)])
+        for _ in range(10):
+            position = (reached & shelter).first()
+            if position:
+                self.memory["shelter_position"] = position
+                return NodeStatus.SUCCESS
+            reached = reached.dilate(diagonal=True) & walkable
+            
         return NodeStatus.FAILURE
         
     def _can_see_enemy(self, context: Dict[str, Any]) -> bool:
@@ -124,21 +136,23 @@ class StalkerAI:
         light_level = context["light_level"]
         
         # Calculate view distance based on conditions
-        base_view_distance = 10
-        view_distance = (base_view_distance * 
-                        weather_effects.visibility * 
-                        max(0.3, light_level))
-        
-        # Check for visible enemies
-        for entity in game_state.current_zone.entities:
-            if (isinstance(entity, Actor) and 
-                entity.faction != self.actor.faction and
-                self.actor.distance_to(entity) <= view_distance):
-                self.memory["last_known_enemy_pos"] = (entity.x, entity.y)
-                return True
+        view_distance = view_radius(VIEW_RADIUS, weather_effects.visibility, light_level)
+        zone = game_state.current_zone
+        visible = zone.field_of_view(self.actor.x, self.actor.y, view_distance)
+        
+        # Check for visible enemies, nearest first
+        enemies = zone.entity_index.nearest(
+            self.actor.x, self.actor.y, max_radius=view_distance, kind=Actor,
+            where=lambda entity: visible[entity.x, entity.y] and self._is_hostile(entity))
+        if enemies:
+            self.memory["last_known_enemy_pos"] = (enemies[0].x, enemies[0].y)
+            return True
                 
         return False
         
+    def _is_hostile(self, entity) -> bool:
+        return entity.faction != self.actor.faction
+        
     def _has_good_shot(self, context: Dict[str, Any]) -> bool:
         weather_effects = context["weather_effects"]
         light_level = context["light_level"]
@@ -172,15 +186,12 @@ class StalkerAI:
         target_pos = self.memory["last_known_enemy_pos"]
         
         # Find target at position
-        for entity in game_state.current_zone.entities:
-            if (isinstance(entity, Actor) and 
-                entity.faction != self.actor.faction and
-                entity.x == target_pos[0] and 
-                entity.y == target_pos[1]):
-                # Attack the target
-                attack_result = self.actor.attack(entity)
-                return (NodeStatus.SUCCESS if attack_result["hit"] 
-                       else NodeStatus.FAILURE)
+        for entity in game_state.current_zone.entity_index.at(
+                *target_pos, kind=Actor, where=self._is_hostile):
+            # Attack the target
+            attack_result = self.actor.attack(entity)
+            return (NodeStatus.SUCCESS if attack_result["hit"] 
+                   else NodeStatus.FAILURE)
                 
         return NodeStatus.FAILURE 
 
@@ -384,6 +395,12 @@ class StalkerAI:
         points = []
         radius = random.randint(5, 10)
         
+        # Tiles that can be walked to without a long detour
+        reachable = current_zone.walkable_bitboard().flood_fill(
+            Bitboard.from_cells(current_zone.width, current_zone.height,
+                                [(self.actor.x, self.actor.y)]),
+            max_steps=2 * radius, diagonal=True)
+        
         for _ in range(4):  # Generate 4 patrol points
             angle = random.uniform(0, 2 * math.pi)
             x = self.actor.x + int(radius * math.cos(angle))
@@ -393,7 +410,7 @@ class StalkerAI:
             x = max(0, min(current_zone.width - 1, x))
             y = max(0, min(current_zone.height - 1, y))
             
-            if current_zone.is_walkable(x, y):
+            if (x, y) in reachable:
                 points.append((x, y))
             
         self.memory["patrol_points"] = points
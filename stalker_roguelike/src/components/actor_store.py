@@ -0,0 +1,358 @@
+from typing import Dict, Iterator, List, Optional
+from collections.abc import MutableMapping
+import copyreg
+import numpy as np
+from .stats import Stats
+from .combat import Combat
+
+# Ids for the store's faction and effect columns; names not listed here are
+# added on first use
+FACTIONS = ("neutral", "player", "loners", "bandits", "military",
+            "scientists", "mutants", "hostile")
+EFFECT_TYPES = ("limping", "arm_damage", "radiation_sickness", "poisoned")
+
+# Stats attribute: store array, in Stats.__init__ order
+STATS_FIELDS = {
+    "max_health": "max_health",
+    "current_health": "health",
+    "max_stamina": "max_stamina",
+    "current_stamina": "stamina"
+}
+
+BLEEDING_RECOVERY = 0.1  # Bleeding rate lost per tick (as Combat.update_effects)
+
+# Per-slot arrays, grown together
+SLOT_ARRAYS = ("x", "y", "health", "max_health", "stamina", "max_stamina",
+               "bleeding_rate", "faction", "resting", "wake_range", "used", "timers")
+
+
+def _reduce_plain(obj):
+    # Pickle a view's detached copy, which is of the view's base class
+    return copyreg._reconstructor, (type(obj), object, None), obj.__dict__
+
+
+class ActorStore:
+    """Struct-of-arrays storage for the hot state of a zone's actors.
+
+    Each bound actor owns one slot. Its `stats` and `combat` become views
+    onto that slot, so per-object code keeps working, while tick() runs
+    stamina regeneration, bleeding and effect timers for every actor in a
+    few array operations.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.health = np.zeros(capacity, dtype=np.float64)
+        self.max_health = np.zeros(capacity, dtype=np.float64)
+        self.stamina = np.zeros(capacity, dtype=np.float64)
+        self.max_stamina = np.zeros(capacity, dtype=np.float64)
+        self.bleeding_rate = np.zeros(capacity, dtype=np.float64)
+        self.faction = np.zeros(capacity, dtype=np.int16)
+        self.resting = np.zeros(capacity, dtype=bool)  # Regenerates stamina
+        self.wake_range = np.zeros(capacity, dtype=np.float32)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.timers = np.zeros((capacity, len(EFFECT_TYPES)), dtype=np.int32)
+        self.handles: List = [None] * capacity
+        self.faction_names = list(FACTIONS)
+        self.effect_names = list(EFFECT_TYPES)
+        self._faction_ids = {name: i for i, name in enumerate(FACTIONS)}
+        self._effect_ids = {name: i for i, name in enumerate(EFFECT_TYPES)}
+        self.size = 0  # Slots in use or freed; batch systems cover [:size]
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return self.size - len(self._free)
+
+    def faction_id(self, faction: str) -> int:
+        if faction not in self._faction_ids:
+            self._faction_ids[faction] = len(self.faction_names)
+            self.faction_names.append(faction)
+        return self._faction_ids[faction]
+
+    def effect_id(self, effect: str) -> int:
+        """Column of `effect` in timers, added if the effect is new"""
+        if effect not in self._effect_ids:
+            self._effect_ids[effect] = len(self.effect_names)
+            self.effect_names.append(effect)
+            column = np.zeros((len(self.timers), 1), dtype=self.timers.dtype)
+            self.timers = np.hstack([self.timers, column])
+        return self._effect_ids[effect]
+
+    def bind(self, actor: "ActorHandle") -> int:
+        """Move an actor's hot state into a slot and make it a handle onto
+        it. An actor bound to another store is released from it first."""
+        if actor.actor_store is self:
+            return actor.actor_slot
+        if actor.actor_store is not None:
+            actor.actor_store.release(actor)
+
+        slot = self._allocate()
+        stats, combat = actor.stats, actor.combat
+        self.x[slot] = actor.x
+        self.y[slot] = actor.y
+        for field, array in STATS_FIELDS.items():
+            getattr(self, array)[slot] = getattr(stats, field)
+        self.bleeding_rate[slot] = combat.bleeding_rate
+        for effect, duration in combat.status_effects.items():
+            column = self.effect_id(effect)  # May replace timers
+            self.timers[slot, column] = duration
+        self.faction[slot] = self.faction_id(actor.faction)
+        self.resting[slot] = True
+        self.wake_range[slot] = np.inf if actor.WAKE_RANGE is None else actor.WAKE_RANGE
+        self.used[slot] = True
+        self.handles[slot] = actor
+
+        actor.stats = StatsView(self, slot, stats)
+        actor.combat = CombatView(self, slot, combat)
+        actor.actor_store = self
+        actor.actor_slot = slot
+        return slot
+
+    def release(self, actor) -> None:
+        """Give an actor back plain Stats and Combat and free its slot"""
+        if getattr(actor, "actor_store", None) is not self:
+            return
+        slot = actor.actor_slot
+        actor.stats = actor.stats.detach()
+        actor.combat = actor.combat.detach()
+        actor.actor_store = None
+        actor.actor_slot = None
+
+        self.used[slot] = False
+        self.bleeding_rate[slot] = 0
+        self.timers[slot] = 0
+        self.handles[slot] = None
+        self._free.append(slot)
+
+    def reset(self, entities) -> None:
+        """Bind the actors among `entities` and release every other one"""
+        keep = {id(entity) for entity in entities}
+        for actor in self.handles:
+            if actor is not None and id(actor) not in keep:
+                self.release(actor)
+        for entity in entities:
+            if isinstance(entity, ActorHandle):
+                self.bind(entity)
+
+    def moved(self, actor) -> None:
+        """Copy an actor's position into its slot"""
+        if getattr(actor, "actor_store", None) is self:
+            self.x[actor.actor_slot] = actor.x
+            self.y[actor.actor_slot] = actor.y
+
+    def awake(self, x: int, y: int) -> List[bool]:
+        """Per slot, whether (x, y) is within the actor's wake range"""
+        n = self.size
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        wake_range = self.wake_range[:n]
+        return (self.used[:n] & (dx * dx + dy * dy < wake_range * wake_range)).tolist()
+
+    def tick(self) -> None:
+        """Run every batch system once, in Actor.update's order"""
+        if self.size:
+            self.regenerate_stamina()
+            self.apply_bleeding()
+            self.count_down_effects()
+
+    def regenerate_stamina(self) -> None:
+        """One point of stamina for every resting actor below its maximum"""
+        n = self.size
+        stamina, max_stamina = self.stamina[:n], self.max_stamina[:n]
+        regenerating = self.used[:n] & self.resting[:n] & (stamina < max_stamina)
+        np.minimum(stamina + 1, max_stamina, out=stamina, where=regenerating)
+
+    def apply_bleeding(self) -> None:
+        """Take each bleeding actor's rate off its health, then let the
+        bleeding ease"""
+        n = self.size
+        rate, health = self.bleeding_rate[:n], self.health[:n]
+        bleeding = rate > 0  # Freed slots are cleared on release
+        np.clip(health - rate, 0, self.max_health[:n], out=health, where=bleeding)
+        np.maximum(rate - BLEEDING_RECOVERY, 0, out=rate, where=bleeding)
+
+    def count_down_effects(self) -> None:
+        """Shorten every running effect by a tick; effects at 0 are over"""
+        timers = self.timers[:self.size]
+        np.subtract(timers, 1, out=timers, where=timers > 0)
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self.size == len(self.used):
+            self._grow()
+        self.size += 1
+        return self.size - 1
+
+    def _grow(self) -> None:
+        capacity = max(1, len(self.used)) * 2
+        for name in SLOT_ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.handles.extend([None] * (capacity - len(self.handles)))
+
+
+def _slot_property(array: str):
+    def getter(self):
+        return float(getattr(self._store, array)[self._slot])
+
+    def setter(self, value):
+        getattr(self._store, array)[self._slot] = value
+
+    return property(getter, setter)
+
+
+def _stat_property(array: str):
+    # Stats holds ints until damage makes them fractional; the store keeps
+    # floats, so whole values are handed back as int
+    def getter(self):
+        value = float(getattr(self._store, array)[self._slot])
+        return int(value) if value.is_integer() else value
+
+    def setter(self, value):
+        getattr(self._store, array)[self._slot] = value
+
+    return property(getter, setter)
+
+
+class StatsView(Stats):
+    """Stats whose health and stamina live in an ActorStore slot.
+
+    Limb health and the other rarely changed stats stay on the object.
+    Pickles as a plain Stats copy.
+    """
+
+    def __init__(self, store: ActorStore, slot: int, stats: Stats):
+        self.__dict__.update((name, value) for name, value in stats.__dict__.items()
+                             if name not in STATS_FIELDS)
+        self._store = store
+        self._slot = slot
+
+    def detach(self) -> Stats:
+        """A plain Stats with the slot's current values"""
+        stats = Stats.__new__(Stats)
+        stats.__dict__.update((field, getattr(self, field)) for field in STATS_FIELDS)
+        stats.__dict__.update((name, value) for name, value in self.__dict__.items()
+                              if name not in ("_store", "_slot"))
+        return stats
+
+    def __reduce__(self):
+        return _reduce_plain(self.detach())
+
+
+for _field, _array in STATS_FIELDS.items():
+    setattr(StatsView, _field, _stat_property(_array))
+
+
+class EffectTimers(MutableMapping):
+    """Dict-like `status_effects` (effect -> duration) over one row of an
+    ActorStore's timers. Effects with no time left are absent."""
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: ActorStore, slot: int):
+        self._store = store
+        self._slot = slot
+
+    def __getitem__(self, effect: str) -> int:
+        column = self._store._effect_ids.get(effect)
+        duration = 0 if column is None else int(self._store.timers[self._slot, column])
+        if duration <= 0:
+            raise KeyError(effect)
+        return duration
+
+    def __setitem__(self, effect: str, duration: int) -> None:
+        column = self._store.effect_id(effect)
+        self._store.timers[self._slot, column] = max(0, duration)
+
+    def __delitem__(self, effect: str) -> None:
+        self[effect]  # KeyError if not running
+        self._store.timers[self._slot, self._store._effect_ids[effect]] = 0
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._store.timers[self._slot]
+        names = self._store.effect_names
+        return iter([names[column] for column in np.flatnonzero(row > 0)])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._store.timers[self._slot] > 0))
+
+    def __repr__(self) -> str:
+        return f"EffectTimers({dict(self)!r})"
+
+
+class CombatView(Combat):
+    """Combat whose bleeding rate and effect timers live in an ActorStore
+    slot. Pickles as a plain Combat copy."""
+
+    def __init__(self, store: ActorStore, slot: int, combat: Combat):
+        self.__dict__.update((name, value) for name, value in combat.__dict__.items()
+                             if name not in ("bleeding_rate", "status_effects"))
+        self._store = store
+        self._slot = slot
+
+    bleeding_rate = _slot_property("bleeding_rate")
+
+    @property
+    def status_effects(self) -> EffectTimers:
+        return EffectTimers(self._store, self._slot)
+
+    @status_effects.setter
+    def status_effects(self, effects: Dict[str, int]) -> None:
+        self._store.timers[self._slot] = 0
+        self.status_effects.update(effects)
+
+    def update_effects(self) -> float:
+        """One actor's share of the store's bleeding and timer systems"""
+        damage = 0.0
+        if self.bleeding_rate > 0:
+            damage = self.bleeding_rate
+            self.bleeding_rate = max(0, damage - BLEEDING_RECOVERY)
+        timers = self._store.timers[self._slot]
+        np.subtract(timers, 1, out=timers, where=timers > 0)
+        return damage
+
+    def detach(self) -> Combat:
+        """A plain Combat with the slot's current values"""
+        combat = Combat.__new__(Combat)
+        combat.bleeding_rate = self.bleeding_rate
+        combat.__dict__.update((name, value) for name, value in self.__dict__.items()
+                               if name not in ("_store", "_slot"))
+        combat.status_effects = dict(self.status_effects)
+        return combat
+
+    def __reduce__(self):
+        return _reduce_plain(self.detach())
+
+
+class ActorHandle:
+    """Mixin for entities whose hot state can live in an ActorStore.
+
+    While bound, `stats` and `combat` are views onto the actor's slot and
+    its position (through Zone.entity_moved) and faction are copied there.
+    """
+    # Distance from the player within which the zone runs update(); None
+    # to run it every tick
+    WAKE_RANGE: Optional[float] = None
+    actor_store: Optional[ActorStore] = None
+    actor_slot: Optional[int] = None
+
+    @property
+    def faction(self) -> str:
+        return self._faction
+
+    @faction.setter
+    def faction(self, faction: str) -> None:
+        self._faction = faction
+        if self.actor_store is not None:
+            self.actor_store.faction[self.actor_slot] = self.actor_store.faction_id(faction)
+
+    def __getstate__(self) -> dict:
+        # A slot means nothing outside its store; the zone binds the actor
+        # again when it is loaded back
+        state = super().__getstate__()
+        state.pop("actor_store", None)
+        state.pop("actor_slot", None)
+        return state
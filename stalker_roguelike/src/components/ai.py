@@ -1,6 +1,7 @@
 from typing import Optional, List, Tuple
 import math
 from ..entities.actor import Actor
+from ..constants import VIEW_RADIUS
 
 class AI:
     def __init__(self, owner: Actor):
@@ -96,9 +97,11 @@ class AI:
         return threats
         
     def _can_see_actor(self, actor: Actor) -> bool:
-        # TODO: Implement proper FOV check
-        distance = self.owner.distance_to(actor)
-        return distance < 10  # Simple distance check for now
+        game_state = self.owner.game_state
+        if game_state is None or game_state.current_zone is None:
+            return self.owner.distance_to(actor) <= VIEW_RADIUS
+        return game_state.current_zone.can_see(self.owner.x, self.owner.y,
+                                               actor.x, actor.y, game_state.view_radius())
         
     def _move_towards(self, target: Tuple[int, int], game_map) -> bool:
         # TODO: Implement proper pathfinding
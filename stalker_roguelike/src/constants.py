@@ -51,5 +51,9 @@ TERRAIN_RADIATION = "radiation"
 
 # Game settings
 FPS = 60
+ZONE_STREAM_BUDGET_MS = 4  # Per-frame zone generation time when not using worker processes
+WORLD_ATLAS_PATH = "world.atlas"  # Pregenerated zones, loaded if present (see pregen.py)
+PREFAB_LIBRARY_PATH = "prefabs.npz"  # Precomputed building blueprints, loaded if present
+VIEW_RADIUS = 10  # Tiles seen in clear daylight
 PLAYER_START_HEALTH = 100
 PLAYER_START_STAMINA = 100
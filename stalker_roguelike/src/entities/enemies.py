@@ -5,10 +5,13 @@ from .entity import Entity
 from ..components.stats import Stats
 from ..components.combat import Combat
 from ..components.ai import AI
+from ..components.actor_store import ActorHandle
 from ..items.weapons import RangedWeapon, MeleeWeapon
 from ..items.armor import Armor
 
-class Enemy(Entity):
+class Enemy(ActorHandle, Entity):
+    WAKE_RANGE = 8  # Aggro range; nothing to do while the player is further away
+    
     def __init__(self, x: int, y: int, char: str, color: Tuple[int, int, int], 
                  enemy_type: str):
         super().__init__(x, y, char, color)
@@ -29,9 +32,12 @@ class Enemy(Entity):
             
         # Basic movement toward player if nearby
         player = self.game_state.player
+        zone = self.game_state.current_zone
         dist = math.sqrt((player.x - self.x)**2 + (player.y - self.y)**2)
         
-        if dist < 8:  # Aggro range
+        if dist < self.WAKE_RANGE:
+            adjacent = zone.entity_index.in_radius(self.x, self.y, 1.5, where=lambda e: e is player)
+            
             # Move toward player
             dx = 0
             dy = 0
@@ -45,12 +51,11 @@ class Enemy(Entity):
                 dy = -1
                 
             # Try to move
-            if self.game_state.current_zone.is_walkable(self.x + dx, self.y + dy):
-                self.x += dx
-                self.y += dy
+            if zone.is_walkable(self.x + dx, self.y + dy):
+                self.set_position(self.x + dx, self.y + dy)
                 
             # Attack if adjacent
-            if dist <= 1.5:
+            if adjacent:
                 damage = random.randint(5, 10)
                 player.stats.modify_health(-damage)
                 self.game_state.add_message(
@@ -9,21 +9,39 @@ class Entity:
         self.char = char
         self.color = color
         self.game_state = None  # Set by game state when added to zone
+        self.zone = None  # Zone holding the entity, set by Zone.add_entity
+        self.spawn_id: Optional[int] = None  # Set for entities placed by zone generation
         self.blocks_movement = False
         self.name = ""
         self.description = ""
 
+    def __getstate__(self) -> dict:
+        # The game state and zone are re-attached when the owning zone is
+        # loaded back
+        state = self.__dict__.copy()
+        state["game_state"] = None
+        state["zone"] = None
+        return state
+
     def move(self, dx: int, dy: int) -> bool:
         """Try to move by dx, dy. Return True if successful."""
         new_x = self.x + dx
         new_y = self.y + dy
         
         if self.game_state and self.game_state.current_zone.is_walkable(new_x, new_y):
-            self.x = new_x
-            self.y = new_y
+            self.set_position(new_x, new_y)
             return True
         return False
 
+    def set_position(self, x: int, y: int) -> None:
+        """Place the entity at (x, y), keeping its zone's entity index and
+        trigger volumes current"""
+        old_x, old_y = self.x, self.y
+        self.x = x
+        self.y = y
+        if self.zone is not None:
+            self.zone.entity_moved(self, old_x, old_y)
+
     def distance_to(self, other) -> float:
         return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
 
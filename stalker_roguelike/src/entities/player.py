@@ -7,8 +7,9 @@ from ..constants import PLAYER_START_HEALTH, PLAYER_START_STAMINA
 from ..components.stats import Stats
 from ..components.inventory import Inventory
 from ..components.combat import Combat
+from ..components.actor_store import ActorHandle
 
-class Player(Entity):
+class Player(ActorHandle, Entity):
     def __init__(self, x: int, y: int):
         super().__init__(x, y, "@", (255, 255, 255))  # White @ symbol
         self.name = "Stalker"
@@ -77,8 +78,11 @@ class Player(Entity):
             if self.move_cooldown <= 0:
                 self.is_moving = False
                 
-        # Regenerate stamina when not moving
-        if not self.is_moving and self.stats.current_stamina < self.stats.max_stamina:
+        # Regenerate stamina when not moving; in a zone the actor store's
+        # batch tick does the regenerating
+        if self.actor_store is not None:
+            self.actor_store.resting[self.actor_slot] = not self.is_moving
+        elif not self.is_moving and self.stats.current_stamina < self.stats.max_stamina:
             self.stats.modify_stamina(1)
             
         # Check for death
@@ -99,8 +103,7 @@ class Player(Entity):
             stamina_cost = self._calculate_movement_cost(dx, dy)
             if self.stats.current_stamina >= stamina_cost:
                 # Apply the move
-                self.x = new_x
-                self.y = new_y
+                self.set_position(new_x, new_y)
                 self.stats.modify_stamina(-stamina_cost)
                 self.move_cooldown = self.move_delay
                 self.is_moving = True
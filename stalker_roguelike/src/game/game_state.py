@@ -1,8 +1,17 @@
 import pygame
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from ..map.map_generator import MapGenerator
+from ..map.prefabs import PrefabLibrary
+from ..map.zone_prefetcher import ZonePrefetcher
+from ..map.zone_streamer import ZoneStreamer
+from ..map.triggers import TriggerEvent, ENTER
+from ..map.fov import view_radius
+from ..map.zone import TIER_FIELDS
+from ..map.zone_fields import ZoneFields
 from ..entities.player import Player
+from .quest import QuestManager
 from ..ui.hud import HUD
+from ..ui.minimap import Minimap
 from ..ui.inventory_screen import InventoryScreen
 from ..ui.menu import Menu
 from ..audio.sound_manager import SoundManager
@@ -14,23 +23,41 @@ from ..constants import (
     SCREEN_WIDTH, 
     SCREEN_HEIGHT, 
     TILE_SIZE,
-    BLACK
+    BLACK,
+    WORLD_ATLAS_PATH,
+    PREFAB_LIBRARY_PATH,
+    VIEW_RADIUS,
+    ZONE_STREAM_BUDGET_MS
 )
 from ..graphics.camera import Camera
+import os
 import random
+import sys
 
 class GameState:
     def __init__(self):
         self.map_generator = MapGenerator(100, 100)  # 100x100 zones
         self.map_generator.game_state = self
+        if os.path.exists(WORLD_ATLAS_PATH):
+            self.map_generator.load_atlas(WORLD_ATLAS_PATH)
+        if os.path.exists(PREFAB_LIBRARY_PATH):
+            self.map_generator.prefabs = PrefabLibrary.load(PREFAB_LIBRARY_PATH)
+        self.map_generator.prefetcher = ZonePrefetcher(self.map_generator,
+                                                       self._zone_type_at)
+        self.map_generator.streamer = ZoneStreamer(self.map_generator, self._zone_type_at)
         self.current_zone = None
+        self.current_zone_pos = (0, 0)
         self.player: Optional[Player] = None
         self.game_time = 0
         self.current_ui_state = "game"  # game, inventory, menu
         self.hud = HUD()
+        self.minimap = Minimap()
         self.inventory_screen = InventoryScreen()
         self.menu = Menu()
         self.messages: List[Dict] = []  # List of message dicts with text and color
+        self.quest_manager = QuestManager()
+        # (zone, position, radius, tile version) the player's view was last computed for
+        self._fov_key: Optional[tuple] = None
         self.sound_manager = SoundManager()
         self.weather_system = WeatherSystem(self.sound_manager)
         self.time_system = TimeSystem()
@@ -44,7 +71,9 @@ class GameState:
     def _initialize_game(self) -> None:
         """Initialize a new game"""
         # Create starting zone with wilderness type
-        self.current_zone = self.map_generator.generate_zone(0, 0, "wilderness")
+        self.current_zone = self.map_generator.generate_zone(0, 0, self._zone_type_at(0, 0))
+        self.current_zone_pos = (0, 0)
+        self.map_generator.zones.pin(self.current_zone_pos)
         
         # Find valid starting position
         start_pos = self._find_valid_spawn()
@@ -96,6 +125,8 @@ class GameState:
                 self._handle_interaction()
             elif event.key == pygame.K_SPACE:
                 self._handle_attack()
+            elif event.key == pygame.K_F3:
+                self._dump_generation_profile()
                 
     def _try_move_player(self, dx: int, dy: int) -> None:
         # Convert float movement values to integers
@@ -112,10 +143,7 @@ class GameState:
             
     def _handle_zone_transition(self, x: int, y: int) -> None:
         # Determine new zone coordinates
-        current_zone_pos = next(pos for pos, zone in self.map_generator.zones.items()
-                              if zone == self.current_zone)
-        new_zone_x = current_zone_pos[0]
-        new_zone_y = current_zone_pos[1]
+        new_zone_x, new_zone_y = self.current_zone_pos
         
         if x < 0:
             new_zone_x -= 1
@@ -135,15 +163,16 @@ class GameState:
         else:
             new_y = y
             
-        # Generate or load new zone
-        if (new_zone_x, new_zone_y) not in self.map_generator.zones:
-            new_zone = self.map_generator.generate_zone(new_zone_x, new_zone_y, "forest")
-        else:
-            new_zone = self.map_generator.zones[(new_zone_x, new_zone_y)]
+        # Generate or load new zone (waits for it if it is being prefetched)
+        new_zone = self.map_generator.generate_zone(
+            new_zone_x, new_zone_y, self._zone_type_at(new_zone_x, new_zone_y))
             
-        # Transfer player
+        # Transfer player, keeping the zone they stand in resident
         self.current_zone.remove_entity(self.player)
+        self.map_generator.zones.pin((new_zone_x, new_zone_y))
+        self.map_generator.zones.unpin(self.current_zone_pos)
         self.current_zone = new_zone
+        self.current_zone_pos = (new_zone_x, new_zone_y)
         self.player.x = new_x
         self.player.y = new_y
         self.current_zone.add_entity(self.player)
@@ -155,6 +184,10 @@ class GameState:
             self.sound_manager.play_ambient(MusicTracks.AMBIENT_FOREST.value)
         elif self.current_zone.zone_type == "underground":
             self.sound_manager.play_ambient(MusicTracks.AMBIENT_UNDERGROUND.value)
+            
+    def _zone_type_at(self, zone_x: int, zone_y: int) -> str:
+        """Zone type used when the player first walks into a zone"""
+        return self.map_generator.zone_type_at(zone_x, zone_y)
         
     def update(self) -> None:
         if self.current_ui_state == "game":
@@ -190,20 +223,60 @@ class GameState:
             # Update camera to follow player
             self.camera.update(self.player.x, self.player.y)
             
+            # Start generating the zones the player is heading toward
+            self._stream_zones()
+            
             # Update player effects
             if self.game_time % 10 == 0:  # Every 10 ticks
                 self._update_environmental_effects()
             
             self.weather_system.update(self.game_time)
             self.time_system.update()
+            self._update_fov()
             
             # Apply environmental effects more frequently in bad weather
             if (self.game_time % 5 == 0 and 
                 self.weather_system.current_weather.value in ["radiation_storm", "anomaly_surge"]):
                 self._update_environmental_effects()
                 
+    def _stream_zones(self) -> None:
+        """Build the terrain of nearby zones in worker processes, or a slice
+        per frame when no process pool is available, and complete the zone
+        the player is about to enter a slice per frame"""
+        position = (self.current_zone_pos[0], self.current_zone_pos[1],
+                    self.current_zone, self.player.x, self.player.y)
+        prefetcher = self.map_generator.prefetcher
+        if prefetcher.enabled:
+            prefetcher.update(*position)
+        self.map_generator.streamer.update(*position, build_ahead=not prefetcher.enabled)
+        self.map_generator.streamer.run(ZONE_STREAM_BUDGET_MS)
+        
+    def generation_progress(self) -> Optional[float]:
+        """Progress of zone generation for the HUD, or None when idle"""
+        progress = self.map_generator.streamer.current_progress
+        if progress is None:
+            progress = self.map_generator.prefetcher.current_progress
+        return progress
+            
+    def view_radius(self) -> float:
+        """How far anyone can see right now, given the weather and daylight"""
+        return view_radius(VIEW_RADIUS, self.weather_system.get_current_effects().visibility,
+                           self.time_system.get_light_level())
+        
+    def _update_fov(self) -> None:
+        """Recompute what the player sees, but only after they moved, the
+        light changed their sight range or the zone's tiles changed"""
+        zone = self.current_zone
+        radius = int(self.view_radius())
+        key = (self.current_zone_pos, self.player.x, self.player.y, radius,
+               zone.journal.tile_version)
+        if key != self._fov_key:
+            zone.update_visibility(self.player.x, self.player.y, radius)
+            self._fov_key = key
+            
     def _update_environmental_effects(self) -> None:
-        current_tile = self.current_zone.tiles[self.player.x][self.player.y]
+        # Hazards the player stands in, kept up to date as they move
+        hazards = self.current_zone.triggers.volumes_holding(self.player)
         weather_effects = self.weather_system.get_current_effects()
         
         # Apply radiation from weather
@@ -212,20 +285,36 @@ class GameState:
             self.player.stats.modify_health(-radiation_damage)
             self.add_message(f"Taking radiation damage from storm: {radiation_damage}", (255, 0, 0))
             
-        # Apply base radiation modified by weather
-        if current_tile.properties.radiation_level > 0:
-            radiation_damage = (current_tile.properties.radiation_level * 
-                              weather_effects.radiation * 5)
-            self.player.stats.modify_health(-radiation_damage)
-            self.add_message(f"Taking radiation damage: {radiation_damage}", (255, 0, 0))
-            
-        # Apply anomaly damage modified by weather
-        if current_tile.properties.anomaly_type:
-            anomaly_damage = (current_tile.properties.danger_level * 
-                            weather_effects.anomaly_strength * 10)
-            self.player.combat.apply_damage(anomaly_damage, 
-                                          current_tile.properties.anomaly_type,
-                                          "torso")
+        for hazard in hazards:
+            # Apply base radiation modified by weather; levels vary across a patch
+            if hazard.kind == "radiation":
+                radiation_level = float(
+                    self.current_zone.store.radiation_level[self.player.x, self.player.y])
+                radiation_damage = radiation_level * weather_effects.radiation * 5
+                self.player.stats.modify_health(-radiation_damage)
+                self.add_message(f"Taking radiation damage: {radiation_damage}", (255, 0, 0))
+                
+            # Apply anomaly damage modified by weather
+            elif hazard.kind == "anomaly":
+                anomaly_damage = (hazard.data["danger"] * 
+                                weather_effects.anomaly_strength * 10)
+                self.player.combat.apply_damage(anomaly_damage, 
+                                              hazard.data["type"],
+                                              "torso")
+                
+    def handle_triggers(self, events: List[TriggerEvent]) -> None:
+        """React to the player walking into hazards and quest locations"""
+        for event in events:
+            if event.entity is not self.player or event.kind != ENTER:
+                continue
+            volume = event.volume
+            if volume.kind == "radiation":
+                self.sound_manager.play_sound(SoundEffects.RADIATION_GEIGER.value)
+            elif volume.kind == "anomaly":
+                self.sound_manager.play_sound(f"anomaly_{volume.data['type']}")
+            elif volume.kind == "location":
+                self.quest_manager.update_objective(volume.data["quest_id"],
+                                                    volume.data["objective_id"])
         
     def render(self, surface: pygame.Surface) -> None:
         if self.current_ui_state == "game":
@@ -256,36 +345,69 @@ class GameState:
         self.visual_effects.render(surface, camera_offset)
         
         # Render HUD
-        self.hud.render(surface, self.player, self.messages[-5:])
+        self.hud.render(surface, self.player, self.messages[-5:],
+                        self.generation_progress())
+        self.minimap.render(surface, self.current_zone, self.player,
+                            self._neighbour_previews())
+        
+    def _neighbour_previews(self) -> Dict[Tuple[int, int], ZoneFields]:
+        """Noise fields of the unvisited zones the minimap reaches into, by
+        offset from the current zone. Sampling a zone's fields takes ~10 ms,
+        so at most one new zone is sampled per frame."""
+        zone_x, zone_y = self.current_zone_pos
+        previews = {}
+        sampled = False
+        for dx, dy in self.minimap.neighbours_in_view(self.current_zone, self.player):
+            pos = (zone_x + dx, zone_y + dy)
+            if pos in self.map_generator.zones:
+                continue
+            if not self.map_generator.has_tier(pos[0], pos[1], self._zone_type_at(*pos),
+                                               TIER_FIELDS):
+                if sampled:
+                    continue
+                sampled = True
+            previews[(dx, dy)] = self.map_generator.preview(*pos)
+        return previews
         
     def _render_zone(self, surface: pygame.Surface, camera_offset: tuple[int, int]) -> None:
         # Get visible area
         view_width = SCREEN_WIDTH // TILE_SIZE
         view_height = SCREEN_HEIGHT // TILE_SIZE
         
-        # Render visible tiles
-        for x in range(view_width):
-            for y in range(view_height):
-                map_x = camera_offset[0] + x
-                map_y = camera_offset[1] + y
-                if 0 <= map_x < self.current_zone.width and 0 <= map_y < self.current_zone.height:
-                    self.current_zone.tiles[map_x][map_y].render(
-                        surface, x, y, TILE_SIZE,
-                        self.time_system.get_light_level()
-                    )
+        # Clip the view to the zone and shade it straight from the tile arrays
+        start_x = max(0, camera_offset[0])
+        start_y = max(0, camera_offset[1])
+        end_x = min(self.current_zone.width, camera_offset[0] + view_width)
+        end_y = min(self.current_zone.height, camera_offset[1] + view_height)
+        if start_x < end_x and start_y < end_y:
+            colors = self.current_zone.store.colors(
+                start_x, end_x, start_y, end_y,
+                self.time_system.get_light_level()
+            ).tolist()
+            for map_x in range(start_x, end_x):
+                column = colors[map_x - start_x]
+                for map_y in range(start_y, end_y):
+                    x = map_x - camera_offset[0]
+                    y = map_y - camera_offset[1]
+                    pygame.draw.rect(surface, column[map_y - start_y],
+                                   (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
                     
         # Render entities
-        for entity in self.current_zone.entities:
-            screen_x = entity.x - camera_offset[0]
-            screen_y = entity.y - camera_offset[1]
-            if 0 <= screen_x < view_width and 0 <= screen_y < view_height:
-                entity.render(surface, camera_offset)
+        for entity in self.current_zone.entity_index.in_rect(
+                camera_offset[0], camera_offset[1],
+                camera_offset[0] + view_width, camera_offset[1] + view_height):
+            entity.render(surface, camera_offset)
                 
     def add_message(self, text: str, color: tuple[int, int, int]) -> None:
         self.messages.append({"text": text, "color": color})
         if len(self.messages) > 50:  # Keep last 50 messages
             self.messages.pop(0) 
 
+    def _dump_generation_profile(self) -> None:
+        """Debug key: print how long each zone generation pass has taken"""
+        print(self.map_generator.profiler.report(), file=sys.stderr)
+        self.add_message("Generation profile printed to console", (200, 200, 200))
+        
     def _handle_interaction(self) -> None:
         # Implementation of _handle_interaction method
         pass
@@ -345,4 +467,6 @@ class GameState:
 
     def _restart_game(self) -> None:
         """Reset the game state for a new game"""
+        self.map_generator.prefetcher.shutdown()
+        self.map_generator.zones.close()
         self.__init__()  # Reinitialize everything 
\ No newline at end of file
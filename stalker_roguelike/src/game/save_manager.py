@@ -98,5 +98,4 @@ class SaveManager:
         }
         
     def _get_current_zone_coords(self, game_state) -> Tuple[int, int]:
-        return next(coords for coords, zone in game_state.map_generator.zones.items()
-                   if zone == game_state.current_zone) 
\ No newline at end of file
+        return game_state.current_zone_pos 
\ No newline at end of file
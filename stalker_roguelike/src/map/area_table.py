@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class SummedAreaTable:
+    """Integral image of a 2D mask indexed [x, y].
+
+    Counting the set cells in any rectangle costs four lookups, however
+    large the rectangle is.
+    """
+
+    def __init__(self, mask: np.ndarray):
+        mask = np.asarray(mask, dtype=bool)
+        self.width, self.height = mask.shape
+        # Padded with a zero row and column so rectangles at the edge need no checks
+        self.table = np.zeros((self.width + 1, self.height + 1), dtype=np.int32)
+        self.table[1:, 1:] = mask.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+
+    def count(self, x0: int, y0: int, x1: int, y1: int) -> int:
+        """Set cells in [x0, x1) x [y0, y1), clipped to the mask"""
+        x0 = min(max(x0, 0), self.width)
+        x1 = min(max(x1, x0), self.width)
+        y0 = min(max(y0, 0), self.height)
+        y1 = min(max(y1, y0), self.height)
+        t = self.table
+        return int(t[x1, y1] - t[x0, y1] - t[x1, y0] + t[x0, y0])
+
+    def is_clear(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """True if [x0, x1) x [y0, y1) lies inside the mask with no cell set"""
+        if x0 < 0 or y0 < 0 or x1 > self.width or y1 > self.height:
+            return False
+        return self.count(x0, y0, x1, y1) == 0
+
+    def clear_positions(self, width: int, height: int, margin: int = 0) -> np.ndarray:
+        """Every top-left corner where a width x height footprint fits.
+
+        The footprint and a ring of `margin` tiles around it must be inside
+        the mask and free of set cells. Returns a bool array shaped like the
+        mask.
+        """
+        span_x = width + 2 * margin
+        span_y = height + 2 * margin
+        valid = np.zeros((self.width, self.height), dtype=bool)
+        if span_x > self.width or span_y > self.height:
+            return valid
+
+        t = self.table
+        counts = (t[span_x:, span_y:] - t[:-span_x or None, span_y:] -
+                  t[span_x:, :-span_y or None] + t[:-span_x or None, :-span_y or None])
+        valid[margin:margin + counts.shape[0], margin:margin + counts.shape[1]] = counts == 0
+        return valid
@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .tile_store import TileStore, TILE_LAYERS
+from .generation_pipeline import GenerationProfiler
+
+# File layout: header, zone index, then one fixed-size record per zone
+# holding every tile layer. Records start on a page boundary.
+ATLAS_MAGIC = b"STKATLS3"  # Bumped whenever TILE_LAYERS or generation changes
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("seed", "<i8"),
+    ("zone_width", "<u4"),
+    ("zone_height", "<u4"),
+    ("zone_count", "<u4"),
+    ("data_offset", "<u4")
+])
+INDEX_DTYPE = np.dtype([
+    ("x", "<i4"),
+    ("y", "<i4"),
+    ("zone_type", "S16")
+])
+PAGE_SIZE = 4096
+
+
+def zone_record_dtype(width: int, height: int) -> np.dtype:
+    """One zone's tile layers packed back to back"""
+    store = TileStore(1, 1)
+    return np.dtype([(layer, getattr(store, layer).dtype, (width, height))
+                     for layer in TILE_LAYERS])
+
+
+class WorldAtlas:
+    """Read access to a baked atlas file.
+
+    Every zone is mapped copy-on-write in its own mapping: the game can edit
+    tiles freely, the file never changes, and two stores of the same zone
+    never see each other's edits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header[0]["magic"] != ATLAS_MAGIC:
+            raise ValueError(f"{path} is not a world atlas")
+        header = header[0]
+        self.seed = int(header["seed"])
+        self.zone_width = int(header["zone_width"])
+        self.zone_height = int(header["zone_height"])
+        self.data_offset = int(header["data_offset"])
+        self.record_dtype = zone_record_dtype(self.zone_width, self.zone_height)
+
+        index = np.fromfile(path, dtype=INDEX_DTYPE, count=int(header["zone_count"]),
+                            offset=HEADER_DTYPE.itemsize)
+        self._slots: Dict[Tuple[int, int], Tuple[int, str]] = {
+            (int(entry["x"]), int(entry["y"])): (slot, entry["zone_type"].decode())
+            for slot, entry in enumerate(index)
+        }
+
+    def __contains__(self, pos) -> bool:
+        return pos in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def zone_type(self, zone_x: int, zone_y: int) -> Optional[str]:
+        slot = self._slots.get((zone_x, zone_y))
+        return slot[1] if slot else None
+
+    def store(self, zone_x: int, zone_y: int) -> TileStore:
+        """Map one zone's tiles in without reading or copying them"""
+        slot, _ = self._slots[(zone_x, zone_y)]
+        record = np.memmap(self.path, dtype=self.record_dtype, mode="c",
+                           offset=self.data_offset + slot * self.record_dtype.itemsize,
+                           shape=(1,))
+        return TileStore.from_layers({layer: record[layer][0] for layer in TILE_LAYERS})
+
+
+def write_atlas(path: str, seed: int, zone_width: int, zone_height: int,
+                zones: List[Tuple[int, int, str]]) -> np.memmap:
+    """Create an atlas file and return its writable, zeroed zone records"""
+    index_end = HEADER_DTYPE.itemsize + INDEX_DTYPE.itemsize * len(zones)
+    data_offset = -(-index_end // PAGE_SIZE) * PAGE_SIZE
+    record_dtype = zone_record_dtype(zone_width, zone_height)
+
+    # Size the file by mapping the records, then fill in header and index
+    records = np.memmap(path, dtype=record_dtype, mode="w+",
+                        offset=data_offset, shape=(max(1, len(zones)),))
+    header = np.array([(ATLAS_MAGIC, seed, zone_width, zone_height,
+                        len(zones), data_offset)], dtype=HEADER_DTYPE)
+    index = np.array([(x, y, zone_type.encode()) for x, y, zone_type in zones],
+                     dtype=INDEX_DTYPE)
+    with open(path, "r+b") as f:
+        f.write(header.tobytes())
+        f.write(index.tobytes())
+    return records
+
+
+def _bake_zone(config: bytes, zone_x: int, zone_y: int,
+               zone_type: str) -> Tuple[Dict[str, np.ndarray], GenerationProfiler]:
+    """Generate one zone in a worker process and return its tile layers
+    and pass timings"""
+    from .map_generator import MapGenerator  # Import here to avoid circular imports
+    generator = MapGenerator.from_worker_config(config)
+    store = generator.build_zone(zone_x, zone_y, zone_type).store
+    return {layer: getattr(store, layer) for layer in TILE_LAYERS}, generator.profiler
+
+
+def bake_atlas(path: str, seed: int, positions: Iterable[Tuple[int, int]],
+               world_width: int = 100, world_height: int = 100,
+               workers: Optional[int] = None, progress=None, generator=None) -> int:
+    """Generate every zone in `positions` across worker processes into one atlas.
+
+    Zones are built like `generator` builds them (its pipeline, options and
+    prefabs, with the seed set to `seed`), or by a default MapGenerator.
+    Pass timings are added to the generator's profiler.
+    """
+    from .map_generator import MapGenerator
+    if generator is None:
+        generator = MapGenerator(world_width, world_height)
+    generator.seed = seed
+    zones = [(x, y, generator.zone_type_at(x, y)) for x, y in positions]
+
+    records = write_atlas(path, seed, generator.zone_width, generator.zone_height, zones)
+    config = generator.worker_config()
+    jobs = [(config, x, y, zone_type) for x, y, zone_type in zones]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_bake_zone, *zip(*jobs), chunksize=8) if jobs else []
+        for slot, (layers, profile) in enumerate(results):
+            for layer in TILE_LAYERS:
+                records[layer][slot] = layers[layer]
+            generator.profiler.merge(profile)
+            if progress:
+                progress(slot + 1, len(zones))
+    records.flush()
+    return len(zones)
@@ -0,0 +1,149 @@
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+
+
+class Bitboard:
+    """A boolean layer of a zone packed into one Python int.
+
+    Cell (x, y) is bit x * height + y, the order of a flattened [x, y]
+    array, so moving one tile along y is a shift by 1 and along x a shift
+    by height. Set algebra on whole zones then costs a few big-int
+    operations instead of a pass over every tile.
+    """
+
+    def __init__(self, width: int, height: int, bits: int = 0):
+        self.width = width
+        self.height = height
+        self.bits = bits
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "Bitboard":
+        width, height = mask.shape
+        packed = np.packbits(np.asarray(mask, dtype=bool), axis=None, bitorder="little")
+        return cls(width, height, int.from_bytes(packed.tobytes(), "little"))
+
+    @classmethod
+    def from_cells(cls, width: int, height: int,
+                   cells: Iterable[Tuple[int, int]]) -> "Bitboard":
+        """Board with the given cells set, ignoring any off the board"""
+        bits = 0
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                bits |= 1 << int(x * height + y)  # NumPy integers would overflow
+        return cls(width, height, bits)
+
+    def to_mask(self) -> np.ndarray:
+        size = self.width * self.height
+        packed = np.frombuffer(self.bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+        cells = np.unpackbits(packed, count=size, bitorder="little")
+        return cells.view(bool).reshape(self.width, self.height)
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """(x, y) of every set cell, in bit order"""
+        return [tuple(cell) for cell in np.argwhere(self.to_mask()).tolist()]
+
+    def first(self) -> Optional[Tuple[int, int]]:
+        """The set cell with the lowest bit, or None if the board is empty"""
+        if not self.bits:
+            return None
+        return divmod((self.bits & -self.bits).bit_length() - 1, self.height)
+
+    def popcount(self) -> int:
+        return self.bits.bit_count()
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return bool(self.bits >> (x * self.height + y) & 1)
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bitboard):
+            return NotImplemented
+        return (self.width, self.height, self.bits) == (other.width, other.height, other.bits)
+
+    def __and__(self, other: "Bitboard") -> "Bitboard":
+        return Bitboard(self.width, self.height, self.bits & other.bits)
+
+    def __or__(self, other: "Bitboard") -> "Bitboard":
+        return Bitboard(self.width, self.height, self.bits | other.bits)
+
+    def __xor__(self, other: "Bitboard") -> "Bitboard":
+        return Bitboard(self.width, self.height, self.bits ^ other.bits)
+
+    def __sub__(self, other: "Bitboard") -> "Bitboard":
+        """Cells set here but not in other"""
+        return Bitboard(self.width, self.height, self.bits & ~other.bits)
+
+    def __invert__(self) -> "Bitboard":
+        return Bitboard(self.width, self.height, self.bits ^ _full(self.width, self.height))
+
+    def shift(self, dx: int, dy: int) -> "Bitboard":
+        """Move every cell by (dx, dy); cells pushed off the board are lost"""
+        bits = self.bits & _shift_sources(self.width, self.height, dx, dy)
+        offset = dx * self.height + dy
+        bits = bits << offset if offset >= 0 else bits >> -offset
+        return Bitboard(self.width, self.height, bits)
+
+    def dilate(self, diagonal: bool = False) -> "Bitboard":
+        """Cells set here or next to a set cell (8 neighbours if diagonal)"""
+        if diagonal:
+            rows = self | self.shift(1, 0) | self.shift(-1, 0)
+            return rows | rows.shift(0, 1) | rows.shift(0, -1)
+        return (self | self.shift(1, 0) | self.shift(-1, 0)
+                | self.shift(0, 1) | self.shift(0, -1))
+
+    def erode(self, diagonal: bool = False) -> "Bitboard":
+        """Set cells whose neighbours are all set; cells beyond the edge
+        count as set"""
+        return self - (~self).dilate(diagonal)
+
+    def flood_fill(self, seeds: "Bitboard", max_steps: Optional[int] = None,
+                   diagonal: bool = False) -> "Bitboard":
+        """Cells of this board reachable from the seeds through set cells,
+        in at most max_steps steps if given"""
+        reached = seeds & self
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            grown = reached.dilate(diagonal) & self
+            if grown.bits == reached.bits:
+                break
+            reached = grown
+            steps += 1
+        return reached
+
+    def largest_region(self, diagonal: bool = False) -> "Bitboard":
+        """The biggest connected region of set cells (empty if none).
+
+        Regions are flooded one at a time and the search stops as soon as
+        the cells left over could not form a bigger one, which is usually
+        right after the main region.
+        """
+        largest = Bitboard(self.width, self.height)
+        largest_size = 0
+        rest = self
+        while rest.popcount() > largest_size:
+            seed = rest.bits & -rest.bits
+            region = rest.flood_fill(Bitboard(self.width, self.height, seed), diagonal=diagonal)
+            if region.popcount() > largest_size:
+                largest, largest_size = region, region.popcount()
+            rest = rest - region
+        return largest
+
+
+@lru_cache(maxsize=None)
+def _full(width: int, height: int) -> int:
+    return (1 << (width * height)) - 1
+
+
+@lru_cache(maxsize=None)
+def _shift_sources(width: int, height: int, dx: int, dy: int) -> int:
+    """Bits of the cells that stay on the board when moved by (dx, dy)"""
+    xs = np.arange(width)[:, None] + dx
+    ys = np.arange(height)[None, :] + dy
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return Bitboard.from_mask(inside).bits
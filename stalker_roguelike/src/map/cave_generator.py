@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+# Drunkard's walk tunnels: one walk per this many tiles
+TILES_PER_WALK = 50
+WALK_LENGTH = 50
+
+# Cellular automata caves
+CAVE_FILL_RATIO = 0.45  # Share of rock before smoothing
+CAVE_ITERATIONS = 4
+CAVE_BIRTH = 5          # Floor turns to rock with at least this many rock neighbours
+CAVE_SURVIVAL = 4       # Rock stays rock with at least this many
+
+
+def neighbour_counts(mask: np.ndarray, outside: bool = False) -> np.ndarray:
+    """Set cells among each cell's eight neighbours, as a 3x3 convolution
+    done with shifted slices. Cells beyond the edge count as `outside`."""
+    padded = np.pad(mask, 1, constant_values=outside).astype(np.uint8)
+    width, height = mask.shape
+    counts = np.zeros((width, height), dtype=np.uint8)
+    for dx in range(3):
+        for dy in range(3):
+            if dx != 1 or dy != 1:
+                counts += padded[dx:dx + width, dy:dy + height]
+    return counts
+
+
+def drunkard_walks(width: int, height: int, rng: np.random.Generator,
+                   num_walks: Optional[int] = None, walk_length: int = WALK_LENGTH) -> np.ndarray:
+    """Floor mask carved by random walks, all drawn up front.
+
+    Each walk starts anywhere and then takes walk_length - 1 steps of -1, 0
+    or 1 on both axes. Positions are the running sum of the steps, clipped
+    inside a one tile border of rock.
+    """
+    if num_walks is None:
+        num_walks = width * height // TILES_PER_WALK
+    floor = np.zeros((width, height), dtype=bool)
+    if num_walks <= 0 or walk_length <= 0:
+        return floor
+
+    starts = rng.integers(0, (width, height), size=(num_walks, 2))
+    steps = rng.integers(-1, 2, size=(num_walks, walk_length - 1, 2))
+    path = starts[:, None, :] + np.cumsum(steps, axis=1)
+    np.clip(path[..., 0], 1, max(1, width - 2), out=path[..., 0])
+    np.clip(path[..., 1], 1, max(1, height - 2), out=path[..., 1])
+
+    floor[starts[:, 0], starts[:, 1]] = True
+    floor[path[..., 0].ravel(), path[..., 1].ravel()] = True
+    return floor
+
+
+def cellular_caves(width: int, height: int, rng: np.random.Generator,
+                   fill_ratio: float = CAVE_FILL_RATIO,
+                   iterations: int = CAVE_ITERATIONS) -> np.ndarray:
+    """Floor mask of organic caves: random rock smoothed by a 4-5 rule"""
+    rock = rng.random((width, height)) < fill_ratio
+    for _ in range(iterations):
+        counts = neighbour_counts(rock, outside=True)
+        rock = (counts >= CAVE_BIRTH) | (rock & (counts >= CAVE_SURVIVAL))
+
+    floor = ~rock
+    # Keep a solid border so caves never open onto the zone edge
+    floor[[0, -1], :] = False
+    floor[:, [0, -1]] = False
+    return floor
+
+
+def carve_rooms(floor: np.ndarray, rooms: List[Dict]) -> None:
+    """Rasterize rooms ({"x", "y", "width", "height"}) onto a floor mask"""
+    for room in rooms:
+        floor[room["x"]:room["x"] + room["width"], room["y"]:room["y"] + room["height"]] = True
+
+
+def carve_l_corridor(floor: np.ndarray, x1: int, y1: int, x2: int, y2: int,
+                     horizontal_first: bool) -> None:
+    """Rasterize an L-shaped corridor, bend included, onto a floor mask"""
+    bend_x, bend_y = (x2, y1) if horizontal_first else (x1, y2)
+    floor[min(x1, x2):max(x1, x2) + 1, bend_y] = True
+    floor[bend_x, min(y1, y2):max(y1, y2) + 1] = True
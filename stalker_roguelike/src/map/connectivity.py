@@ -0,0 +1,79 @@
+from typing import List, Tuple
+import numpy as np
+
+
+class DisjointSet:
+    """Union-find over the integers 0..size-1 with union by size"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]  # Path halving
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets holding a and b; False if they were already joined"""
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+    def roots(self) -> List[int]:
+        return [self.find(item) for item in range(len(self.parent))]
+
+
+def label_components(mask: np.ndarray,
+                     diagonal: bool = False) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Label the connected regions of a 2D boolean mask.
+
+    Cells are grouped into runs along the second axis first, so union-find
+    only ever sees one node per run rather than one per tile.
+
+    Returns (labels, sizes, largest): labels is an int32 array shaped like
+    mask with 0 outside it and 1..n for each region, sizes[i] is the cell
+    count of region i (sizes[0] is 0) and largest is the label of the biggest
+    region, or 0 if the mask is empty.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return np.zeros(mask.shape, dtype=np.int32), np.zeros(1, dtype=np.int64), 0
+
+    # Number the runs: a run starts wherever a cell is set and the previous
+    # cell in the same line is not
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    runs = np.cumsum(starts.ravel()).reshape(mask.shape) * mask  # 1-based run ids
+    num_runs = int(runs.max())
+
+    # Runs in neighbouring lines that touch belong to the same region
+    touch = mask[:-1] & mask[1:]
+    pairs = [np.stack((runs[:-1][touch], runs[1:][touch]), axis=1)]
+    if diagonal:
+        down = mask[:-1, :-1] & mask[1:, 1:]
+        up = mask[:-1, 1:] & mask[1:, :-1]
+        pairs.append(np.stack((runs[:-1, :-1][down], runs[1:, 1:][down]), axis=1))
+        pairs.append(np.stack((runs[:-1, 1:][up], runs[1:, :-1][up]), axis=1))
+    pairs = np.concatenate(pairs).astype(np.int64)
+    # Touching runs share many cells; dedupe pairs as single integer keys
+    keys = np.unique(pairs[:, 0] * (num_runs + 1) + pairs[:, 1])
+
+    regions = DisjointSet(num_runs + 1)
+    for a, b in zip(*divmod(keys, num_runs + 1)):
+        regions.union(int(a), int(b))
+
+    # Renumber roots to consecutive labels, keeping 0 for cells outside the mask
+    _, run_labels = np.unique(regions.roots(), return_inverse=True)
+    labels = run_labels.astype(np.int32)[runs]
+    sizes = np.bincount(labels.ravel())
+    sizes[0] = 0
+    return labels, sizes, int(np.argmax(sizes))
@@ -0,0 +1,64 @@
+import numpy as np
+
+MIN_LIGHT = 0.3  # Share of the daylight sight range left on the darkest night
+
+# (col_x, col_y, row_x, row_y) turning a scan's (column, row) offsets into
+# map offsets, one entry per quadrant around the viewer
+QUADRANTS = ((1, 0, 0, -1), (1, 0, 0, 1), (0, 1, 1, 0), (0, 1, -1, 0))
+
+def view_radius(base: float, visibility: float, light_level: float) -> float:
+    """Sight range scaled by weather visibility (WeatherEffects.visibility)
+    and daylight (TimeSystem.get_light_level)"""
+    return base * visibility * max(MIN_LIGHT, light_level)
+
+
+def shadowcast(opaque: bytes, width: int, height: int, x: int, y: int,
+               radius: int) -> np.ndarray:
+    """Bool mask of the tiles visible from (x, y) within radius.
+
+    Symmetric shadowcasting: each quadrant is scanned row by row outwards,
+    keeping the range of slopes still lit, and an opaque tile narrows that
+    range for the rows behind it. A see-through tile is only lit when its
+    centre is inside the range, so whenever one open tile sees another, it
+    is seen back. Walls are lit if any part of them is. Slopes are kept as
+    integer fractions, as the symmetry depends on exact comparisons.
+
+    `opaque` is the blocks_sight layer flattened in [x, y] order (tile
+    (x, y) at x * height + y). Tiles off the map block sight.
+    """
+    visible = bytearray(width * height)
+    if not (0 <= x < width and 0 <= y < height):
+        return np.zeros((width, height), dtype=bool)
+    visible[x * height + y] = 1
+    limit = radius * radius
+
+    def scan(row: int, start_num: int, start_den: int, end_num: int, end_den: int,
+             col_x: int, col_y: int, row_x: int, row_y: int) -> None:
+        for distance in range(row, radius + 1):
+            # Columns whose centres round into the lit range
+            first = (2 * distance * start_num + start_den) // (2 * start_den)
+            last = -((end_den - 2 * distance * end_num) // (2 * end_den))
+            previous = None  # Whether the last tile was a wall
+            for col in range(first, last + 1):
+                map_x = x + col * col_x + distance * row_x
+                map_y = y + col * col_y + distance * row_y
+                inside = 0 <= map_x < width and 0 <= map_y < height
+                wall = not inside or opaque[map_x * height + map_y] != 0
+                if inside and col * col + distance * distance <= limit and (
+                        wall or (col * start_den >= distance * start_num and
+                                 col * end_den <= distance * end_num)):
+                    visible[map_x * height + map_y] = 1
+                if previous and not wall:
+                    start_num, start_den = 2 * col - 1, 2 * distance
+                elif previous is False and wall:
+                    # Light passes before this wall: scan the rows behind
+                    # that part, then carry on after it
+                    scan(distance + 1, start_num, start_den, 2 * col - 1, 2 * distance,
+                         col_x, col_y, row_x, row_y)
+                previous = wall
+            if previous is not False:
+                return
+
+    for quadrant in QUADRANTS:
+        scan(1, -1, 1, 1, 1, *quadrant)
+    return np.frombuffer(bytes(visible), dtype=bool).reshape(width, height)
@@ -0,0 +1,178 @@
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+from dataclasses import dataclass
+import inspect
+import time
+import tracemalloc
+
+# A pass takes (zone, zone_x, zone_y). It either returns None or is a
+# generator yielding its own progress (0..1) between batches of work.
+PassFunction = Callable[..., Optional[Generator[float, None, None]]]
+
+DEFAULT_ZONE_TYPE = "wilderness"  # Passes used for zone types with none registered
+
+
+@dataclass
+class GenerationPass:
+    name: str
+    run: PassFunction
+    tier: int  # Generation tier the pass belongs to (see zone.py)
+    enabled: bool = True
+
+
+class GenerationPipeline:
+    """Ordered, named generation passes for each zone type.
+
+    Passes can be disabled or swapped by name, e.g. to time a faster
+    variant against the original with GenerationProfiler.
+    """
+
+    def __init__(self):
+        self._passes: Dict[str, List[GenerationPass]] = {}
+
+    def register(self, zone_type: str, name: str, run: PassFunction, tier: int,
+                 before: Optional[str] = None) -> None:
+        """Add a pass at the end, or in front of the pass named `before`"""
+        passes = self._passes.setdefault(zone_type, [])
+        if any(gen_pass.name == name for gen_pass in passes):
+            raise ValueError(f"{zone_type} already has a pass named {name}")
+        index = self._index(zone_type, before) if before else len(passes)
+        passes.insert(index, GenerationPass(name, run, tier))
+
+    def replace(self, zone_type: str, name: str, run: PassFunction) -> PassFunction:
+        """Swap the function behind a pass, returning the one it replaced"""
+        index = self._index(zone_type, name)
+        gen_pass = self._passes[zone_type][index]
+        previous, gen_pass.run = gen_pass.run, run
+        return previous
+
+    def set_enabled(self, zone_type: str, name: str, enabled: bool) -> None:
+        index = self._index(zone_type, name)
+        self._passes[zone_type][index].enabled = enabled
+
+    def registered(self, zone_type: str) -> List[GenerationPass]:
+        """Every pass registered for a zone type, enabled or not, in order"""
+        return list(self._passes.get(zone_type, []))
+
+    def passes(self, zone_type: str) -> List[GenerationPass]:
+        """Enabled passes for a zone type, in order"""
+        passes = self._passes.get(zone_type) or self._passes.get(DEFAULT_ZONE_TYPE, [])
+        return [gen_pass for gen_pass in passes if gen_pass.enabled]
+
+    def zone_types(self) -> List[str]:
+        return list(self._passes)
+
+    def _index(self, zone_type: str, name: str) -> int:
+        for index, gen_pass in enumerate(self._passes.get(zone_type, [])):
+            if gen_pass.name == name:
+                return index
+        raise KeyError(f"{zone_type} has no pass named {name}")
+
+
+@dataclass
+class PassStats:
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    peak_bytes: int = 0  # Largest allocation peak over a call, if tracked
+
+
+class GenerationProfiler:
+    """Times every generation pass and aggregates the results per zone type.
+
+    With track_allocations the peak memory allocated during each pass is
+    recorded as well, through tracemalloc. That slows generation down
+    noticeably, so it is off unless asked for.
+    """
+
+    def __init__(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        self.stats: Dict[Tuple[str, str], PassStats] = {}  # (zone type, pass): stats
+        self.zones: Dict[str, int] = {}  # Zones built per zone type
+
+    def run_pass(self, zone_type: str, gen_pass: GenerationPass,
+                 *args) -> Generator[float, None, None]:
+        """Run a pass, passing its progress through. Time spent suspended
+        between yields is not counted."""
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        seconds = 0.0
+        peak = 0
+
+        start, base = self._start()
+        steps = gen_pass.run(*args)
+        while inspect.isgenerator(steps):
+            try:
+                fraction = next(steps)
+            except StopIteration:
+                break
+            elapsed, allocated = self._stop(start, base)
+            seconds += elapsed
+            peak = max(peak, allocated)
+            yield fraction
+            start, base = self._start()
+        elapsed, allocated = self._stop(start, base)
+
+        stats = self.stats.setdefault((zone_type, gen_pass.name), PassStats())
+        stats.calls += 1
+        stats.seconds += seconds + elapsed
+        stats.max_seconds = max(stats.max_seconds, seconds + elapsed)
+        stats.peak_bytes = max(stats.peak_bytes, peak, allocated)
+
+    def zone_built(self, zone_type: str) -> None:
+        self.zones[zone_type] = self.zones.get(zone_type, 0) + 1
+
+    def merge(self, other: "GenerationProfiler") -> None:
+        """Add the timings of another profiler, e.g. one from a worker process"""
+        for key, theirs in other.stats.items():
+            stats = self.stats.setdefault(key, PassStats())
+            stats.calls += theirs.calls
+            stats.seconds += theirs.seconds
+            stats.max_seconds = max(stats.max_seconds, theirs.max_seconds)
+            stats.peak_bytes = max(stats.peak_bytes, theirs.peak_bytes)
+        for zone_type, count in other.zones.items():
+            self.zones[zone_type] = self.zones.get(zone_type, 0) + count
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.zones.clear()
+
+    def report(self, title: str = "Zone generation profile") -> str:
+        """Per zone type table of pass timings, slowest zone type first"""
+        by_type: Dict[str, List[Tuple[str, PassStats]]] = {}
+        for (zone_type, name), stats in self.stats.items():
+            by_type.setdefault(zone_type, []).append((name, stats))
+        lines = [title]
+        if not by_type:
+            lines.append("  no zones generated")
+
+        def total_seconds(entries):
+            return sum(stats.seconds for _, stats in entries)
+        for zone_type, entries in sorted(by_type.items(), key=lambda item: -total_seconds(item[1])):
+            total = total_seconds(entries)
+            zones = self.zones.get(zone_type, 0)
+            lines.append(f"{zone_type}: {zones} zones, {total * 1000:.1f} ms"
+                         + (f" ({total * 1000 / zones:.2f} ms/zone)" if zones else ""))
+            lines.append(f"  {'pass':<24}{'calls':>7}{'mean ms':>10}{'max ms':>10}"
+                         f"{'share':>8}" + (f"{'peak KiB':>10}" if self.track_allocations else ""))
+            for name, stats in entries:
+                lines.append(
+                    f"  {name:<24}{stats.calls:>7}"
+                    f"{stats.seconds * 1000 / stats.calls:>10.2f}"
+                    f"{stats.max_seconds * 1000:>10.2f}"
+                    f"{stats.seconds / total if total else 0:>8.1%}"
+                    + (f"{stats.peak_bytes / 1024:>10.1f}" if self.track_allocations else ""))
+        return "\n".join(lines)
+
+    def _start(self) -> Tuple[float, int]:
+        base = 0
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        return time.perf_counter(), base
+
+    def _stop(self, start: float, base: int) -> Tuple[float, int]:
+        elapsed = time.perf_counter() - start
+        allocated = 0
+        if self.track_allocations:
+            allocated = max(0, tracemalloc.get_traced_memory()[1] - base)
+        return elapsed, allocated
@@ -1,119 +1,454 @@
-from typing import Dict, Tuple, List, Optional, Set
+from typing import Dict, Generator, Tuple, List, Optional
+from collections import OrderedDict
+from functools import partial
+import pickle
 import random
-import noise
-from .zone import Zone
-from .tile import Tile, TileProperties
+import numpy as np
+from .zone import Zone, TIER_FIELDS, TIER_TERRAIN, TIER_FULL
+from .tile import (
+    Tile, FLOOR_PROPERTIES, WALL_PROPERTIES, SHALLOW_WATER_PROPERTIES,
+    DEEP_WATER_PROPERTIES, SWAMP_PROPERTIES, SWAMP_POOL_PROPERTIES,
+    TREE_PROPERTIES, DEBRIS_PROPERTIES
+)
+from .tile_store import TERRAIN_IDS, ANOMALY_TYPES
+from .noise_engine import noise_grid, world_grid, pnoise2
+from .zone_fields import ZoneFields
+from .zone_prefetcher import ZonePrefetcher
+from .zone_streamer import ZoneStreamer, run_steps
+from .zone_cache import ZoneCache
+from .generation_pipeline import (
+    GenerationPass, GenerationPipeline, GenerationProfiler, PassFunction
+)
+from .zone_delta import diff_zone, apply_delta
+from .connectivity import DisjointSet
+from .area_table import SummedAreaTable
+from .masks import disc_kernel, stamp
+from .poisson_disc import poisson_disc
+from .prefabs import PrefabLibrary, RoomSpec
+from .cave_generator import (
+    drunkard_walks, cellular_caves, carve_rooms, carve_l_corridor
+)
+from .atlas import WorldAtlas
 from ..constants import (
     TERRAIN_FLOOR, TERRAIN_WALL, TERRAIN_WATER, TERRAIN_RADIATION,
     ENTITY_ANOMALY
 )
 
+# Generator settings a worker process needs to build zones the same way
+WORKER_SETTINGS = (
+    "seed", "zone_width", "zone_height",
+    "elevation_scale", "forest_scale", "moisture_scale", "radiation_scale", "anomaly_scale",
+    "corridor_loop_fraction", "cellular_caves",
+    "poi_spacing", "building_spacing", "enemy_spacing", "tree_spacing",
+    "field_rows_per_step"
+)
+
 class MapGenerator:
-    def __init__(self, world_width: int, world_height: int):
+    def __init__(self, world_width: int, world_height: int,
+                 max_resident_zones: int = 32, spill_dir: Optional[str] = None):
         self.world_width = world_width
         self.world_height = world_height
-        self.zones: Dict[Tuple[int, int], Zone] = {}
+        # Least recently visited zones are spilled to disk past the limit,
+        # as deltas against what the seed regenerates
+        self.zones = ZoneCache(max_resident_zones, spill_dir,
+                               on_load=self._attach_zone,
+                               encode=self.encode_zone,
+                               decode=self.decode_zone)
         self.seed = random.randint(0, 1000000)
+        self.game_state = None  # Set by the game state that owns this generator
+        self.prefetcher: Optional[ZonePrefetcher] = None  # Background generation
+        self.streamer: Optional[ZoneStreamer] = None  # In-frame generation
+        self.atlas: Optional[WorldAtlas] = None  # Pregenerated zones, see load_atlas
+        # Zones built below TIER_FULL (previews, terrain ahead of the player)
+        self.partial_zones: "OrderedDict[Tuple[int, int], Zone]" = OrderedDict()
+        self.max_partial_zones = 64
+        self.zone_width = 64
+        self.zone_height = 64
         
         # Noise settings for different features
         self.elevation_scale = 50.0
+        self.forest_scale = 30.0
         self.moisture_scale = 25.0
         self.radiation_scale = 75.0
         self.anomaly_scale = 100.0
         
+        # Extra underground corridors on top of the spanning tree, per room
+        self.corridor_loop_fraction = 1 / 3
+        # Grow underground caves by cellular automata instead of tunnels
+        self.cellular_caves = False
+        
+        # Minimum distance between placed features, in tiles
+        self.poi_spacing = 20
+        self.building_spacing = 6  # Between buildings of a village
+        self.enemy_spacing = 6
+        self.tree_spacing = 1.4  # Scattered trees never touch side by side
+        
+        # Noise rows sampled per step of build_zone_steps (~5 ms each)
+        self.field_rows_per_step = 32
+        
+        # Building, outpost and crash site blueprints
+        self.prefabs = PrefabLibrary()
+        
+        # Named passes run for each zone type, and their timings
+        self.pipeline = self._default_pipeline()
+        self.profiler = GenerationProfiler()
+        
     def generate_zone(self, zone_x: int, zone_y: int, zone_type: str) -> Zone:
         """Generate a new zone or return existing one"""
         if (zone_x, zone_y) in self.zones:
             return self.zones[(zone_x, zone_y)]
             
-        # Create new zone
-        zone = Zone(64, 64, zone_type)
+        # Zones baked offline only need their entities placed
+        if self.is_baked(zone_x, zone_y, zone_type):
+            return self.add_zone(zone_x, zone_y, self._zone_from_atlas(zone_x, zone_y))
+            
+        # Wait for a background generation already in flight for this zone
+        if self.prefetcher:
+            zone = self.prefetcher.take(zone_x, zone_y)
+            if zone:
+                return zone
+                
+        # Finish a zone that was being built a slice per frame
+        if self.streamer:
+            zone = self.streamer.finish(zone_x, zone_y)
+            if zone:
+                return zone
+                
+        # Carry on from whatever tier was already built ahead of the player
+        zone = self.partial_zones.pop((zone_x, zone_y), None)
+        if zone is None or zone.zone_type != zone_type:
+            zone = Zone(self.zone_width, self.zone_height, zone_type)
+        return self.complete_zone(zone_x, zone_y, zone)
+        
+    def materialize(self, zone_x: int, zone_y: int, zone_type: str, tier: int) -> Zone:
+        """A zone built up to at least `tier`.
+        
+        Lower tiers are cheap and cached in `partial_zones`; asking for a
+        higher tier later picks up where the cached zone stopped. TIER_FULL
+        is the same as generate_zone.
+        """
+        pos = (zone_x, zone_y)
+        if tier >= TIER_FULL or pos in self.zones:
+            return self.generate_zone(zone_x, zone_y, zone_type)
+            
+        zone = self.partial_zones.get(pos)
+        if zone is None or zone.zone_type != zone_type:
+            zone = Zone(self.zone_width, self.zone_height, zone_type)
+        if zone.tier < tier:
+            zone = run_steps(self.build_zone_steps(zone_x, zone_y, zone_type,
+                                                   rows_per_step=self.zone_width,
+                                                   tier=tier, zone=zone))
+        self.store_partial_zone(pos, zone)
+        return zone
+        
+    def preview(self, zone_x: int, zone_y: int) -> ZoneFields:
+        """Noise fields of a zone for the minimap and world map"""
+        zone = self.materialize(zone_x, zone_y, self.zone_type_at(zone_x, zone_y),
+                                TIER_FIELDS)
+        if zone.fields is None:  # Mapped from the atlas, which only holds tiles
+            zone.fields = self._generate_fields(zone, zone_x, zone_y)
+        return zone.fields
+        
+    def has_tier(self, zone_x: int, zone_y: int, zone_type: str, tier: int) -> bool:
+        """Whether a zone is available at `tier` without generating anything"""
+        pos = (zone_x, zone_y)
+        if pos in self.zones or self.is_baked(zone_x, zone_y, zone_type):
+            return True
+        zone = self.partial_zones.get(pos)
+        return zone is not None and zone.zone_type == zone_type and zone.tier >= tier
+        
+    def store_partial_zone(self, pos: Tuple[int, int], zone: Zone) -> None:
+        """Cache a zone below TIER_FULL, dropping the least recently used"""
+        self.partial_zones[pos] = zone
+        self.partial_zones.move_to_end(pos)
+        while len(self.partial_zones) > self.max_partial_zones:
+            self.partial_zones.popitem(last=False)
+            
+    def complete_zone(self, zone_x: int, zone_y: int, zone: Zone) -> Zone:
+        """Build the remaining tiers of a zone and register it"""
+        if zone.tier < TIER_FULL:
+            zone = run_steps(self.build_zone_steps(zone_x, zone_y, zone.zone_type,
+                                                   rows_per_step=self.zone_width,
+                                                   zone=zone))
+        return self.add_zone(zone_x, zone_y, zone)
+        
+    def build_zone(self, zone_x: int, zone_y: int, zone_type: str,
+                   tier: int = TIER_FULL) -> Zone:
+        """Run the generation passes for a zone without registering it"""
+        # Nothing to interleave with, so sample the noise in one band
+        return run_steps(self.build_zone_steps(zone_x, zone_y, zone_type,
+                                               rows_per_step=self.zone_width, tier=tier))
+        
+    def build_zone_steps(self, zone_x: int, zone_y: int, zone_type: str,
+                         rows_per_step: Optional[int] = None, tier: int = TIER_FULL,
+                         zone: Optional[Zone] = None,
+                         profiler: Optional[GenerationProfiler] = None
+                         ) -> Generator[float, None, Zone]:
+        """Resumable build_zone: yields the fraction of work done between
+        passes and batches of work, and returns the zone at `tier`.
+        A partly built `zone` is carried on from the tier it reached.
+        Timings go to `profiler`, self.profiler by default."""
+        profiler = profiler or self.profiler
+        if zone is None:
+            zone = Zone(self.zone_width, self.zone_height, zone_type)
         zone.game_state = self.game_state
         
-        # Generate terrain based on zone type
-        if zone_type == "wilderness":
-            self._generate_wilderness(zone, zone_x, zone_y)
-        elif zone_type == "forest":
-            self._generate_forest(zone, zone_x, zone_y)
-        elif zone_type == "underground":
-            self._generate_underground(zone, zone_x, zone_y)
-        else:
-            self._generate_wilderness(zone, zone_x, zone_y)
+        # Noise fields come first and are not part of the pipeline: every
+        # pass reads them
+        rows_per_step = rows_per_step or self.field_rows_per_step
+        passes = [gen_pass for gen_pass in self.pipeline.passes(zone_type)
+                  if zone.tier < gen_pass.tier <= tier]
+        if zone.tier < TIER_FIELDS:
+            passes.insert(0, GenerationPass(
+                "noise_fields", partial(self._sample_fields, rows_per_step=rows_per_step),
+                TIER_FIELDS))
+        completes = zone.tier < TIER_FULL <= tier
             
-        # Add enemies
-        self._spawn_enemies(zone, zone_x, zone_y)
+        for step, gen_pass in enumerate(passes):
+            for fraction in profiler.run_pass(zone_type, gen_pass, zone, zone_x, zone_y):
+                yield (step + fraction) / len(passes)
+            if step + 1 < len(passes):
+                yield (step + 1) / len(passes)
+                
+        zone.tier = max(zone.tier, tier)
+        zone.take_dirty_rects()  # Everything in a freshly built zone is new
+        if completes:
+            zone.rebuild_triggers()  # Hazards are all in place now
+            profiler.zone_built(zone_type)
+        return zone
         
-        # Add hazards and connect zones
-        self._add_hazards(zone, zone_x, zone_y)
+    def _default_pipeline(self) -> GenerationPipeline:
+        """Generation passes per zone type, in order"""
+        pipeline = GenerationPipeline()
+        pipeline.register("wilderness", "terrain_noise", self._generate_terrain_noise, TIER_TERRAIN)
+        pipeline.register("wilderness", "points_of_interest", self._add_points_of_interest, TIER_FULL)
+        
+        pipeline.register("forest", "terrain_noise", self._generate_terrain_noise, TIER_TERRAIN)
+        pipeline.register("forest", "forest_cover", self._add_forest_cover, TIER_TERRAIN)
+        
+        pipeline.register("underground", "fill_walls", self._fill_walls, TIER_TERRAIN)
+        pipeline.register("underground", "caves", self._carve_caves, TIER_TERRAIN)
+        pipeline.register("underground", "rooms", self._add_rooms, TIER_TERRAIN)
+        pipeline.register("underground", "connectivity", self._ensure_connectivity, TIER_TERRAIN)
+        
+        pipeline.register("swamp", "terrain_noise", self._generate_terrain_noise, TIER_TERRAIN)
+        pipeline.register("swamp", "shallow_water", self._add_shallow_water, TIER_TERRAIN)
+        pipeline.register("swamp", "swamp_pools", self._add_swamp_pools, TIER_TERRAIN)
+        
+        pipeline.register("urban", "terrain_noise", self._generate_terrain_noise, TIER_TERRAIN)
+        pipeline.register("urban", "roads", self._add_roads, TIER_TERRAIN)
+        pipeline.register("urban", "buildings", self._add_urban_blocks, TIER_FULL)
+        
+        # Every zone type ends with its inhabitants and hazards
+        for zone_type in pipeline.zone_types():
+            pipeline.register(zone_type, "spawn_enemies", self._spawn_enemies, TIER_FULL)
+            pipeline.register(zone_type, "hazards", self._add_hazards, TIER_FULL)
+        return pipeline
+        
+    def worker_config(self) -> bytes:
+        """This generator's settings, prefabs and pipeline, pickled for
+        from_worker_config in another process.
+        
+        Raises pickle.PicklingError (or TypeError/AttributeError) when a
+        pass was swapped for something that cannot be pickled.
+        """
+        passes = {
+            zone_type: [(gen_pass.name, self._pass_reference(gen_pass.run),
+                         gen_pass.tier, gen_pass.enabled)
+                        for gen_pass in self.pipeline.registered(zone_type)]
+            for zone_type in self.pipeline.zone_types()
+        }
+        settings = {name: getattr(self, name) for name in WORKER_SETTINGS}
+        return pickle.dumps((self.world_width, self.world_height, settings, self.prefabs,
+                             passes, self.profiler.track_allocations),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        
+    @classmethod
+    def from_worker_config(cls, config: bytes) -> "MapGenerator":
+        """A generator that builds zones exactly like the one that made `config`"""
+        world_width, world_height, settings, prefabs, passes, track_allocations = \
+            pickle.loads(config)
+        generator = cls(world_width, world_height)
+        for name, value in settings.items():
+            setattr(generator, name, value)
+        generator.prefabs = prefabs
+        generator.profiler = GenerationProfiler(track_allocations)
+        generator.pipeline = GenerationPipeline()
+        for zone_type, entries in passes.items():
+            for name, run, tier, enabled in entries:
+                if isinstance(run, str):
+                    run = getattr(generator, run)
+                generator.pipeline.register(zone_type, name, run, tier)
+                generator.pipeline.set_enabled(zone_type, name, enabled)
+        return generator
+        
+    def _pass_reference(self, run: PassFunction):
+        # Passes bound to this generator are sent by name and bound again to
+        # the worker's generator; anything else is pickled as it is
+        if getattr(run, "__self__", None) is self:
+            return run.__name__
+        return run
+        
+    def add_zone(self, zone_x: int, zone_y: int, zone: Zone) -> Zone:
+        """Register a built zone and connect it to its neighbours"""
+        self.partial_zones.pop((zone_x, zone_y), None)  # Superseded
+        self._attach_zone((zone_x, zone_y), zone)
         self._connect_to_adjacent_zones(zone, zone_x, zone_y)
         
         self.zones[(zone_x, zone_y)] = zone
         return zone
         
-    def _generate_wilderness(self, zone: Zone, zone_x: int, zone_y: int) -> None:
-        """Generate an open wilderness area with points of interest"""
-        # Generate base terrain using noise
-        self._generate_terrain_noise(zone, zone_x, zone_y)
+    def zone_type_at(self, zone_x: int, zone_y: int) -> str:
+        """Zone type used when a zone is first generated"""
+        if (zone_x, zone_y) == (0, 0):
+            return "wilderness"  # Starting zone
+        return "forest"
+        
+    def load_atlas(self, path: str, seed: Optional[int] = None) -> None:
+        """Serve zones from a pregenerated atlas (see pregen.py).
+        
+        The atlas seed replaces this generator's, so zones outside the baked
+        region still match the world they border. Raises ValueError if a
+        `seed` is given and the atlas was baked with another one.
+        """
+        atlas = WorldAtlas(path)
+        if (atlas.zone_width, atlas.zone_height) != (self.zone_width, self.zone_height):
+            raise ValueError(f"{path} holds {atlas.zone_width}x{atlas.zone_height} zones, "
+                             f"expected {self.zone_width}x{self.zone_height}")
+        if seed is not None and atlas.seed != seed:
+            raise ValueError(f"{path} was baked with seed {atlas.seed}, expected {seed}")
+        self.atlas = atlas
+        self.seed = atlas.seed
+        
+    def is_baked(self, zone_x: int, zone_y: int, zone_type: str) -> bool:
+        return self.atlas is not None and self.atlas.zone_type(zone_x, zone_y) == zone_type
+        
+    def _zone_from_atlas(self, zone_x: int, zone_y: int) -> Zone:
+        """Build a zone around tiles mapped from the atlas"""
+        zone = Zone(self.zone_width, self.zone_height, self.atlas.zone_type(zone_x, zone_y),
+                    store=self.atlas.store(zone_x, zone_y))
+        zone.game_state = self.game_state
+        zone.tier = TIER_FULL
+        
+        # Anomalies are already in the tile layers; rebuild the list that drives them
+        for x, y in np.argwhere(zone.store.anomaly).tolist():
+            zone.anomalies.append({
+                "x": x,
+                "y": y,
+                "type": ANOMALY_TYPES[zone.store.anomaly[x, y]],
+                "danger": float(zone.store.danger_level[x, y])
+            })
+        self._spawn_enemies(zone, zone_x, zone_y)
+        zone.rebuild_triggers()
+        return zone
         
-        # Add points of interest
-        self._add_points_of_interest(zone, zone_x, zone_y)
+    def _baseline_zone(self, zone_x: int, zone_y: int, zone_type: str) -> Zone:
+        """A zone exactly as generation produced it, before any changes"""
+        if self.is_baked(zone_x, zone_y, zone_type):
+            return self._zone_from_atlas(zone_x, zone_y)
+        # A rebuild, not new generation, so it stays out of self.profiler
+        return run_steps(self.build_zone_steps(zone_x, zone_y, zone_type,
+                                               rows_per_step=self.zone_width,
+                                               profiler=GenerationProfiler()))
+        
+    def zone_rng(self, zone_x: int, zone_y: int, stream: str) -> random.Random:
+        """Random stream for one generation step of one zone.
+
+        Each step draws from its own stream, so a zone rebuilds bit for bit
+        from (seed, zone_x, zone_y) regardless of what was generated before.
+        """
+        # String seeds are hashed with SHA-512, so this is stable across processes
+        return random.Random(f"{self.seed}:{zone_x}:{zone_y}:{stream}")
+        
+    def zone_array_rng(self, zone_x: int, zone_y: int, stream: str) -> np.random.Generator:
+        """NumPy counterpart of zone_rng, for passes that draw whole arrays"""
+        return self._array_rng(self.zone_rng(zone_x, zone_y, stream))
+        
+    def _array_rng(self, rng: random.Random) -> np.random.Generator:
+        """NumPy generator continuing a random.Random stream"""
+        return np.random.default_rng(rng.getrandbits(128))
+        
+    def encode_zone(self, pos: Tuple[int, int], zone: Zone) -> bytes:
+        """Serialize only what changed since the zone was generated"""
+        baseline = self._baseline_zone(pos[0], pos[1], zone.zone_type)
+        return pickle.dumps(diff_zone(zone, baseline), protocol=pickle.HIGHEST_PROTOCOL)
+        
+    def decode_zone(self, pos: Tuple[int, int], data: bytes) -> Zone:
+        """Copy a zone as generated and replay its recorded changes"""
+        delta = pickle.loads(data)
+        return apply_delta(self._baseline_zone(pos[0], pos[1], delta.zone_type), delta)
+        
+    def _attach_zone(self, pos: Tuple[int, int], zone: Zone) -> None:
+        """Give a zone built in a worker or loaded from disk its game state"""
+        zone.game_state = self.game_state
+        for entity in zone.entities:
+            entity.game_state = self.game_state
+            
+    def _sample_fields(self, zone: Zone, zone_x: int, zone_y: int,
+                       rows_per_step: int) -> Generator[float, None, None]:
+        """Set zone.fields, sampling a band of rows per step"""
+        bands = []
+        for x0 in range(0, zone.width, rows_per_step):
+            bands.append(self._generate_fields(zone, zone_x, zone_y, x0, x0 + rows_per_step))
+            if x0 + rows_per_step < zone.width:
+                yield (x0 + rows_per_step) / zone.width
+        zone.fields = ZoneFields.concatenate(bands)
+        
+    def _generate_fields(self, zone: Zone, zone_x: int, zone_y: int,
+                         x0: int = 0, x1: Optional[int] = None) -> ZoneFields:
+        """Sample every noise layer of a zone (or of rows x0:x1) over one
+        shared coordinate grid"""
+        world_x, world_y = world_grid(zone_x, zone_y, zone.width, zone.height)
+        world_x, world_y = world_x[x0:x1], world_y[x0:x1]
+        return ZoneFields(
+            elevation=pnoise2(
+                world_x / self.elevation_scale,
+                world_y / self.elevation_scale,
+                octaves=6,
+                persistence=0.5,
+                lacunarity=2.0,
+                base=self.seed
+            ),
+            forest_density=pnoise2(
+                world_x / self.forest_scale,
+                world_y / self.forest_scale,
+                octaves=3,
+                base=self.seed + 1
+            ),
+            radiation=pnoise2(
+                world_x / self.radiation_scale,
+                world_y / self.radiation_scale,
+                octaves=3,
+                base=self.seed + 2
+            ),
+            anomaly=pnoise2(
+                world_x / self.anomaly_scale,
+                world_y / self.anomaly_scale,
+                octaves=2,
+                base=self.seed + 3
+            )
+        )
         
     def _generate_terrain_noise(self, zone: Zone, zone_x: int, zone_y: int) -> None:
-        """Generate natural terrain using multiple noise layers"""
-        for x in range(zone.width):
-            for y in range(zone.height):
-                world_x = zone_x * zone.width + x
-                world_y = zone_y * zone.height + y
-                
-                # Generate various noise values
-                elevation = noise.pnoise2(
-                    world_x / 50.0, 
-                    world_y / 50.0, 
-                    octaves=6,
-                    persistence=0.5,
-                    lacunarity=2.0,
-                    base=self.seed
-                )
-                
-                forest_density = noise.pnoise2(
-                    world_x / 30.0,
-                    world_y / 30.0,
-                    octaves=3,
-                    base=self.seed + 1
-                )
-                
-                # Determine terrain type
-                if elevation < -0.3:
-                    # Water
-                    zone.tiles[x][y] = Tile(TERRAIN_WATER, TileProperties(
-                        is_water=True,
-                        blocks_movement=True
-                    ))
-                elif elevation < -0.1:
-                    # Swamp/marsh
-                    zone.tiles[x][y] = Tile(TERRAIN_WATER, TileProperties(
-                        is_water=True,
-                        blocks_movement=False,
-                        radiation_level=0.2
-                    ))
-                elif forest_density > 0.2:
-                    # Forest
-                    if random.random() < forest_density:
-                        zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                            blocks_movement=True,
-                            blocks_sight=True,
-                            moisture_level=0.8
-                        ))
-                    else:
-                        zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
-                else:
-                    # Open ground
-                    zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
+        """Generate natural terrain by classifying the zone's noise fields"""
+        fields = zone.fields
+        
+        # Water
+        zone.paint_mask(fields.water_mask(), TERRAIN_WATER, DEEP_WATER_PROPERTIES)
+        
+        # Swamp/marsh
+        zone.paint_mask(fields.swamp_mask(), TERRAIN_WATER, SWAMP_PROPERTIES)
+        
+        # Forest, with tree chance scaled by density
+        rolls = self.zone_array_rng(zone_x, zone_y, "terrain").random(fields.shape)
+        zone.paint_mask(fields.forest_mask() & (rolls < fields.forest_density),
+                        TERRAIN_WALL, TREE_PROPERTIES)
+        
+        # Everything else stays open ground
                     
     def _add_points_of_interest(self, zone: Zone, zone_x: int, zone_y: int) -> None:
         """Add various points of interest to the wilderness"""
-        # Use deterministic random based on zone coordinates
-        rng = random.Random(hash((zone_x, zone_y, self.seed)))
+        rng = self.zone_rng(zone_x, zone_y, "points_of_interest")
         
         # Possible features to add
         features = [
@@ -126,277 +461,153 @@ class MapGenerator:
             (self._add_crash_site, 0.1)
         ]
         
-        for feature_func, probability in features:
-            if rng.random() < probability:
-                # Find suitable location
-                attempts = 20
-                while attempts > 0:
-                    x = rng.randint(5, zone.width - 15)
-                    y = rng.randint(5, zone.height - 15)
-                    if self._is_suitable_location(zone, x, y, 10):
-                        feature_func(zone, x, y, rng)
-                        break
-                    attempts -= 1
+        chosen = [feature_func for feature_func, probability in features
+                  if rng.random() < probability]
+        
+        # Spread the features out over every suitable location
+        locations = self._sample_locations(self._suitable_locations(zone, 10),
+                                           5, 5, zone.width - 15, zone.height - 15,
+                                           self.poi_spacing, len(chosen), rng)
+        for feature_func, (x, y) in zip(chosen, locations):
+            feature_func(zone, x, y, rng)
                     
     def _add_small_village(self, zone: Zone, x: int, y: int, rng: random.Random) -> None:
         """Add a small village with multiple buildings"""
         num_buildings = rng.randint(3, 7)
         
         # Create a road network
-        self._create_village_roads(zone, x, y, 10)
-        
-        # Add buildings along roads
-        for _ in range(num_buildings):
-            bx = x + rng.randint(-5, 5)
-            by = y + rng.randint(-5, 5)
-            if self._is_suitable_location(zone, bx, by, 3):
-                self._generate_building(zone, bx, by, rng.choice([
-                    "house", "shop", "warehouse"
-                ]))
+        self._create_village_roads(zone, x, y, 10, rng)
+        
+        # Add buildings along roads, as many as fit near the village centre
+        locations = self._sample_locations(self._suitable_locations(zone, 3),
+                                           x - 5, y - 5, x + 5, y + 5,
+                                           self.building_spacing, num_buildings, rng)
+        for building_x, building_y in locations:
+            self._generate_building(zone, building_x, building_y, rng.choice([
+                "house", "shop", "warehouse"
+            ]), rng)
                 
     def _add_military_outpost(self, zone: Zone, x: int, y: int, rng: random.Random) -> None:
         """Add a military outpost with defensive structures"""
         # Create main building
-        self._generate_building(zone, x, y, "military", 8, 12)
-        
-        # Add defensive walls
-        self._create_defensive_perimeter(zone, x-2, y-2, 12, 16)
+        self._generate_building(zone, x, y, "military", rng, 8, 12)
         
-        # Add guard towers
-        tower_positions = [(x-2, y-2), (x+8, y-2), (x-2, y+12), (x+8, y+12)]
-        for tx, ty in tower_positions:
-            self._generate_building(zone, tx, ty, "tower", 2, 2)
+        # Add defensive walls with a gate and guard towers on the corners
+        zone.paint_blueprint(self.prefabs.outpost_perimeter(), x - 2, y - 2)
             
-    def _is_suitable_location(self, zone: Zone, x: int, y: int, size: int) -> bool:
-        """Check if an area is suitable for building (no water or existing structures)"""
-        for dx in range(-1, size + 1):
-            for dy in range(-1, size + 1):
-                check_x = x + dx
-                check_y = y + dy
-                if not (0 <= check_x < zone.width and 0 <= check_y < zone.height):
-                    return False
-                tile = zone.tiles[check_x][check_y]
-                if tile.properties.is_water or tile.properties.blocks_movement:
-                    return False
-        return True
+    def _suitable_locations(self, zone: Zone, size: int) -> np.ndarray:
+        """Mask of top-left corners where a size x size area and a one tile
+        border are free of water and existing structures"""
+        obstacles = SummedAreaTable(zone.store.is_water | zone.store.blocks_movement)
+        return obstacles.clear_positions(size, size, margin=1)
+        
+    def _sample_locations(self, candidates: np.ndarray, x0: int, y0: int, x1: int, y1: int,
+                          spacing: float, count: int,
+                          rng: random.Random) -> List[Tuple[int, int]]:
+        """Up to count candidates from the inclusive box [x0, x1] x [y0, y1],
+        at least spacing apart"""
+        if count <= 0:
+            return []
+        x0, y0 = max(x0, 0), max(y0, 0)
+        positions = poisson_disc(candidates[x0:x1 + 1, y0:y1 + 1], spacing,
+                                 self._array_rng(rng), max_points=count)
+        return [(x0 + dx, y0 + dy) for dx, dy in positions.tolist()]
 
-    def _generate_rooms(self, zone: Zone) -> List[Dict]:
+    def _generate_rooms(self, zone: Zone, rng: random.Random) -> List[Dict]:
         """Generate a set of non-overlapping rooms"""
         rooms = []
         attempts = 0
-        max_attempts = 100
-        
-        while len(rooms) < 15 and attempts < max_attempts:  # Try to place 15 rooms
-            width = random.randint(6, 12)
-            height = random.randint(6, 12)
-            x = random.randint(1, zone.width - width - 1)
-            y = random.randint(1, zone.height - height - 1)
-            
-            new_room = {"x": x, "y": y, "width": width, "height": height}
+        # 15 rooms per 64x64 area, so larger zones fill up the same way
+        max_rooms = max(1, 15 * zone.width * zone.height // (64 * 64))
+        max_attempts = max_rooms * 100 // 15
+        margin = 2  # Space between rooms
+        # Cells covered by placed rooms, to test overlap without scanning every room
+        reserved = np.zeros((zone.width, zone.height), dtype=bool)
+        floor = np.zeros((zone.width, zone.height), dtype=bool)
+        
+        while len(rooms) < max_rooms and attempts < max_attempts:
+            width = rng.randint(6, 12)
+            height = rng.randint(6, 12)
+            x = rng.randint(1, zone.width - width - 1)
+            y = rng.randint(1, zone.height - height - 1)
             
-            # Check if room overlaps with existing rooms (including margin)
-            margin = 2  # Space between rooms
-            overlaps = any(self._rooms_overlap_with_margin(new_room, existing, margin) 
-                         for existing in rooms)
-            
-            if not overlaps:
-                self._create_room(zone, x, y, width, height)
-                rooms.append(new_room)
+            # Reject rooms closer than margin tiles to a placed room
+            window = (slice(max(0, x - margin), x + width + margin + 1),
+                      slice(max(0, y - margin), y + height + margin + 1))
+            if not reserved[window].any():
+                reserved[x:x + width + 1, y:y + height + 1] = True
+                rooms.append({"x": x, "y": y, "width": width, "height": height})
             
             attempts += 1
             
+        # Carve every room in one write to the tile arrays
+        carve_rooms(floor, rooms)
+        zone.paint_mask(floor, TERRAIN_FLOOR, FLOOR_PROPERTIES)
         return rooms
         
-    def _connect_rooms(self, zone: Zone, rooms: List[Dict]) -> None:
-        """Connect rooms with corridors using minimum spanning tree"""
-        if not rooms:
-            return
+    def _connect_rooms(self, zone: Zone, rooms: List[Dict], rng: random.Random) -> None:
+        """Connect rooms with corridors along a minimum spanning tree"""
+        centers = self._room_centers(rooms)
+        floor = np.zeros((zone.width, zone.height), dtype=bool)
+        for i, j in self._corridor_edges(centers):
+            # Randomly choose which direction to go first
+            carve_l_corridor(floor, *centers[i].tolist(), *centers[j].tolist(),
+                             horizontal_first=rng.random() < 0.5)
+        zone.paint_mask(floor, TERRAIN_FLOOR, FLOOR_PROPERTIES)
             
-        # Create a list of all possible connections
-        connections = []
-        for i, room1 in enumerate(rooms[:-1]):
-            for j, room2 in enumerate(rooms[i+1:], i+1):
-                center1 = (room1["x"] + room1["width"]//2, 
-                          room1["y"] + room1["height"]//2)
-                center2 = (room2["x"] + room2["width"]//2, 
-                          room2["y"] + room2["height"]//2)
-                distance = abs(center1[0] - center2[0]) + abs(center1[1] - center2[1])
-                # Store tuple with distance and room indices
-                connections.append((distance, (i, j)))
-                
-        # Sort connections by distance
-        connections.sort(key=lambda x: x[0])
-        
-        # Create minimum spanning tree using room indices
-        connected_indices = {0}  # Start with first room
-        while len(connected_indices) < len(rooms):
-            for distance, (i, j) in connections:
-                if (i in connected_indices) != (j in connected_indices):
-                    # Connect these rooms
-                    room1, room2 = rooms[i], rooms[j]
-                    self._create_l_corridor(zone,
-                        room1["x"] + room1["width"]//2,
-                        room1["y"] + room1["height"]//2,
-                        room2["x"] + room2["width"]//2,
-                        room2["y"] + room2["height"]//2
-                    )
-                    connected_indices.add(i)
-                    connected_indices.add(j)
-                    break
-                    
-        # Add a few extra connections for loops
-        for _ in range(len(rooms) // 3):
-            i = random.randrange(len(rooms))
-            j = random.randrange(len(rooms))
-            if i != j:
-                room1, room2 = rooms[i], rooms[j]
-                self._create_l_corridor(zone,
-                    room1["x"] + room1["width"]//2,
-                    room1["y"] + room1["height"]//2,
-                    room2["x"] + room2["width"]//2,
-                    room2["y"] + room2["height"]//2
-                )
-                
-    def _create_l_corridor(self, zone: Zone, x1: int, y1: int, x2: int, y2: int) -> None:
-        """Create an L-shaped corridor between two points"""
-        # Randomly choose which direction to go first
-        if random.random() < 0.5:
-            # First horizontal, then vertical
-            self._create_horizontal_corridor(zone, x1, x2, y1)
-            self._create_vertical_corridor(zone, y1, y2, x2)
-        else:
-            # First vertical, then horizontal
-            self._create_vertical_corridor(zone, y1, y2, x1)
-            self._create_horizontal_corridor(zone, x1, x2, y2)
+    def _room_centers(self, rooms: List[Dict]) -> np.ndarray:
+        return np.array([(room["x"] + room["width"]//2, room["y"] + room["height"]//2)
+                         for room in rooms], dtype=np.int64).reshape(-1, 2)
+        
+    def _corridor_edges(self, centers: np.ndarray) -> List[Tuple[int, int]]:
+        """Kruskal spanning tree over room centers plus a few loop edges"""
+        if len(centers) < 2:
+            return []
             
-    def _ensure_connectivity(self, zone: Zone) -> None:
-        """Ensure all floor tiles are reachable"""
-        # Find a starting floor tile
-        start = None
-        for x in range(zone.width):
-            for y in range(zone.height):
-                if not zone.tiles[x][y].properties.blocks_movement:
-                    start = (x, y)
-                    break
-            if start:
-                break
-                
-        if not start:
-            return
-            
-        # Do a flood fill from start
-        reachable = self._flood_fill(zone, start[0], start[1])
-        
-        # Make all unreachable floor tiles into walls
-        for x in range(zone.width):
-            for y in range(zone.height):
-                if (not zone.tiles[x][y].properties.blocks_movement and 
-                    (x, y) not in reachable):
-                    zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                        blocks_movement=True,
-                        blocks_sight=True
-                    ))
+        # Every room pair, shortest first (ties keep pair order)
+        first, second = np.triu_indices(len(centers), k=1)
+        distances = np.abs(centers[first] - centers[second]).sum(axis=1)
+        order = np.argsort(distances, kind="stable")
+        
+        # The shortest pairs skipped by the tree become extra loop corridors
+        num_loops = int(len(centers) * self.corridor_loop_fraction)
+        regions = DisjointSet(len(centers))
+        tree_edges = []
+        loop_edges = []
+        # Walk the sorted pairs in chunks; the tree is usually done long before the end
+        for start in range(0, len(order), 4096):
+            chunk = order[start:start + 4096]
+            for i, j in zip(first[chunk].tolist(), second[chunk].tolist()):
+                if regions.union(i, j):
+                    tree_edges.append((i, j))
+                elif len(loop_edges) < num_loops:
+                    loop_edges.append((i, j))
+                if len(tree_edges) == len(centers) - 1 and len(loop_edges) == num_loops:
+                    return tree_edges + loop_edges
                     
-    def _flood_fill(self, zone: Zone, start_x: int, start_y: int) -> Set[Tuple[int, int]]:
-        """Return set of all reachable floor tiles from start position"""
-        reachable = set()
-        to_check = [(start_x, start_y)]
-        
-        while to_check:
-            x, y = to_check.pop()
-            if (x, y) not in reachable:
-                reachable.add((x, y))
-                # Check adjacent tiles
-                for dx, dy in [(0,1), (1,0), (0,-1), (-1,0)]:
-                    new_x, new_y = x + dx, y + dy
-                    if (0 <= new_x < zone.width and 
-                        0 <= new_y < zone.height and
-                        not zone.tiles[new_x][new_y].properties.blocks_movement):
-                        to_check.append((new_x, new_y))
-                        
-        return reachable
-
-    def _create_room(self, zone: Zone, x: int, y: int, width: int, height: int) -> None:
-        """Create a rectangular room."""
-        for i in range(x, x + width):
-            for j in range(y, y + height):
-                zone.tiles[i][j] = Tile(TERRAIN_FLOOR, TileProperties())
-
-    def _create_horizontal_corridor(self, zone: Zone, x1: int, x2: int, y: int) -> None:
-        """Create a horizontal corridor between two points."""
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
-
-    def _create_vertical_corridor(self, zone: Zone, y1: int, y2: int, x: int) -> None:
-        """Create a vertical corridor between two points."""
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
-
-    def _rooms_overlap(self, room1: dict, room2: dict) -> bool:
-        """Check if two rooms overlap."""
-        return not (
-            room1["x"] + room1["width"] < room2["x"] or
-            room2["x"] + room2["width"] < room1["x"] or
-            room1["y"] + room1["height"] < room2["y"] or
-            room2["y"] + room2["height"] < room1["y"]
-        )
-
-    def _rooms_overlap_with_margin(self, room1: dict, room2: dict, margin: int) -> bool:
-        """Check if two rooms overlap with a given margin."""
-        return not (
-            room1["x"] + room1["width"] + margin < room2["x"] or
-            room2["x"] + room2["width"] + margin < room1["x"] or
-            room1["y"] + room1["height"] + margin < room2["y"] or
-            room2["y"] + room2["height"] + margin < room1["y"]
-        )
-
-    def _add_zone_features(self, zone: Zone, zone_x: int, zone_y: int) -> None:
-        """Add features based on zone type and location."""
-        # Add some noise-based features
-        for x in range(zone.width):
-            for y in range(zone.height):
-                if zone.tiles[x][y].terrain_type == TERRAIN_FLOOR:
-                    # World coordinates for consistent noise
-                    world_x = zone_x * zone.width + x
-                    world_y = zone_y * zone.height + y
-                    
-                    # Water features
-                    if noise.pnoise2(world_x/20, world_y/20, base=self.seed) > 0.3:
-                        zone.tiles[x][y] = Tile(TERRAIN_WATER, TileProperties(
-                            is_water=True,
-                            blocks_movement=False
-                        ))
+        return tree_edges + loop_edges
+        
+    def _ensure_connectivity(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Wall off every walkable pocket that is not part of the main region"""
+        walkable = zone.store.walkable_bitboard()
+        pockets = walkable - walkable.largest_region()
+        if pockets:
+            zone.paint_mask(pockets.to_mask(), TERRAIN_WALL, WALL_PROPERTIES)
 
     def _add_hazards(self, zone: Zone, zone_x: int, zone_y: int) -> None:
         """Add radiation zones and anomalies"""
-        for x in range(zone.width):
-            for y in range(zone.height):
-                world_x = zone_x * zone.width + x
-                world_y = zone_y * zone.height + y
-                
-                # Generate radiation levels
-                radiation = noise.pnoise2(
-                    world_x / self.radiation_scale,
-                    world_y / self.radiation_scale,
-                    octaves=3,
-                    base=self.seed + 2
-                )
-                
-                if radiation > 0.3:
-                    zone.tiles[x][y].properties.radiation_level = (radiation - 0.3) * 2
-                    
-                # Generate anomalies
-                anomaly = noise.pnoise2(
-                    world_x / self.anomaly_scale,
-                    world_y / self.anomaly_scale,
-                    octaves=2,
-                    base=self.seed + 3
-                )
-                
-                if anomaly > 0.6 and not zone.tiles[x][y].properties.blocks_movement:
-                    anomaly_types = ["thermal", "gravity", "chemical", "electric"]
-                    zone.add_anomaly(x, y, random.choice(anomaly_types), 
-                                   (anomaly - 0.6) * 3)
+        fields = zone.fields
+        
+        radiation = fields.radiation_mask()
+        zone.store.radiation_level[radiation] = fields.radiation_levels()[radiation]
+            
+        rng = self.zone_rng(zone_x, zone_y, "hazards")
+        anomaly_types = ["thermal", "gravity", "chemical", "electric"]
+        anomaly_danger = fields.anomaly_danger()
+        sites = fields.anomaly_mask() & zone.store.walkable_mask()
+        for x, y in np.argwhere(sites).tolist():
+            zone.add_anomaly(x, y, rng.choice(anomaly_types),
+                           float(anomaly_danger[x, y]))
                     
     def _connect_to_adjacent_zones(self, zone: Zone, zone_x: int, zone_y: int) -> None:
         """Create paths between adjacent zones"""
@@ -405,13 +616,15 @@ class MapGenerator:
             adjacent_pos = (zone_x + dx, zone_y + dy)
             if adjacent_pos in self.zones:
                 adjacent = self.zones[adjacent_pos]
-                self._create_connection(zone, adjacent, dx, dy)
+                rng = self.zone_rng(zone_x, zone_y, f"connection:{dx},{dy}")
+                self._create_connection(zone, adjacent, dx, dy, rng)
                 
-    def _create_connection(self, zone1: Zone, zone2: Zone, dx: int, dy: int) -> None:
+    def _create_connection(self, zone1: Zone, zone2: Zone, dx: int, dy: int,
+                           rng: random.Random) -> None:
         """Create a path between two zones"""
         if dx == -1:  # Connect on left edge
             x1, x2 = 0, zone1.width-1
-            y = random.randint(10, zone1.height-10)
+            y = rng.randint(10, zone1.height-10)
             
             # Clear path in both zones
             for x in range(5):
@@ -428,203 +641,59 @@ class MapGenerator:
             
         # Similar for dy connections... 
 
-    def _add_forest_features(self, zone: Zone) -> None:
-        """Add forest-specific features like trees and vegetation"""
-        for x in range(zone.width):
-            for y in range(zone.height):
-                # Skip water and walls
-                if zone.tiles[x][y].properties.is_water or zone.tiles[x][y].properties.blocks_movement:
-                    continue
-                    
-                # Add trees (as walls) with some randomness
-                if random.random() < 0.2:  # 20% chance for a tree
-                    zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                        blocks_movement=True,
-                        blocks_sight=True,
-                        moisture_level=0.8  # Trees increase moisture
-                    ))
-                    
-    def _add_swamp_features(self, zone: Zone) -> None:
-        """Add swamp-specific features like water and mud"""
-        for x in range(zone.width):
-            for y in range(zone.height):
-                if zone.tiles[x][y].properties.blocks_movement:
-                    continue
-                    
-                # Add water patches
-                if random.random() < 0.3:  # 30% chance for water
-                    zone.tiles[x][y] = Tile(TERRAIN_WATER, TileProperties(
-                        is_water=True,
-                        radiation_level=0.1,  # Swamp water is slightly radioactive
-                        moisture_level=1.0
-                    ))
-                    
-    def _add_urban_features(self, zone: Zone) -> None:
-        """Add urban-specific features like buildings and roads"""
-        # Create a grid of buildings
-        for x in range(2, zone.width - 2, 8):
-            for y in range(2, zone.height - 2, 8):
-                if random.random() < 0.7:  # 70% chance for a building
-                    self._generate_building(zone, x, y)
-                    
-        # Add roads between buildings
-        self._generate_roads(zone)
-        
-    def _add_underground_features(self, zone: Zone) -> None:
-        """Add underground-specific features like tunnels and caves"""
-        # Start with all walls
-        for x in range(zone.width):
-            for y in range(zone.height):
-                zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                    blocks_movement=True,
-                    blocks_sight=True
-                ))
-                
-        # Carve out tunnels using drunkard's walk
-        self._generate_tunnels(zone)
+    def _open_ground(self, zone: Zone) -> np.ndarray:
+        """Dry, walkable tiles"""
+        return zone.store.walkable_mask() & ~zone.store.is_water
+        
+    def _scatter_trees(self, zone: Zone, fraction: float, rng: np.random.Generator) -> None:
+        """Plant trees on a share of the open ground, evenly spread out"""
+        open_ground = self._open_ground(zone)
+        positions = poisson_disc(open_ground, self.tree_spacing, rng,
+                                 max_points=int(open_ground.sum() * fraction))
+        trees = np.zeros_like(open_ground)
+        trees[positions[:, 0], positions[:, 1]] = True
+        zone.paint_mask(trees, TERRAIN_WALL, TREE_PROPERTIES)
         
     def _generate_building(self, zone: Zone, x: int, y: int, building_type: str,
-                          width: Optional[int] = None, height: Optional[int] = None) -> None:
+                          rng: random.Random, width: Optional[int] = None,
+                          height: Optional[int] = None) -> None:
         """Generate a building with realistic floor plan"""
         if width is None:
-            width = random.randint(8, 12)  # Larger buildings for more rooms
+            width = rng.randint(8, 12)  # Larger buildings for more rooms
         if height is None:
-            height = random.randint(8, 12)
+            height = rng.randint(8, 12)
             
-        # Create outer walls
-        for bx in range(x, x + width):
-            for by in range(y, y + height):
-                is_wall = (bx == x or bx == x + width - 1 or
-                          by == y or by == y + height - 1)
-                if is_wall:
-                    zone.tiles[bx][by] = Tile(TERRAIN_WALL, TileProperties(
-                        blocks_movement=True,
-                        blocks_sight=True
-                    ))
-                else:
-                    zone.tiles[bx][by] = Tile(TERRAIN_FLOOR, TileProperties())
-                    
-        # Add interior walls and rooms
-        self._generate_interior_layout(zone, x, y, width, height, building_type)
-        
-    def _generate_interior_layout(self, zone: Zone, x: int, y: int, 
-                                width: int, height: int, building_type: str) -> None:
-        """Generate interior layout with rooms and hallways"""
-        # Create a grid for room placement
-        grid_size = 4  # Size of each grid cell
-        grid_width = (width - 2) // grid_size
-        grid_height = (height - 2) // grid_size
-        
-        # Create central hallway
-        hallway_x = x + width // 2
-        for hy in range(y + 1, y + height - 1):
-            zone.tiles[hallway_x][hy] = Tile(TERRAIN_FLOOR, TileProperties())
-            
-        # Add rooms on both sides of hallway
+        # Walls, hallway, rooms and furniture come from a cached blueprint;
+        # only the room rolls are drawn per building
+        rooms = self._roll_interior_rooms(width, height, building_type, rng)
+        zone.paint_blueprint(self.prefabs.building(width, height, building_type, rooms), x, y)
+        
+    def _roll_interior_rooms(self, width: int, height: int, building_type: str,
+                             rng: random.Random) -> Tuple[RoomSpec, ...]:
+        """Decide which rooms a building gets along its central hallway"""
+        rooms = []
         for side in [-1, 1]:  # Left and right of hallway
-            room_x = hallway_x + (side * 2)  # Start 2 tiles from hallway
-            for room_y in range(y + 2, y + height - 3, 4):
-                if random.random() < 0.8:  # 80% chance for room
-                    # Create room
-                    room_width = random.randint(3, 4)
-                    room_height = random.randint(3, 4)
-                    
-                    # Adjust room position based on side
-                    if side < 0:
-                        room_x = max(x + 1, hallway_x - room_width - 1)
-                    else:
-                        room_x = min(x + width - room_width - 1, hallway_x + 2)
-                        
-                    # Add walls
-                    self._create_room_with_door(zone, room_x, room_y, 
-                                              room_width, room_height,
-                                              hallway_x, building_type)
-                    
-    def _create_room_with_door(self, zone: Zone, x: int, y: int, width: int, height: int,
-                              hallway_x: int, building_type: str) -> None:
-        """Create a room with walls and a door connecting to hallway"""
-        # Create room walls
-        for rx in range(x, x + width):
-            for ry in range(y, y + height):
-                is_wall = (rx == x or rx == x + width - 1 or
-                          ry == y or ry == y + height - 1)
-                if is_wall:
-                    zone.tiles[rx][ry] = Tile(TERRAIN_WALL, TileProperties(
-                        blocks_movement=True,
-                        blocks_sight=True
-                    ))
-                    
-        # Add door connecting to hallway
-        door_y = y + height // 2
-        if x < hallway_x:  # Room is left of hallway
-            door_x = x + width - 1
-        else:  # Room is right of hallway
-            door_x = x
-            
-        # Create door and path to hallway
-        zone.tiles[door_x][door_y] = Tile(TERRAIN_FLOOR, TileProperties())
-        
-        # Add room-specific features
-        self._add_room_features(zone, x, y, width, height, building_type)
-        
-    def _add_room_features(self, zone: Zone, x: int, y: int, width: int, height: int,
-                          building_type: str) -> None:
-        """Add features specific to room type"""
+            for room_y in range(2, height - 3, 4):
+                if rng.random() < 0.8:  # 80% chance for room
+                    room_width = rng.randint(3, 4)
+                    room_height = rng.randint(3, 4)
+                    rooms.append((side, room_y, room_width, room_height,
+                                  self._roll_room_feature(building_type, rng)))
+        return tuple(rooms)
+        
+    def _roll_room_feature(self, building_type: str, rng: random.Random) -> Optional[str]:
+        """Furnishing of a room, by building type"""
         if building_type == "house":
-            if random.random() < 0.3:  # Bedroom
-                # Add bed
-                bed_x = x + 1
-                bed_y = y + 1
-                zone.tiles[bed_x][bed_y].add_furniture("bed")
-                zone.tiles[bed_x + 1][bed_y].add_furniture("bed")
-            elif random.random() < 0.3:  # Kitchen
-                # Add counter
-                for cx in range(x + 1, x + width - 1):
-                    zone.tiles[cx][y + 1].add_furniture("counter")
-                    
+            if rng.random() < 0.3:
+                return "bedroom"
+            elif rng.random() < 0.3:
+                return "kitchen"
         elif building_type == "military":
-            if random.random() < 0.4:  # Barracks
-                # Add beds
-                for bx in range(x + 1, x + width - 1, 2):
-                    zone.tiles[bx][y + 1].add_furniture("bed")
-            elif random.random() < 0.3:  # Armory
-                # Add weapon racks
-                for wx in range(x + 1, x + width - 1):
-                    zone.tiles[wx][y + 1].add_furniture("weapon_rack")
-
-    def _generate_roads(self, zone: Zone) -> None:
-        """Generate roads connecting buildings"""
-        # Simple grid-based roads
-        for x in range(0, zone.width, 8):
-            for y in range(zone.height):
-                if not zone.tiles[x][y].properties.blocks_movement:
-                    zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties(
-                        blocks_movement=False,
-                        blocks_sight=False
-                    ))
-                    
-        for y in range(0, zone.height, 8):
-            for x in range(zone.width):
-                if not zone.tiles[x][y].properties.blocks_movement:
-                    zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties(
-                        blocks_movement=False,
-                        blocks_sight=False
-                    ))
-                    
-    def _generate_tunnels(self, zone: Zone) -> None:
-        """Generate underground tunnels using drunkard's walk"""
-        num_walks = zone.width * zone.height // 50
-        for _ in range(num_walks):
-            x = random.randint(0, zone.width - 1)
-            y = random.randint(0, zone.height - 1)
-            
-            # Perform random walk
-            for _ in range(50):
-                zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
-                dx = random.choice([-1, 0, 1])
-                dy = random.choice([-1, 0, 1])
-                x = max(1, min(zone.width - 2, x + dx))
-                y = max(1, min(zone.height - 2, y + dy))
+            if rng.random() < 0.4:
+                return "barracks"
+            elif rng.random() < 0.3:
+                return "armory"
+        return None
 
     def _add_anomaly_field(self, zone: Zone, x: int, y: int, rng: random.Random) -> None:
         """Add a cluster of anomalies"""
@@ -641,19 +710,8 @@ class MapGenerator:
 
     def _add_crash_site(self, zone: Zone, x: int, y: int, rng: random.Random) -> None:
         """Add a crashed helicopter or vehicle with debris"""
-        # Create central wreckage
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                if abs(dx) + abs(dy) <= 3:  # Diamond shape
-                    wx = x + dx
-                    wy = y + dy
-                    if 0 <= wx < zone.width and 0 <= wy < zone.height:
-                        # Add debris and radiation
-                        zone.tiles[wx][wy] = Tile(TERRAIN_WALL, TileProperties(
-                            blocks_movement=True,
-                            blocks_sight=False,
-                            radiation_level=0.3
-                        ))
+        # Create central wreckage, with debris and radiation
+        zone.paint_blueprint(self.prefabs.crash_site(), x - 2, y - 2)
         
         # Add scattered debris
         for _ in range(rng.randint(4, 8)):
@@ -661,107 +719,116 @@ class MapGenerator:
             dy = rng.randint(-5, 5)
             debris_x = x + dx
             debris_y = y + dy
-            if 0 <= debris_x < zone.width and 0 <= debris_y < zone.height:
-                zone.tiles[debris_x][debris_y] = Tile(TERRAIN_WALL, TileProperties(
-                    blocks_movement=True,
-                    blocks_sight=False
-                ))
+            zone.fill_rect(debris_x, debris_y, 1, 1, TERRAIN_WALL, DEBRIS_PROPERTIES)
 
-    def _generate_forest(self, zone: Zone, zone_x: int, zone_y: int) -> None:
-        """Generate a forest zone"""
-        # Start with basic terrain
-        self._generate_terrain_noise(zone, zone_x, zone_y)
-        
-        # Add more trees
-        for x in range(zone.width):
-            for y in range(zone.height):
-                if (not zone.tiles[x][y].properties.blocks_movement and
-                    not zone.tiles[x][y].properties.is_water):
-                    if random.random() < 0.3:  # 30% chance for trees
-                        zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                            blocks_movement=True,
-                            blocks_sight=True,
-                            moisture_level=0.8
-                        ))
-                        
-        # Add forest clearings and paths
-        self._add_forest_clearings(zone)
-        self._add_forest_paths(zone)
-        
-    def _generate_underground(self, zone: Zone, zone_x: int, zone_y: int) -> None:
-        """Generate an underground zone with tunnels and caves"""
-        # Fill with walls
-        for x in range(zone.width):
-            for y in range(zone.height):
-                zone.tiles[x][y] = Tile(TERRAIN_WALL, TileProperties(
-                    blocks_movement=True,
-                    blocks_sight=True
-                ))
-                
-        # Generate cave system
-        self._generate_tunnels(zone)
+    def _add_forest_cover(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Thicken a forest zone's trees and cut clearings and paths through it"""
+        # Add more trees, on 30% of open ground
+        self._scatter_trees(zone, 0.3, self.zone_array_rng(zone_x, zone_y, "forest_trees"))
         
-        # Add some rooms
-        rooms = self._generate_rooms(zone)
-        self._connect_rooms(zone, rooms)
+        rng = self.zone_rng(zone_x, zone_y, "forest")
+        # Add forest clearings and paths
+        self._add_forest_clearings(zone, rng)
+        self._add_forest_paths(zone, rng)
+        
+    def _fill_walls(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Start an underground zone as solid rock"""
+        zone.paint_mask(np.s_[:, :], TERRAIN_WALL, WALL_PROPERTIES)
+        
+    def _carve_caves(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Carve the cave system: drunkard's walk tunnels, or cellular
+        automata caves when cellular_caves is set"""
+        rng = self.zone_array_rng(zone_x, zone_y, "underground")
+        if self.cellular_caves:
+            floor = cellular_caves(zone.width, zone.height, rng)
+        else:
+            floor = drunkard_walks(zone.width, zone.height, rng)
+        zone.paint_mask(floor, TERRAIN_FLOOR, FLOOR_PROPERTIES)
+        
+    def _add_rooms(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Add rooms to an underground zone and join them with corridors"""
+        rng = self.zone_rng(zone_x, zone_y, "underground_rooms")
+        rooms = self._generate_rooms(zone, rng)
+        self._connect_rooms(zone, rooms, rng)
+        
+    def _add_shallow_water(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Flood open floor where a fine noise field runs high"""
+        water_map = noise_grid(zone_x, zone_y, zone.width, zone.height, 20,
+                               base=self.seed)
+        floor = zone.store.terrain == TERRAIN_IDS[TERRAIN_FLOOR]
+        zone.paint_mask(floor & (water_map > 0.3), TERRAIN_WATER, SHALLOW_WATER_PROPERTIES)
+        
+    def _add_swamp_pools(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Water patches on 30% of walkable tiles; swamp water is slightly radioactive"""
+        rolls = self.zone_array_rng(zone_x, zone_y, "swamp").random((zone.width, zone.height))
+        zone.paint_mask(zone.store.walkable_mask() & (rolls < 0.3),
+                        TERRAIN_WATER, SWAMP_POOL_PROPERTIES)
+        
+    def _add_roads(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Lay a grid of roads every 8 tiles over walkable ground"""
+        roads = np.zeros((zone.width, zone.height), dtype=bool)
+        roads[::8, :] = True
+        roads[:, ::8] = True
+        zone.paint_mask(roads & zone.store.walkable_mask(), TERRAIN_FLOOR, FLOOR_PROPERTIES)
+        
+    def _add_urban_blocks(self, zone: Zone, zone_x: int, zone_y: int) -> None:
+        """Put a house in most blocks between the roads"""
+        rng = self.zone_rng(zone_x, zone_y, "urban")
+        for x in range(2, zone.width - 2, 8):
+            for y in range(2, zone.height - 2, 8):
+                if rng.random() < 0.7:  # 70% chance for a building
+                    # Sized to stay clear of the roads around the block
+                    self._generate_building(zone, x, y, "house", rng, 6, 6)
         
-    def _add_forest_clearings(self, zone: Zone) -> None:
+    def _add_forest_clearings(self, zone: Zone, rng: random.Random) -> None:
         """Add some clearings in the forest"""
-        num_clearings = random.randint(2, 4)
+        clearings = np.zeros((zone.width, zone.height), dtype=bool)
+        num_clearings = rng.randint(2, 4)
         for _ in range(num_clearings):
-            x = random.randint(5, zone.width - 10)
-            y = random.randint(5, zone.height - 10)
-            radius = random.randint(3, 6)
-            
-            for dx in range(-radius, radius + 1):
-                for dy in range(-radius, radius + 1):
-                    if dx*dx + dy*dy <= radius*radius:
-                        clear_x = x + dx
-                        clear_y = y + dy
-                        if (0 <= clear_x < zone.width and 
-                            0 <= clear_y < zone.height):
-                            zone.tiles[clear_x][clear_y] = Tile(
-                                TERRAIN_FLOOR, 
-                                TileProperties()
-                            )
-                            
-    def _add_forest_paths(self, zone: Zone) -> None:
+            x = rng.randint(5, zone.width - 10)
+            y = rng.randint(5, zone.height - 10)
+            radius = rng.randint(3, 6)
+            stamp(clearings, disc_kernel(radius), x, y)
+        zone.paint_mask(clearings, TERRAIN_FLOOR, FLOOR_PROPERTIES)
+        
+    def _add_forest_paths(self, zone: Zone, rng: random.Random) -> None:
         """Add winding paths through the forest"""
         # Create a few random paths
-        num_paths = random.randint(2, 4)
+        paths = np.zeros((zone.width, zone.height), dtype=bool)
+        num_paths = rng.randint(2, 4)
         for _ in range(num_paths):
             # Start from edge
-            if random.random() < 0.5:
-                x = random.choice([0, zone.width - 1])
-                y = random.randint(0, zone.height - 1)
+            if rng.random() < 0.5:
+                x = rng.choice([0, zone.width - 1])
+                y = rng.randint(0, zone.height - 1)
             else:
-                x = random.randint(0, zone.width - 1)
-                y = random.choice([0, zone.height - 1])
+                x = rng.randint(0, zone.width - 1)
+                y = rng.choice([0, zone.height - 1])
                 
             # Winding path
             for _ in range(50):
                 if 0 <= x < zone.width and 0 <= y < zone.height:
-                    zone.tiles[x][y] = Tile(TERRAIN_FLOOR, TileProperties())
+                    paths[x, y] = True
                     # Random direction with tendency toward center
-                    dx = random.choice([-1, 0, 1])
-                    dy = random.choice([-1, 0, 1])
+                    dx = rng.choice([-1, 0, 1])
+                    dy = rng.choice([-1, 0, 1])
                     if x < zone.width // 2:
-                        dx += random.choice([0, 1])
+                        dx += rng.choice([0, 1])
                     else:
-                        dx += random.choice([-1, 0])
+                        dx += rng.choice([-1, 0])
                     if y < zone.height // 2:
-                        dy += random.choice([0, 1])
+                        dy += rng.choice([0, 1])
                     else:
-                        dy += random.choice([-1, 0])
+                        dy += rng.choice([-1, 0])
                     x = max(0, min(zone.width - 1, x + dx))
                     y = max(0, min(zone.height - 1, y + dy))
+        zone.paint_mask(paths, TERRAIN_FLOOR, FLOOR_PROPERTIES)
 
     def _spawn_enemies(self, zone: Zone, zone_x: int, zone_y: int) -> None:
         """Spawn enemies in the zone"""
         from ..entities.enemies import Enemy  # Import here to avoid circular imports
         
-        # Use deterministic random based on zone coordinates
-        rng = random.Random(hash((zone_x, zone_y, self.seed + 1)))
+        rng = self.zone_rng(zone_x, zone_y, "enemies")
         
         # Define enemy types and spawn chances for each zone type
         spawn_tables = {
@@ -777,75 +844,69 @@ class MapGenerator:
             "underground": [
                 ("zombie", 0.4),
                 ("mutant", 0.3)
+            ],
+            "swamp": [
+                ("mutant", 0.5),
+                ("zombie", 0.4)
+            ],
+            "urban": [
+                ("zombie", 0.4),
+                ("mutant", 0.3)
             ]
         }
         
         # Get spawn table for this zone type
         spawns = spawn_tables.get(zone.zone_type, [])
         
+        # Only spawn in the main walkable region, not in sealed-off pockets
+        main_region = zone.store.walkable_bitboard().largest_region()
+        
         # Determine number of enemies to spawn
         num_enemies = rng.randint(3, 8)
         
-        # Try to spawn enemies
+        # Roll which enemies spawn
+        enemy_types = []
         for _ in range(num_enemies):
             if spawns:
                 enemy_type, chance = rng.choice(spawns)
                 if rng.random() < chance:
-                    # Find valid spawn location
-                    for _ in range(20):  # Try 20 times to find spot
-                        x = rng.randint(5, zone.width - 5)
-                        y = rng.randint(5, zone.height - 5)
-                        if zone.is_walkable(x, y):
-                            # Create enemy
-                            enemy = Enemy(x, y, "E", (255, 0, 0), enemy_type)
-                            enemy.game_state = zone.game_state
-                            zone.add_entity(enemy)
-                            break 
+                    enemy_types.append(enemy_type)
+                    
+        # Spread them out over the main region, away from the edges
+        locations = self._sample_locations(main_region.to_mask(), 5, 5,
+                                           zone.width - 5, zone.height - 5,
+                                           self.enemy_spacing, len(enemy_types), rng)
+        for enemy_type, (x, y) in zip(enemy_types, locations):
+            enemy = Enemy(x, y, "E", (255, 0, 0), enemy_type)
+            enemy.game_state = zone.game_state
+            enemy.spawn_id = len(zone.entities)  # Matched up in zone deltas
+            zone.add_entity(enemy)
 
-    def _create_village_roads(self, zone: Zone, center_x: int, center_y: int, size: int) -> None:
+    def _create_village_roads(self, zone: Zone, center_x: int, center_y: int, size: int,
+                              rng: random.Random) -> None:
         """Create a simple road network for a village"""
         # Create main road (horizontal)
-        for x in range(center_x - size, center_x + size):
-            if 0 <= x < zone.width and 0 <= center_y < zone.height:
-                zone.tiles[x][center_y] = Tile(TERRAIN_FLOOR, TileProperties(
-                    blocks_movement=False,
-                    blocks_sight=False
-                ))
+        zone.fill_rect(center_x - size, center_y, 2 * size, 1, TERRAIN_FLOOR, FLOOR_PROPERTIES)
                 
         # Create cross road (vertical)
-        for y in range(center_y - size, center_y + size):
-            if 0 <= center_x < zone.width and 0 <= y < zone.height:
-                zone.tiles[center_x][y] = Tile(TERRAIN_FLOOR, TileProperties(
-                    blocks_movement=False,
-                    blocks_sight=False
-                ))
+        zone.fill_rect(center_x, center_y - size, 1, 2 * size, TERRAIN_FLOOR, FLOOR_PROPERTIES)
                 
         # Add some smaller side roads
         for _ in range(3):  # Add 3 side roads
             # Choose random points along main roads
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 # Horizontal side road
-                x = center_x + random.randint(-size+2, size-2)
-                y = center_y + random.choice([-size//2, size//2])
-                length = random.randint(3, 6)
+                x = center_x + rng.randint(-size+2, size-2)
+                y = center_y + rng.choice([-size//2, size//2])
+                length = rng.randint(3, 6)
                 
-                for dy in range(length):
-                    road_y = y + dy if y < center_y else y - dy
-                    if 0 <= x < zone.width and 0 <= road_y < zone.height:
-                        zone.tiles[x][road_y] = Tile(TERRAIN_FLOOR, TileProperties(
-                            blocks_movement=False,
-                            blocks_sight=False
-                        ))
+                end_y = y + length - 1 if y < center_y else y - length + 1
+                zone.draw_line(x, y, x, end_y, TERRAIN_FLOOR, FLOOR_PROPERTIES)
             else:
                 # Vertical side road
-                x = center_x + random.choice([-size//2, size//2])
-                y = center_y + random.randint(-size+2, size-2)
-                length = random.randint(3, 6)
+                x = center_x + rng.choice([-size//2, size//2])
+                y = center_y + rng.randint(-size+2, size-2)
+                length = rng.randint(3, 6)
                 
-                for dx in range(length):
-                    road_x = x + dx if x < center_x else x - dx
-                    if 0 <= road_x < zone.width and 0 <= y < zone.height:
-                        zone.tiles[road_x][y] = Tile(TERRAIN_FLOOR, TileProperties(
-                            blocks_movement=False,
-                            blocks_sight=False
-                        )) 
\ No newline at end of file
+                end_x = x + length - 1 if x < center_x else x - length + 1
+                zone.draw_line(x, y, end_x, y, TERRAIN_FLOOR, FLOOR_PROPERTIES) 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from functools import lru_cache
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def disc_kernel(radius: int) -> np.ndarray:
+    """Read-only (2r+1) x (2r+1) bool mask of the cells within radius of its centre"""
+    offsets = np.arange(-radius, radius + 1)
+    kernel = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius * radius
+    kernel.flags.writeable = False
+    return kernel
+
+
+def stamp(mask: np.ndarray, kernel: np.ndarray, x: int, y: int) -> None:
+    """Set the cells of `mask` covered by `kernel` centred on (x, y),
+    clipping the kernel at the edges of the mask"""
+    half_w, half_h = kernel.shape[0] // 2, kernel.shape[1] // 2
+    x0, y0 = x - half_w, y - half_h
+    x1, y1 = x0 + kernel.shape[0], y0 + kernel.shape[1]
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x1, mask.shape[0]), min(y1, mask.shape[1])
+    if cx0 >= cx1 or cy0 >= cy1:
+        return
+    mask[cx0:cx1, cy0:cy1] |= kernel[cx0 - x0:cx1 - x0, cy0 - y0:cy1 - y0]
@@ -0,0 +1,145 @@
+from typing import Tuple
+from functools import lru_cache
+import numpy as np
+
+# Ken Perlin's reference permutation, as used by the `noise` package.
+# The C implementation stores it twice (512 entries); the table is periodic,
+# so wrapping every lookup with `& 255` gives identical results.
+# Base 0 uses it as is; every other base gets its own shuffle of it.
+PERM = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.int32)
+
+# First two components of the GRAD3 table used by `noise.pnoise2`
+GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0, 1, -1, 0, 0],
+                  dtype=np.float32)
+GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1, 0, 0, -1, 1],
+                  dtype=np.float32)
+
+
+@lru_cache(maxsize=64)
+def _permutation(base: int) -> np.ndarray:
+    """Permutation table for a noise base.
+
+    `noise.pnoise2` adds the base to the lattice coordinates, which only
+    shifts the pattern by `base mod 256` and reads past its table for large
+    bases. Seeding a shuffle with the whole base instead gives every base
+    (i.e. every world seed) its own field.
+    """
+    if base == 0:
+        return PERM
+    rng = np.random.default_rng(base & 0xFFFFFFFFFFFFFFFF)
+    return PERM[rng.permutation(256)]
+
+
+def _perm(perm: np.ndarray, index: np.ndarray) -> np.ndarray:
+    return perm[index & 255]
+
+
+def _grad(hash_: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    h = hash_ & 15
+    return x * GRAD_X[h] + y * GRAD_Y[h]
+
+
+def _noise2(x: np.ndarray, y: np.ndarray, repeatx: np.float32,
+            repeaty: np.float32, base: int) -> np.ndarray:
+    """Single octave of improved Perlin noise over float32 coordinate arrays"""
+    i = np.floor(np.fmod(x, repeatx)).astype(np.int32)
+    j = np.floor(np.fmod(y, repeaty)).astype(np.int32)
+    ii = np.fmod((i + 1).astype(np.float32), repeatx).astype(np.int32)
+    jj = np.fmod((j + 1).astype(np.float32), repeaty).astype(np.int32)
+    perm = _permutation(base)
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    fx = x * x * x * (x * (x * np.float32(6) - np.float32(15)) + np.float32(10))
+    fy = y * y * y * (y * (y * np.float32(6) - np.float32(15)) + np.float32(10))
+
+    a = _perm(perm, i)
+    aa = _perm(perm, a + j)
+    ab = _perm(perm, a + jj)
+    b = _perm(perm, ii)
+    ba = _perm(perm, b + j)
+    bb = _perm(perm, b + jj)
+
+    one = np.float32(1)
+    x1 = _grad(_perm(perm, aa), x, y)
+    x1 = x1 + fx * (_grad(_perm(perm, ba), x - one, y) - x1)
+    x2 = _grad(_perm(perm, ab), x, y - one)
+    x2 = x2 + fx * (_grad(_perm(perm, bb), x - one, y - one) - x2)
+    return x1 + fy * (x2 - x1)
+
+
+def pnoise2(x, y, octaves: int = 1, persistence: float = 0.5,
+            lacunarity: float = 2.0, repeatx: float = 1024.0,
+            repeaty: float = 1024.0, base: int = 0) -> np.ndarray:
+    """Vectorized equivalent of `noise.pnoise2` for arrays of coordinates.
+
+    Identical to it for base 0; other bases select a seeded permutation
+    (see _permutation) rather than offsetting the lattice.
+    """
+    if octaves < 1:
+        raise ValueError("Expected octaves value > 0")
+
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    repeatx = np.float32(repeatx)
+    repeaty = np.float32(repeaty)
+    base = int(base)
+
+    if octaves == 1:
+        return _noise2(x, y, repeatx, repeaty, base)
+
+    # Accumulate in float32 exactly like the C implementation
+    persistence = np.float32(persistence)
+    lacunarity = np.float32(lacunarity)
+    freq = np.float32(1)
+    amp = np.float32(1)
+    max_amp = np.float32(0)
+    total = np.zeros(np.broadcast(x, y).shape, dtype=np.float32)
+    for _ in range(octaves):
+        total += _noise2(x * freq, y * freq, repeatx * freq, repeaty * freq,
+                         base) * amp
+        max_amp += amp
+        freq *= lacunarity
+        amp *= persistence
+    return total / max_amp
+
+
+def world_grid(zone_x: int, zone_y: int, width: int,
+               height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """World tile coordinates of a zone, as arrays indexed [x, y]"""
+    xs = np.arange(width, dtype=np.float64) + zone_x * width
+    ys = np.arange(height, dtype=np.float64) + zone_y * height
+    return np.meshgrid(xs, ys, indexing="ij")
+
+
+def noise_grid(zone_x: int, zone_y: int, width: int, height: int,
+               scale: float, octaves: int = 1, persistence: float = 0.5,
+               lacunarity: float = 2.0, base: int = 0) -> np.ndarray:
+    """Sample fBm noise for every tile of a zone in one call.
+
+    Matches `noise.pnoise2(world_x / scale, world_y / scale, ...)` evaluated
+    per tile, and returns a float32 array indexed [x, y] like `Zone.tiles`.
+    """
+    world_x, world_y = world_grid(zone_x, zone_y, width, height)
+    return pnoise2(world_x / scale, world_y / scale,
+                   octaves=octaves,
+                   persistence=persistence,
+                   lacunarity=lacunarity,
+                   base=base)
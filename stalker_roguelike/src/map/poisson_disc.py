@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import Optional
+import math
+import numpy as np
+
+BATCH_SIZE = 256  # Candidates screened against the grid at once
+MAX_ROUND_KERNEL = 21  # Largest exclusion kernel sampled in vectorized rounds
+
+
+@lru_cache(maxsize=None)
+def exclusion_kernel(spacing: float) -> np.ndarray:
+    """Read-only mask of the offsets closer than spacing to its centre"""
+    reach = max(0, math.ceil(spacing) - 1)
+    offsets = np.arange(-reach, reach + 1)
+    kernel = offsets[:, None] ** 2 + offsets[None, :] ** 2 < spacing * spacing
+    kernel.flags.writeable = False
+    return kernel
+
+
+def poisson_disc(mask: np.ndarray, spacing: float, rng: np.random.Generator,
+                 max_points: Optional[int] = None) -> np.ndarray:
+    """Blue-noise sample of the cells of `mask`: an (n, 2) array of [x, y]
+    positions, no two closer than spacing.
+
+    Dart throwing: candidates are visited in a random order and accepted
+    unless an accepted point is too close, checked on an occupancy grid at
+    tile resolution. Without max_points the sample is maximal, leaving no
+    room for another point. With it, the first max_points accepted are
+    spread evenly over the mask rather than grown out from one corner.
+    """
+    if max_points is not None and max_points <= 0:
+        return np.empty((0, 2), dtype=np.intp)
+    kernel = exclusion_kernel(spacing)
+    candidates = np.argwhere(mask)
+    order = rng.permutation(len(candidates))
+    if kernel.sum() <= MAX_ROUND_KERNEL:
+        return _sample_in_rounds(mask, kernel, candidates, order, max_points)
+    return _sample_in_order(mask, kernel, candidates[order], max_points)
+
+
+def _sample_in_order(mask: np.ndarray, kernel: np.ndarray, candidates: np.ndarray,
+                     max_points: Optional[int]) -> np.ndarray:
+    """Visit candidates one by one, dropping whole batches of already
+    blocked ones with one lookup. Cheap when few points fit."""
+    reach = kernel.shape[0] // 2
+    # Pad the grid so that blocking never needs clipping at the edges
+    blocked = np.pad(~mask, reach, constant_values=True)
+    candidates = candidates + reach
+
+    points = []
+    for start in range(0, len(candidates), BATCH_SIZE):
+        batch = candidates[start:start + BATCH_SIZE]
+        for x, y in batch[~blocked[batch[:, 0], batch[:, 1]]].tolist():
+            if blocked[x, y]:
+                continue  # Blocked by a point accepted earlier in this batch
+            points.append((x - reach, y - reach))
+            blocked[x - reach:x + reach + 1, y - reach:y + reach + 1] |= kernel
+            if len(points) == max_points:
+                return np.array(points, dtype=np.intp)
+    return np.array(points, dtype=np.intp).reshape(-1, 2)
+
+
+def _sample_in_rounds(mask: np.ndarray, kernel: np.ndarray, candidates: np.ndarray,
+                      order: np.ndarray, max_points: Optional[int]) -> np.ndarray:
+    """Same result as _sample_in_order, for dense samples with small kernels.
+
+    A candidate that comes first in the order among all undecided
+    candidates around it is accepted by the one by one walk, so each round
+    accepts every such candidate at once and blocks their surroundings.
+    Random orders settle in a handful of rounds.
+    """
+    width, height = mask.shape
+    reach = kernel.shape[0] // 2
+    offsets = np.argwhere(kernel).tolist()
+    unvisited = len(candidates)  # Rank of cells that are not candidates
+
+    rank = np.full((width + 2 * reach, height + 2 * reach), unvisited, dtype=np.int32)
+    rank[candidates[order, 0] + reach, candidates[order, 1] + reach] = np.arange(len(order))
+    open_cells = np.pad(mask, reach, constant_values=False)
+    accepted = np.zeros_like(open_cells)
+    inner = np.s_[reach:reach + width, reach:reach + height]
+
+    while open_cells.any():
+        live_rank = np.where(open_cells, rank, unvisited)
+        first = np.full((width, height), unvisited, dtype=np.int32)
+        for dx, dy in offsets:
+            np.minimum(first, live_rank[dx:dx + width, dy:dy + height], out=first)
+        winners = open_cells[inner] & (live_rank[inner] == first)
+        accepted[inner] |= winners
+
+        covered = np.zeros_like(open_cells)
+        for dx, dy in offsets:
+            covered[dx:dx + width, dy:dy + height] |= winners
+        open_cells &= ~covered
+
+    points = np.argwhere(accepted[inner])
+    points = points[np.argsort(rank[inner][accepted[inner]], kind="stable")]
+    return points[:max_points]
@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import numpy as np
+from .tile import (
+    TileProperties, FLOOR_PROPERTIES, WALL_PROPERTIES, WRECKAGE_PROPERTIES
+)
+from .tile_store import FURNITURE_IDS
+from ..constants import TERRAIN_FLOOR, TERRAIN_WALL
+
+# Blueprint cell codes. 0 leaves the zone's tile as it is; any other code
+# paints PALETTE[code - 1].
+FLOOR, WALL, WRECKAGE = 1, 2, 3
+PALETTE: Tuple[Tuple[str, TileProperties], ...] = (
+    (TERRAIN_FLOOR, FLOOR_PROPERTIES),
+    (TERRAIN_WALL, WALL_PROPERTIES),
+    (TERRAIN_WALL, WRECKAGE_PROPERTIES)
+)
+
+BUILDING_SIZES = range(8, 13)  # Width and height drawn by _generate_building
+ROOM_SIZES = range(3, 5)
+ROOM_FEATURES = {
+    "house": (None, "bedroom", "kitchen"),
+    "military": (None, "barracks", "armory")
+}
+MAX_CACHED_BUILDINGS = 4096
+
+# One interior room: (side of the hallway, y offset, width, height, feature)
+RoomSpec = Tuple[int, int, int, int, Optional[str]]
+
+
+class Blueprint:
+    """A prefab as small arrays indexed [x, y]: cell codes and furniture ids"""
+
+    def __init__(self, cells: np.ndarray, furniture: Optional[np.ndarray] = None):
+        self.cells = cells
+        self.furniture = furniture if furniture is not None else np.zeros_like(cells)
+        # (terrain, properties, mask) for each palette entry in use, so
+        # stamping is one bulk write per entry
+        self.strokes = [(PALETTE[code - 1][0], PALETTE[code - 1][1], cells == code)
+                        for code in np.unique(cells).tolist() if code]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.cells.shape
+
+    @classmethod
+    def blank(cls, width: int, height: int) -> "Blueprint":
+        return cls(np.zeros((width, height), dtype=np.uint8))
+
+    def fill_rect(self, x: int, y: int, width: int, height: int, code: int) -> None:
+        self.cells[x:x + width, y:y + height] = code
+        self.furniture[x:x + width, y:y + height] = 0
+
+    def outline_rect(self, x: int, y: int, width: int, height: int, code: int) -> None:
+        for region in (np.s_[x:x + width, y], np.s_[x:x + width, y + height - 1],
+                       np.s_[x, y:y + height], np.s_[x + width - 1, y:y + height]):
+            self.cells[region] = code
+            self.furniture[region] = 0
+
+    def paste(self, other: "Blueprint", x: int, y: int) -> None:
+        """Copy the painted cells of another blueprint in at (x, y)"""
+        width, height = other.shape
+        painted = other.cells != 0
+        self.cells[x:x + width, y:y + height][painted] = other.cells[painted]
+        # Furniture also stands on unpainted cells, on top of what shows through
+        placed = painted | (other.furniture != 0)
+        self.furniture[x:x + width, y:y + height][placed] = other.furniture[placed]
+
+    def freeze(self) -> "Blueprint":
+        """Lock the arrays and return a blueprint whose strokes match the final cells"""
+        self.cells.flags.writeable = False
+        self.furniture.flags.writeable = False
+        return Blueprint(self.cells, self.furniture)
+
+
+class PrefabLibrary:
+    """Blueprints for buildings, military outposts and crash sites.
+
+    Building layouts only vary by size, type and the interior room rolls, so
+    each distinct combination is composed once from cached shells and rooms
+    and then stamped into zones as a handful of array copies. The library can
+    be precomputed and saved to disk, and loaded back at start-up.
+    """
+
+    def __init__(self):
+        self.blueprints: Dict[str, Blueprint] = {}
+        self._buildings: "OrderedDict[str, Blueprint]" = OrderedDict()
+
+    def __getstate__(self) -> Dict:
+        # Composed buildings are rebuilt from the cached shells and rooms on
+        # demand, so a library sent to a worker process stays small
+        state = self.__dict__.copy()
+        state["_buildings"] = OrderedDict()
+        return state
+
+    def building(self, width: int, height: int, building_type: str,
+                 rooms: Tuple[RoomSpec, ...]) -> Blueprint:
+        """A building of the given size with the given interior rooms"""
+        key = (f"building:{width}x{height}:{building_type}:" +
+               ";".join(f"{side},{y},{w},{h},{feature or ''}"
+                        for side, y, w, h, feature in rooms))
+        blueprint = self._buildings.get(key)
+        if blueprint is not None:
+            self._buildings.move_to_end(key)
+            return blueprint
+
+        composed = Blueprint(self._shell(width, height).cells.copy(),
+                             self._shell(width, height).furniture.copy())
+        hallway_x = width // 2
+        for side, room_y, room_width, room_height, feature in rooms:
+            if side < 0:
+                room_x = max(1, hallway_x - room_width - 1)
+            else:
+                room_x = min(width - room_width - 1, hallway_x + 2)
+            door_east = room_x < hallway_x  # The door faces the hallway
+            composed.paste(self._room(room_width, room_height, door_east, feature),
+                           room_x, room_y)
+
+        blueprint = composed.freeze()
+        self._buildings[key] = blueprint
+        if len(self._buildings) > MAX_CACHED_BUILDINGS:
+            self._buildings.popitem(last=False)
+        return blueprint
+
+    def outpost_perimeter(self) -> Blueprint:
+        """Defensive wall with a gate and four corner towers, 12x16"""
+        def build():
+            perimeter = Blueprint.blank(12, 16)
+            perimeter.outline_rect(0, 0, 12, 16, WALL)
+            perimeter.fill_rect(5, 15, 2, 1, FLOOR)  # Gate
+            for tower_x, tower_y in ((0, 0), (10, 0), (0, 14), (10, 14)):
+                perimeter.fill_rect(tower_x, tower_y, 2, 2, WALL)
+            return perimeter
+        return self._cached("outpost_perimeter", build)
+
+    def crash_site(self) -> Blueprint:
+        """Central wreckage: a 5x5 diamond with only the corners missing"""
+        def build():
+            offsets = np.abs(np.arange(-2, 3))
+            wreckage = Blueprint.blank(5, 5)
+            wreckage.cells[np.add.outer(offsets, offsets) <= 3] = WRECKAGE
+            return wreckage
+        return self._cached("crash_site", build)
+
+    def precompute(self) -> int:
+        """Build every shell, room, outpost and crash site blueprint up front"""
+        for width in BUILDING_SIZES:
+            for height in BUILDING_SIZES:
+                self._shell(width, height)
+        for features in ROOM_FEATURES.values():
+            for feature in features:
+                for width in ROOM_SIZES:
+                    for height in ROOM_SIZES:
+                        for door_east in (False, True):
+                            self._room(width, height, door_east, feature)
+        self.outpost_perimeter()
+        self.crash_site()
+        return len(self.blueprints)
+
+    def save(self, path: str) -> None:
+        arrays = {}
+        for key, blueprint in list(self.blueprints.items()) + list(self._buildings.items()):
+            arrays[f"{key}|cells"] = blueprint.cells
+            arrays[f"{key}|furniture"] = blueprint.furniture
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "PrefabLibrary":
+        library = cls()
+        with np.load(path) as arrays:
+            for name in arrays.files:
+                key, layer = name.rsplit("|", 1)
+                if layer == "cells":
+                    blueprint = Blueprint(arrays[name], arrays[f"{key}|furniture"]).freeze()
+                    cache = library._buildings if key.startswith("building:") else library.blueprints
+                    cache[key] = blueprint
+        return library
+
+    def _cached(self, key: str, build) -> Blueprint:
+        blueprint = self.blueprints.get(key)
+        if blueprint is None:
+            blueprint = self.blueprints[key] = build().freeze()
+        return blueprint
+
+    def _shell(self, width: int, height: int) -> Blueprint:
+        """Outer walls, floor and the central hallway"""
+        def build():
+            shell = Blueprint.blank(width, height)
+            shell.fill_rect(0, 0, width, height, FLOOR)
+            shell.outline_rect(0, 0, width, height, WALL)
+            shell.fill_rect(width // 2, 1, 1, height - 2, FLOOR)
+            return shell
+        return self._cached(f"shell:{width}x{height}", build)
+
+    def _room(self, width: int, height: int, door_east: bool,
+              feature: Optional[str]) -> Blueprint:
+        """Walls, a door on the hallway side and the room's furniture. The
+        inside is left unpainted so the building floor shows through."""
+        def build():
+            room = Blueprint.blank(width, height)
+            room.outline_rect(0, 0, width, height, WALL)
+            room.fill_rect(width - 1 if door_east else 0, height // 2, 1, 1, FLOOR)
+            for x, y, furniture_type in _room_furniture(width, feature):
+                room.furniture[x, y] = FURNITURE_IDS[furniture_type]
+            return room
+        door = "east" if door_east else "west"
+        return self._cached(f"room:{width}x{height}:{door}:{feature or ''}", build)
+
+
+def _room_furniture(width: int, feature: Optional[str]) -> List[Tuple[int, int, str]]:
+    """(x, y, furniture) placed along a room's back wall"""
+    if feature == "bedroom":
+        return [(1, 1, "bed"), (2, 1, "bed")]
+    if feature == "kitchen":
+        return [(x, 1, "counter") for x in range(1, width - 1)]
+    if feature == "barracks":
+        return [(x, 1, "bed") for x in range(1, width - 1, 2)]
+    if feature == "armory":
+        return [(x, 1, "weapon_rack") for x in range(1, width - 1)]
+    return []
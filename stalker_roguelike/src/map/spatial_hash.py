@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import heapq
+import math
+
+DEFAULT_CELL_SIZE = 4  # Tiles per bucket side
+
+# Optional filter on query results, e.g. lambda e: e.faction != "mutants"
+Predicate = Optional[Callable[[Any], bool]]
+
+
+class SpatialHash:
+    """Uniform grid of buckets over objects with integer x and y.
+
+    Each object sits in the bucket of the cell holding its position, so a
+    query only looks at the buckets it overlaps, however many objects the
+    zone holds. Objects must be re-bucketed through update() after they
+    move. Queries take an optional `kind` (a class, or tuple of classes,
+    the results must be instances of) and `where` predicate.
+    """
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE, objects: Iterable = ()):
+        self.cell_size = cell_size
+        self._buckets: Dict[Tuple[int, int], List] = {}
+        self._cells: Dict[int, Tuple[int, int]] = {}  # id(object): its bucket
+        for obj in objects:
+            self.insert(obj)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, obj) -> bool:
+        return id(obj) in self._cells
+
+    def insert(self, obj) -> None:
+        if id(obj) in self._cells:
+            return
+        cell = (obj.x // self.cell_size, obj.y // self.cell_size)
+        self._cells[id(obj)] = cell
+        self._buckets.setdefault(cell, []).append(obj)
+
+    def remove(self, obj) -> None:
+        cell = self._cells.pop(id(obj), None)
+        if cell is None:
+            return
+        bucket = self._buckets[cell]
+        bucket.remove(obj)
+        if not bucket:
+            del self._buckets[cell]
+
+    def update(self, obj) -> None:
+        """Re-bucket an object after its position changed. Objects that
+        were never inserted are ignored."""
+        cell = self._cells.get(id(obj))
+        if cell is None:
+            return
+        new_cell = (obj.x // self.cell_size, obj.y // self.cell_size)
+        if new_cell != cell:
+            self.remove(obj)
+            self.insert(obj)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._cells.clear()
+
+    def at(self, x: int, y: int, kind=None, where: Predicate = None) -> List:
+        """Objects standing on (x, y)"""
+        bucket = self._buckets.get((x // self.cell_size, y // self.cell_size), ())
+        return [obj for obj in bucket
+                if obj.x == x and obj.y == y and _accepts(obj, kind, where)]
+
+    def in_rect(self, x0: int, y0: int, x1: int, y1: int, kind=None,
+                where: Predicate = None) -> List:
+        """Objects in [x0, x1) x [y0, y1)"""
+        found = []
+        if x0 >= x1 or y0 >= y1:
+            return found
+        size = self.cell_size
+        cells_x = range(x0 // size, (x1 - 1) // size + 1)
+        cells_y = range(y0 // size, (y1 - 1) // size + 1)
+        if len(cells_x) * len(cells_y) > len(self._buckets):
+            # Fewer occupied buckets than cells to look at: walk those instead
+            buckets = [bucket for (cell_x, cell_y), bucket in self._buckets.items()
+                       if cell_x in cells_x and cell_y in cells_y]
+        else:
+            buckets = [self._buckets.get((cell_x, cell_y), ())
+                       for cell_x in cells_x for cell_y in cells_y]
+        for bucket in buckets:
+            for obj in bucket:
+                if (x0 <= obj.x < x1 and y0 <= obj.y < y1 and
+                        _accepts(obj, kind, where)):
+                    found.append(obj)
+        return found
+
+    def in_radius(self, x: int, y: int, radius: float, kind=None,
+                  where: Predicate = None) -> List:
+        """Objects at most radius away from (x, y)"""
+        reach = int(radius)
+        limit = radius * radius
+        return [obj for obj in self.in_rect(x - reach, y - reach, x + reach + 1,
+                                            y + reach + 1, kind, where)
+                if (obj.x - x) ** 2 + (obj.y - y) ** 2 <= limit]
+
+    def nearest(self, x: int, y: int, k: int = 1, max_radius: Optional[float] = None,
+                kind=None, where: Predicate = None) -> List:
+        """Up to k objects closest to (x, y), nearest first.
+
+        Buckets are visited in square rings around the one holding (x, y),
+        stopping once no further ring can hold anything closer than the
+        k-th object found so far.
+        """
+        if k <= 0:
+            return []
+        size = self.cell_size
+        limit = math.inf if max_radius is None else max_radius * max_radius
+        if max_radius is not None:
+            cells_across = 2 * (int(max_radius) // size) + 3
+            if cells_across ** 2 > len(self._buckets):
+                # Sparse: checking every object beats visiting the empty cells
+                return _closest(self._buckets.values(), x, y, k, limit, kind, where)
+
+        center_x, center_y = x // size, y // size
+        # Distance from (x, y) to the nearest side of its own cell
+        margin = min(x - center_x * size, (center_x + 1) * size - 1 - x,
+                     y - center_y * size, (center_y + 1) * size - 1 - y)
+        best: List[Tuple[int, int, Any]] = []  # Max-heap of (-distance², order, object)
+        seen = 0
+        ring = 0
+        while seen < len(self._cells):
+            # Everything in this ring or beyond is at least this far away
+            closest = (ring - 1) * size + 1 + margin if ring else 0
+            if closest * closest > limit:
+                break
+            if len(best) == k and closest * closest > -best[0][0]:
+                break
+            for cell in _ring(center_x, center_y, ring):
+                for obj in self._buckets.get(cell, ()):
+                    seen += 1
+                    distance = (obj.x - x) ** 2 + (obj.y - y) ** 2
+                    if distance > limit or not _accepts(obj, kind, where):
+                        continue
+                    entry = (-distance, -seen, obj)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, entry)
+            ring += 1
+        return [obj for _, _, obj in sorted(best, reverse=True)]
+
+
+def _closest(buckets: Iterable[List], x: int, y: int, k: int, limit: float,
+             kind, where: Predicate) -> List:
+    """The k objects in the buckets closest to (x, y), within limit (squared)"""
+    candidates = []
+    for bucket in buckets:
+        for obj in bucket:
+            distance = (obj.x - x) ** 2 + (obj.y - y) ** 2
+            if distance <= limit and _accepts(obj, kind, where):
+                candidates.append((distance, len(candidates), obj))
+    return [obj for _, _, obj in heapq.nsmallest(k, candidates)]
+
+
+def _accepts(obj, kind, where: Predicate) -> bool:
+    return (kind is None or isinstance(obj, kind)) and (where is None or where(obj))
+
+
+def _ring(center_x: int, center_y: int, ring: int) -> List[Tuple[int, int]]:
+    """Cells on the square of the given radius around a cell"""
+    if ring == 0:
+        return [(center_x, center_y)]
+    cells = []
+    for offset in range(-ring, ring + 1):
+        cells.append((center_x + offset, center_y - ring))
+        cells.append((center_x + offset, center_y + ring))
+    for offset in range(-ring + 1, ring):
+        cells.append((center_x - ring, center_y + offset))
+        cells.append((center_x + ring, center_y + offset))
+    return cells
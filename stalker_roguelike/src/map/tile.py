@@ -1,9 +1,10 @@
-from typing import Dict, Optional
-from dataclasses import dataclass
+from typing import Optional
+from dataclasses import dataclass, replace
+import weakref
 import pygame
 from ..constants import TILE_SIZE
 
-@dataclass
+@dataclass(frozen=True)
 class TileProperties:
     blocks_movement: bool = False
     blocks_sight: bool = False
@@ -13,20 +14,51 @@ class TileProperties:
     anomaly_type: Optional[str] = None
     danger_level: float = 0.0
     
+# Canonical instances shared by every tile with equal properties. Entries
+# drop out once no tile references them any more.
+_interned: "weakref.WeakValueDictionary[TileProperties, TileProperties]" = \
+    weakref.WeakValueDictionary()
+
+def intern_properties(properties: TileProperties) -> TileProperties:
+    """Return the shared instance equal to properties"""
+    canonical = _interned.get(properties)
+    if canonical is None:
+        _interned[properties] = canonical = properties
+    return canonical
+
+# Property combinations the generators use for nearly every tile
+FLOOR_PROPERTIES = intern_properties(TileProperties())
+WALL_PROPERTIES = intern_properties(TileProperties(
+    blocks_movement=True, blocks_sight=True))
+SHALLOW_WATER_PROPERTIES = intern_properties(TileProperties(is_water=True))
+DEEP_WATER_PROPERTIES = intern_properties(TileProperties(
+    is_water=True, blocks_movement=True))
+SWAMP_PROPERTIES = intern_properties(TileProperties(
+    is_water=True, radiation_level=0.2))
+TREE_PROPERTIES = intern_properties(TileProperties(
+    blocks_movement=True, blocks_sight=True, moisture_level=0.8))
+DEBRIS_PROPERTIES = intern_properties(TileProperties(blocks_movement=True))
+WRECKAGE_PROPERTIES = intern_properties(TileProperties(
+    blocks_movement=True, radiation_level=0.3))
+SWAMP_POOL_PROPERTIES = intern_properties(TileProperties(
+    is_water=True, radiation_level=0.1, moisture_level=1.0))
+    
 class Tile:
     def __init__(self, terrain_type: str, properties: Optional[TileProperties] = None):
         self.terrain_type = terrain_type
-        self.properties = properties or TileProperties()
+        # Properties are shared flyweights; mutators below copy on write
+        self.properties = (intern_properties(properties) if properties
+                           else FLOOR_PROPERTIES)
         
     def make_walkable(self) -> None:
         """Make tile passable (for creating paths)"""
-        self.properties.blocks_movement = False
-        self.properties.blocks_sight = False
+        self.properties = intern_properties(replace(
+            self.properties, blocks_movement=False, blocks_sight=False))
         
     def add_anomaly(self, anomaly_type: str, danger_level: float) -> None:
         """Add an anomaly to this tile"""
-        self.properties.anomaly_type = anomaly_type
-        self.properties.danger_level = danger_level
+        self.properties = intern_properties(replace(
+            self.properties, anomaly_type=anomaly_type, danger_level=danger_level))
         
     def render(self, surface: pygame.Surface, x: int, y: int, 
                tile_size: int, light_level: float = 1.0) -> None:
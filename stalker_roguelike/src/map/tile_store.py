@@ -0,0 +1,271 @@
+from typing import Dict, Optional
+import numpy as np
+from .tile import Tile, TileProperties, intern_properties
+from .bitboard import Bitboard
+from ..constants import (
+    TERRAIN_FLOOR, TERRAIN_WALL, TERRAIN_WATER, TERRAIN_RADIATION
+)
+
+# Layer ids. Index 0 is the default for freshly allocated zones.
+TERRAIN_TYPES = (TERRAIN_FLOOR, TERRAIN_WALL, TERRAIN_WATER, TERRAIN_RADIATION)
+TERRAIN_IDS = {name: i for i, name in enumerate(TERRAIN_TYPES)}
+ANOMALY_TYPES = (None, "thermal", "gravity", "chemical", "electric")
+ANOMALY_IDS = {name: i for i, name in enumerate(ANOMALY_TYPES)}
+FURNITURE_TYPES = (None, "bed", "counter", "weapon_rack")
+FURNITURE_IDS = {name: i for i, name in enumerate(FURNITURE_TYPES)}
+
+# Rendering palettes, indexed by layer id (mirrors Tile.render)
+TERRAIN_BASE_COLORS = np.array([
+    (100, 100, 100),  # floor
+    (50, 50, 50),     # wall
+    (0, 0, 150),      # water
+    (50, 100, 50)     # radiation
+], dtype=np.float64)
+ANOMALY_BLEND_COLORS = np.array([
+    (0, 0, 0),
+    (255, 100, 0),    # thermal
+    (128, 0, 128),    # gravity
+    (0, 255, 128),    # chemical
+    (255, 255, 0)     # electric
+], dtype=np.float64)
+
+PROPERTY_LAYERS = ("blocks_movement", "blocks_sight", "is_water",
+                   "radiation_level", "moisture_level", "danger_level")
+TILE_LAYERS = ("terrain", "anomaly", "furniture") + PROPERTY_LAYERS
+
+
+class TileStore:
+    """Struct-of-arrays storage for a zone's tiles, indexed [x, y]"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        shape = (width, height)
+        self.terrain = np.zeros(shape, dtype=np.uint8)
+        self.blocks_movement = np.zeros(shape, dtype=bool)
+        self.blocks_sight = np.zeros(shape, dtype=bool)
+        self.is_water = np.zeros(shape, dtype=bool)
+        self.radiation_level = np.zeros(shape, dtype=np.float32)
+        self.moisture_level = np.zeros(shape, dtype=np.float32)
+        self.anomaly = np.zeros(shape, dtype=np.uint8)
+        self.danger_level = np.zeros(shape, dtype=np.float32)
+        self.furniture = np.zeros(shape, dtype=np.uint8)
+        # ZoneJournal told about writes made through tile views, if any
+        self.journal = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, layer).nbytes for layer in TILE_LAYERS)
+
+    @classmethod
+    def from_layers(cls, layers: Dict[str, np.ndarray]) -> "TileStore":
+        """Wrap existing layer arrays (e.g. views of a mapped file) without copying"""
+        width, height = layers["terrain"].shape
+        store = cls.__new__(cls)
+        store.width = width
+        store.height = height
+        for layer in TILE_LAYERS:
+            setattr(store, layer, layers[layer])
+        store.journal = None
+        return store
+
+    def touch(self, x: int, y: int) -> None:
+        """Report a write to one tile to the journal"""
+        if self.journal is not None:
+            self.journal.tiles_changed(x, y, x + 1, y + 1)
+
+    def get_properties(self, x: int, y: int) -> TileProperties:
+        """The shared TileProperties instance matching one tile"""
+        return intern_properties(TileProperties(
+            blocks_movement=bool(self.blocks_movement[x, y]),
+            blocks_sight=bool(self.blocks_sight[x, y]),
+            is_water=bool(self.is_water[x, y]),
+            radiation_level=float(self.radiation_level[x, y]),
+            moisture_level=float(self.moisture_level[x, y]),
+            anomaly_type=ANOMALY_TYPES[self.anomaly[x, y]],
+            danger_level=float(self.danger_level[x, y])
+        ))
+
+    def assign(self, index, terrain_type: str,
+               properties: Optional[TileProperties] = None) -> None:
+        """Write one terrain/property template to every tile selected by index.
+
+        `index` is anything NumPy accepts for a 2D array: an (x, y) pair,
+        a tuple of slices or a boolean mask. Furniture on those tiles is
+        cleared.
+        """
+        properties = properties or TileProperties()
+        self.terrain[index] = TERRAIN_IDS[terrain_type]
+        self.blocks_movement[index] = properties.blocks_movement
+        self.blocks_sight[index] = properties.blocks_sight
+        self.is_water[index] = properties.is_water
+        self.radiation_level[index] = properties.radiation_level
+        self.moisture_level[index] = properties.moisture_level
+        self.anomaly[index] = ANOMALY_IDS[properties.anomaly_type]
+        self.danger_level[index] = properties.danger_level
+        self.furniture[index] = 0
+
+    def set_tile(self, x: int, y: int, tile: Tile) -> None:
+        self.assign((x, y), tile.terrain_type, tile.properties)
+
+    def walkable_mask(self) -> np.ndarray:
+        return ~self.blocks_movement
+
+    def walkable_bitboard(self) -> Bitboard:
+        return Bitboard.from_mask(~self.blocks_movement)
+
+    def colors(self, x0: int, x1: int, y0: int, y1: int,
+               light_level: float = 1.0) -> np.ndarray:
+        """Render colors for the window [x0:x1, y0:y1] as an int array (w, h, 3)"""
+        window = (slice(x0, x1), slice(y0, y1))
+        color = TERRAIN_BASE_COLORS[self.terrain[window]]
+
+        water = self.is_water[window]
+        color[water] = np.trunc(color[water] * 0.7 + np.array((0, 0, 255)) * 0.3)
+
+        radiation = self.radiation_level[window].astype(np.float64)
+        irradiated = radiation > 0
+        factor = (radiation[irradiated] * 0.5)[:, None]
+        color[irradiated] = np.trunc(color[irradiated] * (1 - factor) +
+                                     np.array((0, 255, 0)) * factor)
+
+        anomaly = self.anomaly[window]
+        anomalous = anomaly > 0
+        factor = (self.danger_level[window][anomalous].astype(np.float64) * 0.3)[:, None]
+        color[anomalous] = np.trunc(color[anomalous] * (1 - factor) +
+                                    ANOMALY_BLEND_COLORS[anomaly[anomalous]] * factor)
+
+        return np.trunc(color * light_level).astype(np.int32)
+
+
+class TilePropertiesView:
+    """TileProperties-compatible accessor that reads and writes a TileStore"""
+    __slots__ = ("_store", "_x", "_y")
+
+    def __init__(self, store: TileStore, x: int, y: int):
+        self._store = store
+        self._x = x
+        self._y = y
+
+    def _get_anomaly_type(self) -> Optional[str]:
+        return ANOMALY_TYPES[self._store.anomaly[self._x, self._y]]
+
+    def _set_anomaly_type(self, anomaly_type: Optional[str]) -> None:
+        self._store.anomaly[self._x, self._y] = ANOMALY_IDS[anomaly_type]
+        self._store.touch(self._x, self._y)
+
+    anomaly_type = property(_get_anomaly_type, _set_anomaly_type)
+
+    def __repr__(self) -> str:
+        return f"TilePropertiesView({self._store.get_properties(self._x, self._y)!r})"
+
+
+def _layer_property(layer: str, cast):
+    def getter(self):
+        return cast(getattr(self._store, layer)[self._x, self._y])
+
+    def setter(self, value):
+        getattr(self._store, layer)[self._x, self._y] = value
+        self._store.touch(self._x, self._y)
+
+    return property(getter, setter)
+
+
+for _layer in PROPERTY_LAYERS:
+    _cast = bool if _layer in ("blocks_movement", "blocks_sight", "is_water") else float
+    setattr(TilePropertiesView, _layer, _layer_property(_layer, _cast))
+
+
+class TileView(Tile):
+    """Tile-compatible handle onto one cell of a TileStore.
+
+    Keeps `zone.tiles[x][y].properties.blocks_movement` style code working
+    while the data itself lives in the store's arrays.
+    """
+
+    def __init__(self, store: TileStore, x: int, y: int):
+        self._store = store
+        self._x = x
+        self._y = y
+
+    @property
+    def terrain_type(self) -> str:
+        return TERRAIN_TYPES[self._store.terrain[self._x, self._y]]
+
+    @terrain_type.setter
+    def terrain_type(self, terrain_type: str) -> None:
+        self._store.terrain[self._x, self._y] = TERRAIN_IDS[terrain_type]
+        self._store.touch(self._x, self._y)
+
+    @property
+    def properties(self) -> TilePropertiesView:
+        return TilePropertiesView(self._store, self._x, self._y)
+
+    @properties.setter
+    def properties(self, properties: TileProperties) -> None:
+        self._store.assign((self._x, self._y), self.terrain_type, properties)
+        self._store.touch(self._x, self._y)
+
+    def make_walkable(self) -> None:
+        """Make tile passable (for creating paths)"""
+        self._store.blocks_movement[self._x, self._y] = False
+        self._store.blocks_sight[self._x, self._y] = False
+        self._store.touch(self._x, self._y)
+
+    def add_anomaly(self, anomaly_type: str, danger_level: float) -> None:
+        """Add an anomaly to this tile"""
+        self._store.anomaly[self._x, self._y] = ANOMALY_IDS[anomaly_type]
+        self._store.danger_level[self._x, self._y] = danger_level
+        self._store.touch(self._x, self._y)
+
+    @property
+    def furniture(self) -> Optional[str]:
+        return FURNITURE_TYPES[self._store.furniture[self._x, self._y]]
+
+    def add_furniture(self, furniture_type: str) -> None:
+        """Place a piece of furniture (see FURNITURE_TYPES) on this tile"""
+        self._store.furniture[self._x, self._y] = FURNITURE_IDS[furniture_type]
+        self._store.touch(self._x, self._y)
+
+
+class TileColumn:
+    """One column of a TileGrid, so that `tiles[x][y]` keeps working"""
+    __slots__ = ("_store", "_x")
+
+    def __init__(self, store: TileStore, x: int):
+        self._store = store
+        self._x = x
+
+    def __len__(self) -> int:
+        return self._store.height
+
+    def __getitem__(self, y: int) -> TileView:
+        if not -self._store.height <= y < self._store.height:
+            raise IndexError("tile index out of range")
+        return TileView(self._store, self._x, y)
+
+    def __setitem__(self, y: int, tile: Tile) -> None:
+        self._store.set_tile(self._x, y, tile)
+        self._store.touch(self._x, y)
+
+    def __iter__(self):
+        return (TileView(self._store, self._x, y) for y in range(self._store.height))
+
+
+class TileGrid:
+    """List-of-lists facade over a TileStore"""
+    __slots__ = ("_store",)
+
+    def __init__(self, store: TileStore):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.width
+
+    def __getitem__(self, x: int) -> TileColumn:
+        if not -self._store.width <= x < self._store.width:
+            raise IndexError("tile index out of range")
+        return TileColumn(self._store, x)
+
+    def __iter__(self):
+        return (TileColumn(self._store, x) for x in range(self._store.width))
@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Event kinds
+ENTER = "enter"
+STAY = "stay"
+EXIT = "exit"
+
+
+class TriggerVolume:
+    """A region of a zone that reports entities entering, staying in and
+    leaving it. `kind` says who handles it ("anomaly", "radiation",
+    "location", ...) and `data` carries whatever the handler needs."""
+
+    def __init__(self, kind: str, data: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.data = data if data is not None else {}
+
+    def __repr__(self) -> str:
+        return f"TriggerVolume({self.kind!r}, {self.data!r})"
+
+
+@dataclass
+class TriggerEvent:
+    kind: str  # ENTER, STAY or EXIT
+    entity: Any
+    volume: TriggerVolume
+
+
+class TriggerMap:
+    """Tile-indexed lookup of the trigger volumes covering each tile.
+
+    Every tile holds the id of a group, the tuple of volumes covering it;
+    tiles covered by the same volumes share one group. The map also keeps
+    the group each tracked entity stands in, so a move is one array lookup
+    and only produces events when the entity crosses a volume boundary.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.lookup = np.zeros((width, height), dtype=np.int32)
+        self.groups: List[Tuple[TriggerVolume, ...]] = [()]
+        self.volumes: List[TriggerVolume] = []
+        # Volumes added one at a time, with the mask and position they were
+        # added at, so they can be re-added when the zone is rebuilt
+        self.placed: List[Tuple[TriggerVolume, int, int, np.ndarray]] = []
+        self._group_ids: Dict[Tuple[TriggerVolume, ...], int] = {(): 0}
+        self._group_of: Dict[int, int] = {}  # id(entity): group it stands in
+        self._occupants: Dict[TriggerVolume, List] = {}
+
+    def __getstate__(self) -> Dict:
+        # Entity bookkeeping is keyed by object identity; the zone re-tracks
+        # its entities on load
+        state = self.__dict__.copy()
+        del state["_group_ids"], state["_group_of"], state["_occupants"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._group_ids = {group: i for i, group in enumerate(self.groups)}
+        self._group_of = {}
+        self._occupants = {}
+
+    def volumes_at(self, x: int, y: int) -> Tuple[TriggerVolume, ...]:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return ()
+        return self.groups[self.lookup[x, y]]
+
+    def volumes_holding(self, entity) -> Tuple[TriggerVolume, ...]:
+        """Volumes a tracked entity was last seen inside"""
+        return self.groups[self._group_of.get(id(entity), 0)]
+
+    def occupants(self, volume: TriggerVolume) -> List:
+        return list(self._occupants.get(volume, ()))
+
+    def add(self, volume: TriggerVolume, mask: np.ndarray, x: int = 0, y: int = 0,
+            entities: Sequence = ()) -> List[TriggerEvent]:
+        """Register a volume covering the set cells of `mask` placed with its
+        corner at (x, y). Returns ENTER events for the given entities
+        already standing inside it."""
+        mask = np.asarray(mask, dtype=bool)
+        self.placed.append((volume, x, y, mask))
+        self.add_layer([volume], mask.astype(np.int32), x, y)
+        return self.retrack(entities)
+
+    def add_rect(self, volume: TriggerVolume, x: int, y: int, width: int, height: int,
+                 entities: Sequence = ()) -> List[TriggerEvent]:
+        return self.add(volume, np.ones((width, height), dtype=bool), x, y, entities)
+
+    def add_layer(self, volumes: Sequence[TriggerVolume], labels: np.ndarray,
+                  x: int = 0, y: int = 0) -> None:
+        """Register many non-overlapping volumes at once: `labels`, placed
+        at (x, y), holds i + 1 on the cells of volumes[i] and 0 elsewhere.
+        Tracked entities are not re-checked; call retrack afterwards."""
+        if not len(volumes):
+            return
+        labels, x, y = _clip(labels, x, y, self.width, self.height)
+        if labels.size == 0:
+            return
+        self.volumes.extend(volumes)
+        window = self.lookup[x:x + labels.shape[0], y:y + labels.shape[1]]
+        # Every distinct (group, label) pair becomes one new group
+        stride = len(volumes) + 1
+        keys, inverse = np.unique(window.astype(np.int64) * stride + labels,
+                                  return_inverse=True)
+        new_ids = np.array([self._intern(self._with(group_id, volumes[label - 1])
+                                         if label else self.groups[group_id])
+                            for group_id, label in
+                            (divmod(key, stride) for key in keys.tolist())],
+                           dtype=np.int32)
+        window[...] = new_ids[inverse.reshape(window.shape)]
+
+    def remove(self, volume: TriggerVolume) -> List[TriggerEvent]:
+        """Unregister a volume, returning EXIT events for its occupants"""
+        if volume not in self.volumes:
+            return []
+        self.volumes.remove(volume)
+        self.placed = [entry for entry in self.placed if entry[0] is not volume]
+        old_ids = [i for i, group in enumerate(self.groups) if volume in group]
+        remap = np.arange(len(self.groups), dtype=np.int32)
+        for group_id in old_ids:
+            remap[group_id] = self._intern(tuple(v for v in self.groups[group_id]
+                                                 if v is not volume))
+        self.lookup = remap[self.lookup]
+        events = [TriggerEvent(EXIT, entity, volume)
+                  for entity in self._occupants.pop(volume, ())]
+        self._group_of = {key: int(remap[group_id])
+                          for key, group_id in self._group_of.items()}
+        return events
+
+    def track(self, entity) -> List[TriggerEvent]:
+        """Start following an entity, returning ENTER events for the
+        volumes it stands in"""
+        self._group_of[id(entity)] = 0
+        return self.move(entity)
+
+    def untrack(self, entity) -> List[TriggerEvent]:
+        """Stop following an entity, returning EXIT events for the volumes
+        it was inside"""
+        group_id = self._group_of.pop(id(entity), 0)
+        events = []
+        for volume in self.groups[group_id]:
+            self._occupants[volume].remove(entity)
+            if not self._occupants[volume]:
+                del self._occupants[volume]
+            events.append(TriggerEvent(EXIT, entity, volume))
+        return events
+
+    def move(self, entity) -> List[TriggerEvent]:
+        """Re-check a tracked entity after it moved: EXIT events for the
+        volumes it left, then ENTER events for the ones it walked into.
+        Moves within the same volumes cost one lookup and return nothing."""
+        old_id = self._group_of.get(id(entity))
+        if old_id is None:
+            return []
+        if 0 <= entity.x < self.width and 0 <= entity.y < self.height:
+            new_id = int(self.lookup[entity.x, entity.y])
+        else:
+            new_id = 0
+        if new_id == old_id:
+            return []
+        self._group_of[id(entity)] = new_id
+        old, new = self.groups[old_id], self.groups[new_id]
+        events = []
+        for volume in old:
+            if volume not in new:
+                self._occupants[volume].remove(entity)
+                if not self._occupants[volume]:
+                    del self._occupants[volume]
+                events.append(TriggerEvent(EXIT, entity, volume))
+        for volume in new:
+            if volume not in old:
+                self._occupants.setdefault(volume, []).append(entity)
+                events.append(TriggerEvent(ENTER, entity, volume))
+        return events
+
+    def reset(self, entities: Sequence) -> None:
+        """Follow exactly these entities, without raising any events"""
+        self._group_of = {}
+        self._occupants = {}
+        for entity in entities:
+            self.track(entity)
+
+    def retrack(self, entities: Sequence) -> List[TriggerEvent]:
+        """Re-check entities after volumes were added under them"""
+        events = []
+        for entity in entities:
+            if id(entity) in self._group_of:
+                events.extend(self.move(entity))
+        return events
+
+    def stays(self, kind: Optional[str] = None) -> List[TriggerEvent]:
+        """STAY events for every entity inside a volume (of `kind`, if
+        given). Costs one event per occupant; empty volumes are skipped."""
+        return [TriggerEvent(STAY, entity, volume)
+                for volume, entities in self._occupants.items()
+                if kind is None or volume.kind == kind
+                for entity in entities]
+
+    def _with(self, group_id: int, volume: TriggerVolume) -> Tuple[TriggerVolume, ...]:
+        return self.groups[group_id] + (volume,)
+
+    def _intern(self, group: Tuple[TriggerVolume, ...]) -> int:
+        group_id = self._group_ids.get(group)
+        if group_id is None:
+            group_id = self._group_ids[group] = len(self.groups)
+            self.groups.append(group)
+        return group_id
+
+
+def _clip(labels: np.ndarray, x: int, y: int, width: int,
+          height: int) -> Tuple[np.ndarray, int, int]:
+    """The part of `labels` placed at (x, y) that lies on a width x height map"""
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + labels.shape[0], width)
+    y1 = min(y + labels.shape[1], height)
+    if x0 >= x1 or y0 >= y1:
+        return labels[:0, :0], x0, y0
+    return labels[x0 - x:x1 - x, y0 - y:y1 - y], x0, y0
@@ -1,72 +1,358 @@
 from typing import List, Dict, Tuple, Optional
+from collections import OrderedDict
 from .tile import Tile, TileProperties
+from .tile_store import TileStore, TileGrid, ANOMALY_IDS
+from .zone_fields import ZoneFields
+from .masks import disc_kernel
+from .spatial_hash import SpatialHash
+from .triggers import TriggerMap, TriggerVolume
+from .zone_journal import ZoneJournal
+from .bitboard import Bitboard
+from .connectivity import label_components
+from .fov import shadowcast
+from ..components.actor_store import ActorStore, ActorHandle
+import numpy as np
 import pygame
 from ..constants import (
     TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT,
-    TERRAIN_FLOOR, TERRAIN_WALL, TERRAIN_WATER  # Add terrain constants
+    TERRAIN_FLOOR, TERRAIN_WALL, TERRAIN_WATER
 )
 
+# Generation tiers; each one builds on the tier below it
+TIER_FIELDS = 0   # Noise fields only, enough for map previews
+TIER_TERRAIN = 1  # Base terrain
+TIER_FULL = 2     # Points of interest, spawns and hazards
+
+MAX_CACHED_FOV = 64  # Fields of view kept per zone
+
 class Zone:
-    def __init__(self, width: int, height: int, zone_type: str):
+    def __init__(self, width: int, height: int, zone_type: str,
+                 store: Optional[TileStore] = None):
         self.width = width
         self.height = height
         self.zone_type = zone_type
         self.game_state = None
-        # Initialize with empty floor tiles
-        self.tiles = [[Tile(TERRAIN_FLOOR, TileProperties()) 
-                      for _ in range(height)] for _ in range(width)]
+        # Tile layers live in arrays; `tiles[x][y]` is a view onto them.
+        # A fresh store is all empty floor.
+        self.store = store or TileStore(width, height)
+        self.tiles = TileGrid(self.store)
         self.entities = []
         self.items = []
+        # Buckets of entities and items by position, for point and area queries
+        self.entity_index = SpatialHash()
+        self.item_index = SpatialHash()
+        # Health, stamina, bleeding and effect timers of the zone's actors
+        self.actors = ActorStore()
         self.anomalies = []
-        self.visible_tiles = [[False] * height for _ in range(width)]
-        self.explored_tiles = [[False] * height for _ in range(width)]
+        # Anomalies, radiation patches and quest locations, by tile
+        self.triggers = TriggerMap(width, height)
+        # What the player sees now and has ever seen, indexed [x, y]
+        self.visible_tiles = np.zeros((width, height), dtype=bool)
+        self.explored_tiles = np.zeros((width, height), dtype=bool)
         self.danger_level = 0
         self.radiation_level = 0
         self.connections: Dict[str, Tuple[int, int]] = {}  # Direction: (x, y)
+        self.fields: Optional[ZoneFields] = None  # Noise layers from generation
+        self.tier = -1  # Highest generation tier built so far
+        # Tile writes, spawns and moves, for anything derived from the zone
+        self.journal = ZoneJournal()
+        self.store.journal = self.journal
+        self._clear_caches()
+        
+    def __getstate__(self) -> Dict:
+        # The game state is re-attached when a zone is loaded back
+        state = self.__dict__.copy()
+        state["game_state"] = None
+        # Indices are keyed by object identity, so they are rebuilt on load
+        del state["entity_index"], state["item_index"], state["actors"]
+        # Caches are rebuilt on demand
+        del state["_walkable"], state["_opaque"], state["_fov_cache"]
+        return state
+        
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._clear_caches()
+        self.entity_index = SpatialHash()
+        self.item_index = SpatialHash()
+        self.actors = ActorStore()
+        self.reindex()
+        
+    def reindex(self) -> None:
+        """Rebuild the entity and item indices and the actor store after the
+        lists were replaced"""
+        for entity in self.entities:
+            entity.zone = self
+        self.entity_index = SpatialHash(self.entity_index.cell_size, self.entities)
+        self.item_index = SpatialHash(self.item_index.cell_size, self.items)
+        self.actors.reset(self.entities)
+        self.triggers.reset(self.entities)
         
     def is_walkable(self, x: int, y: int) -> bool:
         if not (0 <= x < self.width and 0 <= y < self.height):
             return False
-        return not self.tiles[x][y].properties.blocks_movement
+        return not self.store.blocks_movement[x, y]
         
     def get_entities_at(self, x: int, y: int) -> List:
-        return [e for e in self.entities if e.x == x and e.y == y]
+        return self.entity_index.at(x, y)
         
     def get_items_at(self, x: int, y: int) -> List:
-        return [i for i in self.items if i.x == x and i.y == y]
+        return self.item_index.at(x, y)
+        
+    def _clear_caches(self) -> None:
+        # Derived from the tiles and tagged with the journal's tile version
+        self._walkable: Optional[Tuple[int, Bitboard]] = None
+        self._opaque: Optional[Tuple[int, bytes]] = None  # blocks_sight, flattened
+        self._fov_cache: "OrderedDict[Tuple[int, int, int, int], np.ndarray]" = OrderedDict()
+        
+    def walkable_bitboard(self) -> Bitboard:
+        """Walkable tiles as a bitboard, rebuilt only after tiles change"""
+        if self._walkable is None or self._walkable[0] != self.journal.tile_version:
+            self._walkable = (self.journal.tile_version, self.store.walkable_bitboard())
+        return self._walkable[1]
+        
+    def field_of_view(self, x: int, y: int, radius: float) -> np.ndarray:
+        """Read-only mask of the tiles visible from (x, y), within radius
+        (truncated to whole tiles). Cached per origin, radius and tile
+        version, so repeated checks from where an entity stands are free."""
+        radius = int(radius)
+        key = (x, y, radius, self.journal.tile_version)
+        fov = self._fov_cache.get(key)
+        if fov is not None:
+            self._fov_cache.move_to_end(key)
+            return fov
+        
+        if self._opaque is None or self._opaque[0] != self.journal.tile_version:
+            self._opaque = (self.journal.tile_version, self.store.blocks_sight.tobytes())
+        fov = shadowcast(self._opaque[1], self.width, self.height, x, y, radius)
+        fov.flags.writeable = False
+        self._fov_cache[key] = fov
+        if len(self._fov_cache) > MAX_CACHED_FOV:
+            self._fov_cache.popitem(last=False)
+        return fov
+        
+    def can_see(self, x0: int, y0: int, x1: int, y1: int, radius: float) -> bool:
+        """True if (x1, y1) is in the field of view from (x0, y0)"""
+        if not (0 <= x1 < self.width and 0 <= y1 < self.height):
+            return False
+        return bool(self.field_of_view(x0, y0, radius)[x1, y1])
+        
+    def update_visibility(self, x: int, y: int, radius: float) -> None:
+        """Make the field of view from (x, y) the visible tiles, and mark
+        them explored"""
+        fov = self.field_of_view(x, y, radius)
+        np.copyto(self.visible_tiles, fov)
+        self.explored_tiles |= fov
         
     def add_entity(self, entity) -> None:
         self.entities.append(entity)
+        entity.zone = self
+        self.entity_index.insert(entity)
+        if isinstance(entity, ActorHandle):
+            self.actors.bind(entity)
+        self.journal.spawned(entity)
+        self._handle_triggers(self.triggers.track(entity))
         
     def remove_entity(self, entity) -> None:
         if entity in self.entities:
             self.entities.remove(entity)
+            self.journal.despawned(entity)
+        self.entity_index.remove(entity)
+        self.actors.release(entity)
+        self._handle_triggers(self.triggers.untrack(entity))
+        if entity.zone is self:
+            entity.zone = None
+        
+    def entity_moved(self, entity, old_x: int, old_y: int) -> None:
+        """Re-bucket an entity after it moved from (old_x, old_y) and fire
+        the triggers it crossed"""
+        self.entity_index.update(entity)
+        self.actors.moved(entity)
+        self.journal.moved(entity, old_x, old_y)
+        self._handle_triggers(self.triggers.move(entity))
+        
+    def add_item(self, item) -> None:
+        self.items.append(item)
+        self.item_index.insert(item)
+        self.journal.spawned(item)
+        
+    def remove_item(self, item) -> None:
+        if item in self.items:
+            self.items.remove(item)
+            self.journal.despawned(item)
+        self.item_index.remove(item)
+            
+    # Bulk painting. Each method writes one terrain/property template to a
+    # region in a single call, clips it to the zone and records it as dirty.
+    
+    def fill_rect(self, x: int, y: int, width: int, height: int, terrain_type: str,
+                  properties: Optional[TileProperties] = None) -> None:
+        self._paint_region(x, y, x + width, y + height, terrain_type, properties)
+        
+    def outline_rect(self, x: int, y: int, width: int, height: int, terrain_type: str,
+                     properties: Optional[TileProperties] = None) -> None:
+        """Paint only the border tiles of a rectangle"""
+        if width <= 0 or height <= 0:
+            return
+        border = np.ones((width, height), dtype=bool)
+        border[1:-1, 1:-1] = False
+        self._paint_region(x, y, x + width, y + height, terrain_type, properties, border)
+        
+    def draw_line(self, x0: int, y0: int, x1: int, y1: int, terrain_type: str,
+                  properties: Optional[TileProperties] = None) -> None:
+        """Paint a straight line of tiles, both ends included"""
+        steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+        xs = np.rint(np.linspace(x0, x1, steps)).astype(np.intp)
+        ys = np.rint(np.linspace(y0, y1, steps)).astype(np.intp)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self._paint_cells(xs[inside], ys[inside], terrain_type, properties)
+        
+    def fill_disc(self, x: int, y: int, radius: int, terrain_type: str,
+                  properties: Optional[TileProperties] = None) -> None:
+        """Paint every tile within radius of (x, y)"""
+        self.stamp(disc_kernel(radius), x, y, terrain_type, properties)
+        
+    def stamp(self, kernel: np.ndarray, x: int, y: int, terrain_type: str,
+              properties: Optional[TileProperties] = None) -> None:
+        """Paint the set cells of a boolean kernel centred on (x, y)"""
+        x0, y0 = x - kernel.shape[0] // 2, y - kernel.shape[1] // 2
+        self._paint_region(x0, y0, x0 + kernel.shape[0], y0 + kernel.shape[1],
+                           terrain_type, properties, kernel)
+        
+    def paint_mask(self, mask, terrain_type: str,
+                   properties: Optional[TileProperties] = None) -> None:
+        """Paint every tile selected by a boolean mask shaped like the zone
+        (or by any other index TileStore.assign takes)"""
+        if isinstance(mask, np.ndarray) and mask.dtype == bool:
+            xs, ys = np.nonzero(mask)
+            self._paint_cells(xs, ys, terrain_type, properties)
+            return
+        self.store.assign(mask, terrain_type, properties)
+        self._mark_dirty(0, 0, self.width, self.height)
+        
+    def paint_blueprint(self, blueprint, x: int, y: int) -> None:
+        """Stamp a prefab Blueprint with its top-left corner at (x, y)"""
+        width, height = blueprint.shape
+        for terrain_type, properties, mask in blueprint.strokes:
+            self._paint_region(x, y, x + width, y + height, terrain_type, properties, mask)
+            
+        # Furniture goes on top, clipped like the strokes
+        cx0, cy0 = max(x, 0), max(y, 0)
+        cx1, cy1 = min(x + width, self.width), min(y + height, self.height)
+        if cx0 < cx1 and cy0 < cy1:
+            furniture = blueprint.furniture[cx0 - x:cx1 - x, cy0 - y:cy1 - y]
+            placed = furniture != 0
+            if placed.any():
+                self.store.furniture[cx0:cx1, cy0:cy1][placed] = furniture[placed]
+                self._mark_dirty(cx0, cy0, cx1, cy1)
+            
+    def take_dirty_rects(self) -> List[Tuple[int, int, int, int]]:
+        """Tile regions written since the last call, which are then forgotten"""
+        return self.journal.take_dirty_rects()
+        
+    def _paint_region(self, x0: int, y0: int, x1: int, y1: int, terrain_type: str,
+                      properties: Optional[TileProperties],
+                      mask: Optional[np.ndarray] = None) -> None:
+        """Paint [x0, x1) x [y0, y1), or the cells of `mask` (shaped like
+        that region) that are set"""
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x1, self.width), min(y1, self.height)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        if mask is None:
+            self.store.assign(np.s_[cx0:cx1, cy0:cy1], terrain_type, properties)
+            self._mark_dirty(cx0, cy0, cx1, cy1)
+            return
+        xs, ys = np.nonzero(mask[cx0 - x0:cx1 - x0, cy0 - y0:cy1 - y0])
+        self._paint_cells(xs + cx0, ys + cy0, terrain_type, properties)
+        
+    def _paint_cells(self, xs: np.ndarray, ys: np.ndarray, terrain_type: str,
+                     properties: Optional[TileProperties]) -> None:
+        if not len(xs):
+            return
+        self.store.assign((xs, ys), terrain_type, properties)
+        self._mark_dirty(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+        
+    def _mark_dirty(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        self.journal.tiles_changed(x0, y0, x1, y1)
             
     def add_anomaly(self, x: int, y: int, anomaly_type: str, danger_level: float) -> None:
-        self.tiles[x][y].add_anomaly(anomaly_type, danger_level)
-        self.anomalies.append({
+        self.store.anomaly[x, y] = ANOMALY_IDS[anomaly_type]
+        self.store.danger_level[x, y] = danger_level
+        self._mark_dirty(x, y, x + 1, y + 1)
+        danger_level = float(self.store.danger_level[x, y])  # As stored (float32)
+        anomaly = {
             "x": x,
             "y": y,
             "type": anomaly_type,
             "danger": danger_level
-        })
+        }
+        self.anomalies.append(anomaly)
+        if self.tier >= TIER_FULL:
+            # Generation registers every hazard at once when it finishes
+            self.triggers.add_layer([TriggerVolume("anomaly", anomaly)],
+                                    np.ones((1, 1), dtype=np.int32), x, y)
+            self._handle_triggers(self.triggers.retrack(self.get_entities_at(x, y)))
+            
+    def add_trigger(self, volume: TriggerVolume, x: int, y: int,
+                    width: int, height: int) -> None:
+        """Register a rectangular trigger volume, e.g. a quest location"""
+        self._handle_triggers(self.triggers.add_rect(volume, x, y, width, height,
+                                                     self.entity_index.in_rect(
+                                                         x, y, x + width, y + height)))
+        
+    def remove_trigger(self, volume: TriggerVolume) -> None:
+        self._handle_triggers(self.triggers.remove(volume))
+        
+    def rebuild_triggers(self, placed: Optional[List] = None) -> None:
+        """Register a volume per anomaly and per connected radiation patch
+        from the tile layers, plus the volumes added with add_trigger (or
+        `placed`, as recorded in a zone delta). Entities are re-tracked
+        without raising events."""
+        if placed is None:
+            placed = self.triggers.placed
+        self.triggers = TriggerMap(self.width, self.height)
+        
+        # Later anomalies on a tile replace earlier ones, as in the tile layers
+        anomalies = list({(a["x"], a["y"]): a for a in self.anomalies}.values())
+        labels = np.zeros((self.width, self.height), dtype=np.int32)
+        for i, anomaly in enumerate(anomalies):
+            labels[anomaly["x"], anomaly["y"]] = i + 1
+        self.triggers.add_layer([TriggerVolume("anomaly", a) for a in anomalies], labels)
+        
+        labels, sizes, _ = label_components(self.store.radiation_level > 0)
+        self.triggers.add_layer([TriggerVolume("radiation") for _ in range(len(sizes) - 1)],
+                                labels)
+        
+        for volume, x, y, mask in placed:
+            self.triggers.add(volume, mask, x, y)
+        self.triggers.reset(self.entities)
         
     def update(self) -> None:
-        # Update entities
+        # Update entities; actors only while the player is in their wake range
+        player = self.game_state.player if self.game_state is not None else None
+        awake = self.actors.awake(player.x, player.y) if player is not None else None
         for entity in self.entities:
-            if hasattr(entity, "update"):
+            slot = getattr(entity, "actor_slot", None)
+            if slot is None or awake is None or awake[slot]:
                 entity.update()
                 
+        # Stamina, bleeding and effect timers for every actor at once
+        self.actors.tick()
+        
         # Update anomalies
         self._update_anomalies()
         
     def _update_anomalies(self) -> None:
-        for anomaly in self.anomalies:
-            x, y = anomaly["x"], anomaly["y"]
-            # Damage entities in anomaly
-            for entity in self.get_entities_at(x, y):
-                damage = anomaly["danger"] * 10
-                entity.combat.apply_damage(damage, anomaly["type"], "torso")
+        # Damage entities in anomalies; only occupied anomalies are visited
+        for event in self.triggers.stays("anomaly"):
+            anomaly = event.volume.data
+            damage = anomaly["danger"] * 10
+            event.entity.combat.apply_damage(damage, anomaly["type"], "torso")
+                
+    def _handle_triggers(self, events: List) -> None:
+        """Pass enter, stay and exit events on to the game"""
+        if events and self.game_state is not None:
+            self.game_state.handle_triggers(events)
                 
     def render(self, surface: pygame.Surface, camera_offset: Tuple[int, int], 
                light_level: float = 1.0) -> None:
@@ -76,10 +362,19 @@ class Zone:
         
         start_x = max(0, int(camera_offset[0]) - 1)
         start_y = max(0, int(camera_offset[1]) - 1)
+        end_x = min(self.width, start_x + view_width)
+        end_y = min(self.height, start_y + view_height)
+        if start_x >= end_x or start_y >= end_y:
+            return
+        
+        # Shade the whole window from the tile arrays at once
+        colors = self.store.colors(start_x, end_x, start_y, end_y, light_level).tolist()
+        visible = self.visible_tiles[start_x:end_x, start_y:end_y].tolist()
+        explored = self.explored_tiles[start_x:end_x, start_y:end_y].tolist()
         
         # Render visible tiles
-        for x in range(start_x, min(self.width, start_x + view_width)):
-            for y in range(start_y, min(self.height, start_y + view_height)):
+        for x in range(start_x, end_x):
+            for y in range(start_y, end_y):
                 screen_x = (x - camera_offset[0]) * TILE_SIZE
                 screen_y = (y - camera_offset[1]) * TILE_SIZE
                 
@@ -88,17 +383,17 @@ class Zone:
                     screen_y < -TILE_SIZE or screen_y > SCREEN_HEIGHT):
                     continue
                 
-                if self.visible_tiles[x][y]:
+                color = colors[x - start_x][y - start_y]
+                if visible[x - start_x][y - start_y]:
                     # Render fully visible tile
-                    self.tiles[x][y].render(surface, screen_x, screen_y, 
-                                          TILE_SIZE, light_level)
-                elif self.explored_tiles[x][y]:
+                    pygame.draw.rect(surface, color,
+                                   (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
+                elif explored[x - start_x][y - start_y]:
                     # Render explored but not visible tile (darker)
-                    self.tiles[x][y].render(surface, screen_x, screen_y, 
-                                          TILE_SIZE, light_level * 0.5)
+                    pygame.draw.rect(surface, [c // 2 for c in color],
+                                   (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
                     
         # Render entities in visible tiles
-        for entity in self.entities:
-            if (0 <= entity.x < self.width and 0 <= entity.y < self.height and
-                self.visible_tiles[entity.x][entity.y]):
+        for entity in self.entity_index.in_rect(start_x, start_y, end_x, end_y):
+            if self.visible_tiles[entity.x, entity.y]:
                 entity.render(surface, camera_offset)
\ No newline at end of file
@@ -0,0 +1,171 @@
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+import os
+import pickle
+import shutil
+import tempfile
+from .zone import Zone
+
+ZonePos = Tuple[int, int]
+
+@dataclass
+class ZoneCacheStats:
+    hits: int = 0         # Lookups served from memory
+    misses: int = 0       # Lookups that had to reload from disk or failed
+    evictions: int = 0    # Zones spilled to disk
+    spill_bytes: int = 0  # Total bytes written to the spill directory
+
+
+class ZoneCache(MutableMapping):
+    """Zone mapping that keeps at most `max_resident` zones in memory.
+
+    The least recently used zones are pickled to a spill directory and loaded
+    back transparently on lookup. Pinned zones (the one the player is in) are
+    never evicted. A reloaded zone keeps its spill file, and if its journal
+    shows no change by the time it is evicted again the file is reused
+    instead of encoding the zone a second time.
+    """
+
+    def __init__(self, max_resident: int = 32, spill_dir: Optional[str] = None,
+                 on_load: Optional[Callable[[ZonePos, Zone], None]] = None,
+                 encode: Optional[Callable[[ZonePos, Zone], bytes]] = None,
+                 decode: Optional[Callable[[ZonePos, bytes], Zone]] = None):
+        self.max_resident = max(1, max_resident)
+        self.spill_dir = spill_dir
+        self.on_load = on_load  # Re-attaches runtime state to reloaded zones
+        self.encode = encode    # Spill format; whole zones are pickled by default
+        self.decode = decode
+        self.stats = ZoneCacheStats()
+        self.pinned: Set[ZonePos] = set()
+        self._resident: "OrderedDict[ZonePos, Zone]" = OrderedDict()
+        self._spilled: Dict[ZonePos, str] = {}
+        # Reloaded zones: (journal version when loaded, spill file still on disk)
+        self._clean: Dict[ZonePos, Tuple[int, str]] = {}
+        self._owns_spill_dir = False
+
+    def __getitem__(self, pos: ZonePos) -> Zone:
+        zone = self._resident.get(pos)
+        if zone is not None:
+            self._resident.move_to_end(pos)
+            self.stats.hits += 1
+            return zone
+
+        self.stats.misses += 1
+        if pos not in self._spilled:
+            raise KeyError(pos)
+        zone = self._reload(pos)
+        self._resident[pos] = zone
+        self._evict(keep=pos)
+        return zone
+
+    def __setitem__(self, pos: ZonePos, zone: Zone) -> None:
+        self._discard_spill(pos)
+        self._discard_clean(pos)
+        self._resident[pos] = zone
+        self._resident.move_to_end(pos)
+        self._evict(keep=pos)
+
+    def __delitem__(self, pos: ZonePos) -> None:
+        if pos in self._resident:
+            del self._resident[pos]
+            self._discard_clean(pos)
+        elif pos in self._spilled:
+            self._discard_spill(pos)
+        else:
+            raise KeyError(pos)
+
+    def __contains__(self, pos) -> bool:
+        return pos in self._resident or pos in self._spilled
+
+    def __iter__(self) -> Iterator[ZonePos]:
+        yield from list(self._resident)
+        yield from list(self._spilled)
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._spilled)
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._resident)
+
+    def is_resident(self, pos: ZonePos) -> bool:
+        return pos in self._resident
+
+    def pin(self, pos: ZonePos) -> None:
+        self.pinned.add(pos)
+
+    def unpin(self, pos: ZonePos) -> None:
+        self.pinned.discard(pos)
+        self._evict()
+
+    def close(self) -> None:
+        """Forget spilled zones and remove a spill directory we created"""
+        for pos in list(self._spilled):
+            self._discard_spill(pos)
+        for pos in list(self._clean):
+            self._discard_clean(pos)
+        if self._owns_spill_dir and self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self._owns_spill_dir = False
+
+    def serialize(self, pos: ZonePos, zone: Zone) -> bytes:
+        if self.encode:
+            return self.encode(pos, zone)
+        return pickle.dumps(zone, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def deserialize(self, pos: ZonePos, data: bytes) -> Zone:
+        if self.decode:
+            return self.decode(pos, data)
+        return pickle.loads(data)
+
+    def _evict(self, keep: Optional[ZonePos] = None) -> None:
+        while len(self._resident) > self.max_resident:
+            victim = next((pos for pos in self._resident
+                           if pos not in self.pinned and pos != keep), None)
+            if victim is None:
+                return  # Everything resident is pinned or in use
+            self._spill(victim, self._resident.pop(victim))
+
+    def _spill(self, pos: ZonePos, zone: Zone) -> None:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="stalker_zones_")
+            self._owns_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        clean = self._clean.pop(pos, None)
+        if clean is not None:
+            version, path = clean
+            if version == zone.journal.version and os.path.exists(path):
+                self._spilled[pos] = path  # Unchanged since it was loaded
+                self.stats.evictions += 1
+                return
+            os.remove(path)
+
+        data = self.serialize(pos, zone)
+        path = os.path.join(self.spill_dir, f"zone_{pos[0]}_{pos[1]}.dat")
+        with open(path, "wb") as f:
+            f.write(data)
+        self._spilled[pos] = path
+        self.stats.evictions += 1
+        self.stats.spill_bytes += len(data)
+
+    def _reload(self, pos: ZonePos) -> Zone:
+        path = self._spilled.pop(pos)
+        with open(path, "rb") as f:
+            zone = self.deserialize(pos, f.read())
+        if self.on_load:
+            self.on_load(pos, zone)
+        self._clean[pos] = (zone.journal.version, path)
+        return zone
+
+    def _discard_spill(self, pos: ZonePos) -> None:
+        path = self._spilled.pop(pos, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _discard_clean(self, pos: ZonePos) -> None:
+        clean = self._clean.pop(pos, None)
+        if clean and os.path.exists(clean[1]):
+            os.remove(clean[1])
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+import pickle
+import numpy as np
+from .zone import Zone
+from .tile_store import TILE_LAYERS
+
+@dataclass
+class ZoneDelta:
+    """What a player or the simulation changed in a zone since it was generated.
+
+    Everything else is rebuilt from the zone's seed, so a zone that was only
+    walked through stores a few hundred bytes instead of every tile.
+    """
+    zone_type: str
+    tiles: Dict[str, Tuple[np.ndarray, np.ndarray]]  # Layer: (flat indices, values)
+    entities: List[Union[int, object]]  # Spawn id of an untouched entity, or the entity
+    anomalies: Optional[List[Dict]]     # None when unchanged
+    items: List
+    connections: Dict[str, Tuple[int, int]]
+    explored: np.ndarray                # Packed bits of zone.explored_tiles
+    danger_level: float
+    radiation_level: float
+    triggers: Optional[List] = None     # Volumes added with Zone.add_trigger
+
+
+def diff_zone(zone: Zone, baseline: Zone) -> ZoneDelta:
+    """Record how `zone` differs from a freshly generated copy of itself"""
+    tiles = {}
+    for layer in TILE_LAYERS:
+        current = getattr(zone.store, layer).ravel()
+        changed = np.flatnonzero(current != getattr(baseline.store, layer).ravel())
+        if len(changed):
+            tiles[layer] = (changed.astype(np.min_scalar_type(current.size)),
+                            current[changed])
+
+    entities = []
+    for entity in zone.entities:
+        spawn_id = getattr(entity, "spawn_id", None)
+        if (spawn_id is not None and spawn_id < len(baseline.entities) and
+                _same_state(entity, baseline.entities[spawn_id])):
+            entities.append(spawn_id)
+        else:
+            entities.append(entity)
+
+    return ZoneDelta(
+        zone_type=zone.zone_type,
+        tiles=tiles,
+        entities=entities,
+        anomalies=None if zone.anomalies == baseline.anomalies else zone.anomalies,
+        items=zone.items,
+        connections=zone.connections,
+        explored=np.packbits(zone.explored_tiles),
+        danger_level=zone.danger_level,
+        radiation_level=zone.radiation_level,
+        triggers=zone.triggers.placed
+    )
+
+
+def apply_delta(baseline: Zone, delta: ZoneDelta) -> Zone:
+    """Turn a freshly generated zone back into the one the delta was taken from"""
+    zone = baseline
+    for layer, (indices, values) in delta.tiles.items():
+        getattr(zone.store, layer).ravel()[indices] = values
+        xs, ys = np.unravel_index(indices, (zone.width, zone.height))
+        zone.journal.tiles_changed(int(xs.min()), int(ys.min()),
+                                   int(xs.max()) + 1, int(ys.max()) + 1)
+
+    generated = zone.entities
+    zone.entities = [generated[entry] if isinstance(entry, int) else entry
+                     for entry in delta.entities]
+    if delta.anomalies is not None:
+        zone.anomalies = delta.anomalies
+    zone.items = delta.items
+    zone.reindex()
+    # Tiles and anomalies may have changed under the generated hazards
+    zone.rebuild_triggers(delta.triggers or [])
+    zone.connections = delta.connections
+
+    explored = np.unpackbits(delta.explored, count=zone.width * zone.height)
+    zone.explored_tiles = explored.reshape(zone.width, zone.height).astype(bool)
+    zone.danger_level = delta.danger_level
+    zone.radiation_level = delta.radiation_level
+    return zone
+
+
+def _same_state(entity, generated) -> bool:
+    """True if an entity is still exactly as the generator spawned it"""
+    if type(entity) is not type(generated):
+        return False
+    return (pickle.dumps(entity, protocol=pickle.HIGHEST_PROTOCOL) ==
+            pickle.dumps(generated, protocol=pickle.HIGHEST_PROTOCOL))
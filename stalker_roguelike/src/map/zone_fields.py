@@ -0,0 +1,65 @@
+from typing import List
+from dataclasses import dataclass, fields
+import numpy as np
+
+# Terrain classification thresholds
+DEEP_WATER_ELEVATION = -0.3
+SWAMP_ELEVATION = -0.1
+FOREST_DENSITY_THRESHOLD = 0.2
+RADIATION_THRESHOLD = 0.3
+ANOMALY_THRESHOLD = 0.6
+
+@dataclass
+class ZoneFields:
+    """Noise layers sampled once per zone, stored as float32 arrays indexed [x, y]"""
+    elevation: np.ndarray
+    forest_density: np.ndarray
+    radiation: np.ndarray
+    anomaly: np.ndarray
+
+    @property
+    def shape(self) -> tuple:
+        return self.elevation.shape
+
+    @classmethod
+    def concatenate(cls, bands: List["ZoneFields"]) -> "ZoneFields":
+        """Join fields sampled a band of rows (x ranges) at a time"""
+        return cls(*(np.concatenate([getattr(band, field.name) for band in bands])
+                     for field in fields(cls)))
+
+    def crop(self, x0: int, y0: int, x1: int, y1: int) -> "ZoneFields":
+        """The fields of the window [x0:x1, y0:y1], as views"""
+        return ZoneFields(*(getattr(self, field.name)[x0:x1, y0:y1]
+                            for field in fields(self)))
+
+    def water_mask(self) -> np.ndarray:
+        """Deep water that cannot be crossed"""
+        return self.elevation < DEEP_WATER_ELEVATION
+
+    def swamp_mask(self) -> np.ndarray:
+        """Shallow, slightly radioactive marsh"""
+        return ((self.elevation >= DEEP_WATER_ELEVATION) &
+                (self.elevation < SWAMP_ELEVATION))
+
+    def forest_mask(self) -> np.ndarray:
+        """Dry land dense enough to grow trees"""
+        return ((self.elevation >= SWAMP_ELEVATION) &
+                (self.forest_density > FOREST_DENSITY_THRESHOLD))
+
+    def radiation_mask(self) -> np.ndarray:
+        return self.radiation > RADIATION_THRESHOLD
+
+    def radiation_levels(self) -> np.ndarray:
+        """Tile radiation level, zero outside radiation pockets"""
+        return np.where(self.radiation_mask(),
+                        (self.radiation.astype(np.float64) - RADIATION_THRESHOLD) * 2,
+                        0.0)
+
+    def anomaly_mask(self) -> np.ndarray:
+        return self.anomaly > ANOMALY_THRESHOLD
+
+    def anomaly_danger(self) -> np.ndarray:
+        """Anomaly danger level, zero where no anomaly can form"""
+        return np.where(self.anomaly_mask(),
+                        (self.anomaly.astype(np.float64) - ANOMALY_THRESHOLD) * 3,
+                        0.0)
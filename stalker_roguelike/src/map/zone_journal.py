@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from itertools import islice
+
+# Change kinds
+TILES = "tiles"
+SPAWN = "spawn"
+DESPAWN = "despawn"
+MOVE = "move"
+
+MAX_JOURNAL_CHANGES = 1024  # Changes kept for catching up with since()
+MAX_DIRTY_RECTS = 64        # Past this many, dirty rectangles merge into one
+
+Rect = Tuple[int, int, int, int]  # x, y, width, height
+
+
+@dataclass
+class Change:
+    version: int
+    kind: str                                 # TILES, SPAWN, DESPAWN or MOVE
+    rect: Optional[Rect] = None               # Tiles written, for TILES
+    obj: Any = None                           # Entity or item, for the others
+    old_position: Optional[Tuple[int, int]] = None  # Where a MOVE started
+
+
+class ZoneJournal:
+    """Record of what changed in a zone after it was built.
+
+    Every change gets the next version number. Derived data can remember
+    the version it was computed at and either catch up through since(),
+    subscribe to changes as they happen, or just compare versions. Tile
+    writes are also collected as dirty rectangles, merged as they overlap.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.tile_version = 0  # Version of the last tile change
+        self.changes: Deque[Change] = deque(maxlen=MAX_JOURNAL_CHANGES)
+        self.dirty_rects: List[Rect] = []
+        self._start = 0  # Version just before the oldest change kept
+        self._subscribers: List[Callable[[Change], None]] = []
+
+    def __getstate__(self) -> Dict:
+        # Subscribers belong to the running game and changes refer to it, so
+        # a reloaded journal keeps its version but starts a fresh history
+        state = self.__dict__.copy()
+        state["changes"] = deque(maxlen=MAX_JOURNAL_CHANGES)
+        state["_start"] = self.version
+        state["_subscribers"] = []
+        return state
+
+    def subscribe(self, callback: Callable[[Change], None]) -> None:
+        """Call `callback` with every change recorded from now on"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Change], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def since(self, version: int) -> Optional[List[Change]]:
+        """Changes recorded after `version`, oldest first, or None when the
+        history no longer reaches back that far and the caller must rebuild"""
+        if version < self._start:
+            return None
+        return list(islice(self.changes, version - self._start, None))
+
+    def tiles_changed(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """Record a write to the tiles in [x0, x1) x [y0, y1)"""
+        rect = (x0, y0, x1 - x0, y1 - y0)
+        self._record(Change(self.version + 1, TILES, rect=rect))
+        self.tile_version = self.version
+        self._add_dirty(x0, y0, x1, y1)
+
+    def spawned(self, obj) -> None:
+        self._record(Change(self.version + 1, SPAWN, obj=obj))
+
+    def despawned(self, obj) -> None:
+        self._record(Change(self.version + 1, DESPAWN, obj=obj))
+
+    def moved(self, obj, old_x: int, old_y: int) -> None:
+        self._record(Change(self.version + 1, MOVE, obj=obj, old_position=(old_x, old_y)))
+
+    def take_dirty_rects(self) -> List[Rect]:
+        """Tile regions written since the last call, which are then forgotten"""
+        rects, self.dirty_rects = self.dirty_rects, []
+        return rects
+
+    def _record(self, change: Change) -> None:
+        if len(self.changes) == self.changes.maxlen:
+            self._start += 1  # The oldest change drops out
+        self.version = change.version
+        self.changes.append(change)
+        for callback in list(self._subscribers):
+            callback(change)
+
+    def _add_dirty(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        # Absorb every rectangle the new one overlaps or touches, growing it
+        # to their bounding box until nothing more joins
+        rects = self.dirty_rects
+        merged = True
+        while merged:
+            merged = False
+            for i, (x, y, width, height) in enumerate(rects):
+                if x <= x1 and x0 <= x + width and y <= y1 and y0 <= y + height:
+                    x0, y0 = min(x0, x), min(y0, y)
+                    x1, y1 = max(x1, x + width), max(y1, y + height)
+                    del rects[i]
+                    merged = True
+                    break
+        rects.append((x0, y0, x1 - x0, y1 - y0))
+        if len(rects) > MAX_DIRTY_RECTS:
+            left = min(rect[0] for rect in rects)
+            top = min(rect[1] for rect in rects)
+            right = max(rect[0] + rect[2] for rect in rects)
+            bottom = max(rect[1] + rect[3] for rect in rects)
+            self.dirty_rects = [(left, top, right - left, bottom - top)]
@@ -0,0 +1,149 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pickle
+from .zone import Zone, TIER_TERRAIN
+from .generation_pipeline import GenerationProfiler
+
+
+def zones_ahead(zone_x: int, zone_y: int, zone: Zone, player_x: int, player_y: int,
+                edge_distance: int) -> List[Tuple[int, int]]:
+    """Neighbouring zones whose shared edge is within edge_distance, nearest first"""
+    edges = [
+        (player_x, (zone_x - 1, zone_y)),
+        (zone.width - 1 - player_x, (zone_x + 1, zone_y)),
+        (player_y, (zone_x, zone_y - 1)),
+        (zone.height - 1 - player_y, (zone_x, zone_y + 1))
+    ]
+    return [pos for distance, pos in sorted(edges) if distance <= edge_distance]
+
+
+def _generate_zone_in_worker(config: bytes, zone_x: int, zone_y: int, zone_type: str,
+                             tier: int) -> Tuple[Zone, GenerationProfiler]:
+    """Build a zone in a worker process with a copy of the main generator
+    (see MapGenerator.worker_config); it is linked to the world on merge"""
+    from .map_generator import MapGenerator  # Import here to avoid circular imports
+    generator = MapGenerator.from_worker_config(config)
+    zone = generator.build_zone(zone_x, zone_y, zone_type, tier=tier)
+    return zone, generator.profiler
+
+
+class ZonePrefetcher:
+    """Generates the zones a player is walking towards in background processes.
+
+    Workers only build up to `tier`; the rest is added on the main thread
+    when the player enters. Workers get the main generator's settings,
+    prefabs and pipeline with every job, and their pass timings are added
+    to its profiler. Finished zones are merged into
+    `map_generator.partial_zones` from the main thread, so the game never
+    sees a half-linked zone.
+    """
+
+    def __init__(self, map_generator, zone_type_at: Callable[[int, int], str],
+                 max_workers: int = 2, edge_distance: int = 12):
+        self.map_generator = map_generator
+        self.zone_type_at = zone_type_at
+        self.max_workers = max_workers
+        self.edge_distance = edge_distance  # Tiles from an edge before prefetching
+        self.tier = TIER_TERRAIN
+        self.pending: Dict[Tuple[int, int], Future] = {}
+        # Zones submitted and merged since the prefetcher was last idle
+        self._submitted = 0
+        self._merged = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.enabled = True
+
+    @property
+    def current_progress(self) -> Optional[float]:
+        """Share of the zones queued since the last idle moment that are
+        done, or None when idle. Workers do not report progress within a
+        zone, so this moves a zone at a time."""
+        if not self.pending:
+            self._submitted = self._merged = 0
+            return None
+        return self._merged / self._submitted
+
+    def update(self, zone_x: int, zone_y: int, zone: Zone,
+               player_x: int, player_y: int) -> None:
+        """Call once per frame with the player's position in the current zone"""
+        if not self.enabled:
+            return
+
+        wanted = zones_ahead(zone_x, zone_y, zone, player_x, player_y, self.edge_distance)
+
+        # Drop requests the player is no longer heading toward. Jobs that
+        # already started cannot be cancelled and are merged when done.
+        for pos, future in list(self.pending.items()):
+            if pos not in wanted and future.cancel():
+                del self.pending[pos]
+                self._submitted -= 1
+
+        self._merge_finished()
+
+        for pos in wanted:
+            if len(self.pending) >= self.max_workers:
+                break
+            if (pos not in self.pending and not self.map_generator.has_tier(
+                    pos[0], pos[1], self.zone_type_at(*pos), self.tier)):
+                self._submit(pos)
+
+    def take(self, zone_x: int, zone_y: int) -> Optional[Zone]:
+        """Wait for an in-flight zone and merge it, or return None"""
+        future = self.pending.pop((zone_x, zone_y), None)
+        if future is None or future.cancelled():
+            return None
+        try:
+            zone, profile = future.result()
+        except BrokenProcessPool:
+            self.shutdown()
+            return None
+        except Exception:
+            # Let the caller regenerate synchronously and surface the error
+            return None
+        self.map_generator.profiler.merge(profile)
+        return self.map_generator.complete_zone(zone_x, zone_y, zone)
+
+    def shutdown(self) -> None:
+        self.enabled = False
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, pos: Tuple[int, int]) -> None:
+        try:
+            config = self.map_generator.worker_config()
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # A pass was swapped for something workers cannot be sent, so
+            # they would build different zones; generate on demand instead
+            self.shutdown()
+            return
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.pending[pos] = self._executor.submit(
+                _generate_zone_in_worker, config,
+                pos[0], pos[1], self.zone_type_at(*pos), self.tier)
+            self._submitted += 1
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No usable process pool here; zones are generated on demand
+            self.shutdown()
+
+    def _merge_finished(self) -> None:
+        for pos, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[pos]
+            self._merged += 1
+            try:
+                zone, profile = future.result()
+            except BrokenProcessPool:
+                self.shutdown()
+                return
+            except Exception:
+                continue  # Regenerated on demand if the player goes there
+            self.map_generator.profiler.merge(profile)
+            if pos not in self.map_generator.zones:
+                self.map_generator.store_partial_zone(pos, zone)
@@ -0,0 +1,115 @@
+from typing import Callable, Dict, Generator, Optional, Tuple
+from collections import OrderedDict
+import pickle
+import time
+from .zone import Zone, TIER_TERRAIN, TIER_FULL
+from .zone_prefetcher import zones_ahead
+
+ZoneSteps = Generator[float, None, Zone]
+
+
+def run_steps(steps: ZoneSteps) -> Zone:
+    """Drive a resumable zone build to the end and return the zone"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as finished:
+            return finished.value
+
+
+class ZoneStreamer:
+    """Builds the zones a player is walking towards from the main loop.
+
+    Each call to `run` advances the pending builds for at most a fixed time
+    budget, so generation is spread over frames without threads or processes.
+    Zones ahead are only built up to `tier`. Once the player is within
+    `finish_distance` of the edge the rest is built as well, still a slice
+    per frame, and entering the zone only runs whatever is left of that.
+    """
+
+    def __init__(self, map_generator, zone_type_at: Callable[[int, int], str],
+                 edge_distance: int = 12, finish_distance: int = 3):
+        self.map_generator = map_generator
+        self.zone_type_at = zone_type_at
+        self.edge_distance = edge_distance  # Tiles from an edge before building
+        self.finish_distance = finish_distance  # Tiles from an edge before completing
+        self.tier = TIER_TERRAIN
+        self.jobs: "OrderedDict[Tuple[int, int], ZoneSteps]" = OrderedDict()
+        self.progress: Dict[Tuple[int, int], float] = {}
+
+    @property
+    def current_progress(self) -> Optional[float]:
+        """Progress of the build being worked on, or None when idle"""
+        if not self.jobs:
+            return None
+        return self.progress.get(next(iter(self.jobs)), 0.0)
+
+    def update(self, zone_x: int, zone_y: int, zone: Zone,
+               player_x: int, player_y: int, build_ahead: bool = True) -> None:
+        """Queue builds for the zones ahead of the player, nearest first.
+        Without build_ahead only zones whose terrain was already built
+        elsewhere (by the prefetcher) are completed."""
+        wanted = zones_ahead(zone_x, zone_y, zone, player_x, player_y, self.edge_distance)
+        close = zones_ahead(zone_x, zone_y, zone, player_x, player_y, self.finish_distance)
+
+        # Jobs only ever change their own zone, so dropping one leaves any
+        # cached lower tier as it was
+        for pos in list(self.jobs):
+            if pos not in wanted:
+                self._drop(pos)
+
+        generator = self.map_generator
+        for pos in wanted:
+            if pos in self.jobs or pos in generator.zones:
+                continue
+            zone_type = self.zone_type_at(*pos)
+            if pos in close:
+                self._queue_completion(pos, zone_type, build_ahead)
+            elif build_ahead and not generator.has_tier(pos[0], pos[1], zone_type, self.tier):
+                self.jobs[pos] = generator.build_zone_steps(pos[0], pos[1], zone_type,
+                                                            tier=self.tier)
+                self.progress[pos] = 0.0
+
+    def run(self, budget_ms: float) -> None:
+        """Advance pending builds until budget_ms has been spent"""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while self.jobs and time.perf_counter() < deadline:
+            pos, steps = next(iter(self.jobs.items()))
+            try:
+                self.progress[pos] = next(steps)
+            except StopIteration as finished:
+                self._drop(pos)
+                if pos not in self.map_generator.zones:
+                    self.map_generator.store_partial_zone(pos, finished.value)
+
+    def finish(self, zone_x: int, zone_y: int) -> Optional[Zone]:
+        """Complete a pending build right now and register it, or return None.
+        Registering drops the zone's cached lower tier."""
+        steps = self.jobs.get((zone_x, zone_y))
+        if steps is None:
+            return None
+        self._drop((zone_x, zone_y))
+        return self.map_generator.complete_zone(zone_x, zone_y, run_steps(steps))
+
+    def _queue_completion(self, pos: Tuple[int, int], zone_type: str,
+                          build_ahead: bool) -> None:
+        """Queue the remaining tiers of a zone the player is about to enter,
+        ahead of every other build. The build carries on from a copy of the
+        cached lower tier, which only gives way once the copy is complete."""
+        generator = self.map_generator
+        zone = generator.partial_zones.get(pos)
+        if zone is not None and zone.zone_type == zone_type:
+            if zone.tier >= TIER_FULL:
+                return
+            zone = pickle.loads(pickle.dumps(zone, protocol=pickle.HIGHEST_PROTOCOL))
+        elif build_ahead:
+            zone = None
+        else:
+            return  # Terrain is still being built elsewhere
+        self.jobs[pos] = generator.build_zone_steps(pos[0], pos[1], zone_type, zone=zone)
+        self.jobs.move_to_end(pos, last=False)
+        self.progress[pos] = 0.0
+
+    def _drop(self, pos: Tuple[int, int]) -> None:
+        del self.jobs[pos]
+        self.progress.pop(pos, None)
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pygame
 from ..entities.player import Player
 
@@ -8,7 +8,8 @@ class HUD:
         self.message_font = pygame.font.Font(None, 20)
         self.padding = 10
         
-    def render(self, surface: pygame.Surface, player: Player, messages: List[Dict]) -> None:
+    def render(self, surface: pygame.Surface, player: Player, messages: List[Dict],
+               loading_progress: Optional[float] = None) -> None:
         # Render health bar
         self._render_bar(surface, 
                         self.padding, 
@@ -36,6 +37,10 @@ class HUD:
         rad_surface = self.font.render(rad_text, True, (0, 255, 0))
         surface.blit(rad_surface, (self.padding, self.padding * 3 + 40))
         
+        # Render zone generation progress
+        if loading_progress is not None:
+            self._render_loading(surface, loading_progress)
+            
         # Render messages
         message_y = surface.get_height() - (len(messages) * 20 + self.padding)
         for message in messages:
@@ -43,6 +48,17 @@ class HUD:
             surface.blit(text_surface, (self.padding, message_y))
             message_y += 20
             
+    def _render_loading(self, surface: pygame.Surface, progress: float) -> None:
+        """Small bar in the top right corner while a nearby zone is generated"""
+        width, height = 150, 8
+        x = surface.get_width() - width - self.padding
+        y = self.padding
+        pygame.draw.rect(surface, (70, 70, 70), (x, y, width, height))
+        pygame.draw.rect(surface, (200, 200, 120), (x, y, int(width * progress), height))
+        
+        text_surface = self.message_font.render("Generating area...", True, (200, 200, 200))
+        surface.blit(text_surface, (x, y + height + 4))
+            
     def _render_bar(self, surface: pygame.Surface, x: int, y: int, width: int, height: int,
                    value: float, maximum: float, color: tuple[int, int, int], text: str) -> None:
         # Background
@@ -1,6 +1,8 @@
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+import numpy as np
 import pygame
 from ..map.zone import Zone
+from ..map.zone_fields import ZoneFields
 from ..entities.player import Player
 
 class Minimap:
@@ -20,50 +22,71 @@ class Minimap:
             "wall": (128, 128, 128),
             "water": (0, 0, 150),
             "radiation": (0, 255, 0, 128),
-            "anomaly": (255, 0, 255)
+            "anomaly": (255, 0, 255),
+            "swamp": (40, 70, 50),
+            "forest": (20, 80, 20)
         }
         
-    def render(self, surface: pygame.Surface, zone: Zone, player: Player) -> None:
+    def view(self, player: Player) -> Tuple[int, int, int, int]:
+        """Tiles shown, (start_x, start_y, end_x, end_y), centred on the player.
+        The view runs past the zone's edges into its neighbours."""
+        start_x = player.x - self.visible_range // 2
+        start_y = player.y - self.visible_range // 2
+        return start_x, start_y, start_x + self.visible_range, start_y + self.visible_range
+        
+    def neighbours_in_view(self, zone: Zone, player: Player) -> List[Tuple[int, int]]:
+        """Offsets (dx, dy) of the neighbouring zones the view reaches into"""
+        start_x, start_y, end_x, end_y = self.view(player)
+        xs = [dx for dx, seen in ((-1, start_x < 0), (0, True), (1, end_x > zone.width)) if seen]
+        ys = [dy for dy, seen in ((-1, start_y < 0), (0, True), (1, end_y > zone.height)) if seen]
+        return [(dx, dy) for dx in xs for dy in ys if (dx, dy) != (0, 0)]
+        
+    def render(self, surface: pygame.Surface, zone: Zone, player: Player,
+               previews: Optional[Dict[Tuple[int, int], ZoneFields]] = None) -> None:
+        """Draw the explored part of the zone around the player. `previews`
+        holds the noise fields of unvisited neighbours by (dx, dy) offset."""
         # Create transparent surface
         self.surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
         self.surface.fill(self.colors["background"])
         
         # Calculate visible area
-        half_range = self.visible_range // 2
-        start_x = max(0, player.x - half_range)
-        start_y = max(0, player.y - half_range)
-        end_x = min(zone.width, start_x + self.visible_range)
-        end_y = min(zone.height, start_y + self.visible_range)
+        start_x, start_y, end_x, end_y = self.view(player)
         
-        # Draw tiles
-        for x in range(start_x, end_x):
-            for y in range(start_y, end_y):
+        # Zones next door that have not been generated yet
+        for (dx, dy), fields in (previews or {}).items():
+            self._render_neighbour(zone, fields, dx, dy, start_x, start_y, end_x, end_y)
+            
+        # Draw tiles straight from the zone's tile arrays
+        store = zone.store
+        x0, y0 = max(0, start_x), max(0, start_y)
+        x1, y1 = min(zone.width, end_x), min(zone.height, end_y)
+        explored = zone.explored_tiles[x0:x1, y0:y1].tolist()
+        for x in range(x0, x1):
+            for y in range(y0, y1):
+                if not explored[x - x0][y - y0]:
+                    continue
+                    
                 map_x = (x - start_x) * self.tile_size
                 map_y = (y - start_y) * self.tile_size
                 
-                tile = zone.tiles[x][y]
-                if not tile.explored:
-                    continue
-                    
                 # Draw base tile
-                color = self._get_tile_color(tile)
+                color = self._get_tile_color(store, x, y)
                 pygame.draw.rect(self.surface, color,
                                (map_x, map_y, self.tile_size, self.tile_size))
                 
                 # Draw anomalies
-                if tile.properties.anomaly_type:
+                if store.anomaly[x, y]:
                     pygame.draw.rect(self.surface, self.colors["anomaly"],
                                    (map_x, map_y, self.tile_size, self.tile_size))
                     
         # Draw entities
-        for entity in zone.entities:
-            if start_x <= entity.x < end_x and start_y <= entity.y < end_y:
-                map_x = (entity.x - start_x) * self.tile_size
-                map_y = (entity.y - start_y) * self.tile_size
-                
-                color = self.colors["player"] if isinstance(entity, Player) else self.colors["enemy"]
-                pygame.draw.rect(self.surface, color,
-                               (map_x, map_y, self.tile_size, self.tile_size))
+        for entity in zone.entity_index.in_rect(x0, y0, x1, y1):
+            map_x = (entity.x - start_x) * self.tile_size
+            map_y = (entity.y - start_y) * self.tile_size
+            
+            color = self.colors["player"] if isinstance(entity, Player) else self.colors["enemy"]
+            pygame.draw.rect(self.surface, color,
+                           (map_x, map_y, self.tile_size, self.tile_size))
                 
         # Draw border
         pygame.draw.rect(self.surface, self.colors["border"], 
@@ -73,11 +96,40 @@ class Minimap:
         surface.blit(self.surface, 
                     (surface.get_width() - self.size - self.padding, self.padding))
         
-    def _get_tile_color(self, tile) -> Tuple[int, int, int]:
-        if tile.properties.blocks_movement:
+    def render_preview(self, surface: pygame.Surface, fields: ZoneFields,
+                       rect: Tuple[int, int, int, int]) -> None:
+        """Draw a zone that has not been generated yet from its noise fields
+        (see MapGenerator.preview)"""
+        colors = np.empty(fields.shape + (3,), dtype=np.uint8)
+        colors[:] = (50, 50, 50)
+        colors[fields.forest_mask()] = self.colors["forest"]
+        colors[fields.swamp_mask()] = self.colors["swamp"]
+        colors[fields.water_mask()] = self.colors["water"]
+        radiation = fields.radiation_mask()
+        colors[radiation] = colors[radiation] // 2 + np.array((0, 100, 0), dtype=np.uint8)  # Green tint
+        
+        # Fields are indexed [x, y] like surfarray, so no transpose is needed
+        preview = pygame.surfarray.make_surface(colors)
+        surface.blit(pygame.transform.scale(preview, rect[2:]), rect[:2])
+        
+    def _render_neighbour(self, zone: Zone, fields: ZoneFields, dx: int, dy: int,
+                          start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        # The neighbour's tiles in this zone's coordinates, clipped to the view
+        left = dx * zone.width
+        top = dy * zone.height
+        x0, x1 = max(start_x, left), min(end_x, left + zone.width)
+        y0, y1 = max(start_y, top), min(end_y, top + zone.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.render_preview(self.surface, fields.crop(x0 - left, y0 - top, x1 - left, y1 - top),
+                            ((x0 - start_x) * self.tile_size, (y0 - start_y) * self.tile_size,
+                             (x1 - x0) * self.tile_size, (y1 - y0) * self.tile_size))
+        
+    def _get_tile_color(self, store, x: int, y: int) -> Tuple[int, int, int]:
+        if store.blocks_movement[x, y]:
             return self.colors["wall"]
-        elif tile.properties.radiation_level > 0:
+        elif store.radiation_level[x, y] > 0:
             return self.colors["radiation"]
-        elif "water" in tile.tile_type:
+        elif store.is_water[x, y]:
             return self.colors["water"]
-        return (50, 50, 50)  # Default floor color 
\ No newline at end of file
+        return (50, 50, 50)  # Default floor color
\ No newline at end of file
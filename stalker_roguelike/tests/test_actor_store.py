@@ -0,0 +1,106 @@
+import pickle
+import random
+from src.components.actor_store import CombatView, StatsView
+from src.components.combat import Combat
+from src.components.stats import Stats
+from src.entities.enemies import Enemy
+from src.map.zone import Zone
+
+TICKS = 120
+
+
+def populate(count, seed):
+    rng = random.Random(seed)
+    zone = Zone(40, 40, "wilderness")
+    for _ in range(count):
+        enemy = Enemy(rng.randrange(zone.width), rng.randrange(zone.height),
+                      "Z", (0, 255, 0), "zombie")
+        enemy.stats.current_stamina = rng.randrange(enemy.stats.max_stamina)
+        enemy.stats.current_health = rng.uniform(1, enemy.stats.max_health)
+        if rng.random() < 0.6:
+            enemy.combat.bleeding_rate = rng.uniform(0.05, 3.0)
+        for effect in rng.sample(["limping", "poisoned", "stunned"], rng.randrange(3)):
+            enemy.combat.status_effects[effect] = rng.randrange(1, TICKS // 2)
+        zone.add_entity(enemy)
+    return zone
+
+
+def step(stats, combat):
+    # Actor.update's systems, one plain object at a time
+    if stats.current_stamina < stats.max_stamina:
+        stats.modify_stamina(1)
+    damage = combat.update_effects()
+    if damage > 0:
+        stats.modify_health(-damage)
+
+
+def state(stats, combat):
+    return (stats.current_health, stats.current_stamina, combat.bleeding_rate,
+            dict(combat.status_effects))
+
+
+def test_tick_matches_per_object_updates():
+    zone = populate(60, 1)
+    plain = [(enemy.stats.detach(), enemy.combat.detach()) for enemy in zone.entities]
+    assert all(type(stats) is Stats and type(combat) is Combat for stats, combat in plain)
+    for _ in range(TICKS):
+        zone.actors.tick()
+        for stats, combat in plain:
+            step(stats, combat)
+        for enemy, (stats, combat) in zip(zone.entities, plain):
+            assert state(enemy.stats, enemy.combat) == state(stats, combat)
+    # Some actors bled out, and every effect ran down
+    assert any(enemy.stats.current_health == 0 for enemy in zone.entities)
+    assert not any(enemy.combat.status_effects for enemy in zone.entities)
+
+
+def test_view_update_effects_matches_combat():
+    zone = populate(20, 2)
+    plain = [enemy.combat.detach() for enemy in zone.entities]
+    for _ in range(TICKS // 2):
+        for enemy, combat in zip(zone.entities, plain):
+            assert enemy.combat.update_effects() == combat.update_effects()
+            assert dict(enemy.combat.status_effects) == combat.status_effects
+
+
+def test_released_slots_are_left_alone():
+    zone = populate(30, 3)
+    removed = zone.entities[::3]
+    for enemy in removed:
+        zone.remove_entity(enemy)
+    kept = [(enemy, enemy.stats.detach(), enemy.combat.detach()) for enemy in zone.entities]
+    released = [state(enemy.stats, enemy.combat) for enemy in removed]
+    assert len(zone.actors) == len(kept)
+    for _ in range(TICKS // 4):
+        zone.actors.tick()
+        for enemy, stats, combat in kept:
+            step(stats, combat)
+    assert [state(enemy.stats, enemy.combat) for enemy in removed] == released
+    for enemy, stats, combat in kept:
+        assert state(enemy.stats, enemy.combat) == state(stats, combat)
+
+    # Freed slots are reused by new actors, and stores pickle as plain objects
+    zone.add_entity(removed[0])
+    assert removed[0].actor_slot in {enemy.actor_slot for enemy in removed}
+    assert isinstance(removed[0].stats, StatsView)
+    assert isinstance(removed[0].combat, CombatView)
+    restored = pickle.loads(pickle.dumps(removed[0].stats))
+    assert type(restored) is Stats
+    assert restored.current_health == removed[0].stats.current_health
+
+
+def test_whole_stats_read_back_as_int():
+    zone = Zone(10, 10, "wilderness")
+    enemy = Enemy(3, 3, "Z", (0, 255, 0), "zombie")
+    zone.add_entity(enemy)
+    assert isinstance(enemy.stats, StatsView)
+    plain = Stats(enemy.stats.max_health, enemy.stats.max_stamina)
+    for field in ("max_health", "current_health", "max_stamina", "current_stamina"):
+        assert type(getattr(enemy.stats, field)) is int, field
+    assert f"{enemy.stats.current_health}" == f"{plain.current_health}"
+
+    enemy.stats.modify_health(-2.5)
+    plain.modify_health(-2.5)
+    assert enemy.stats.current_health == plain.current_health
+    assert type(enemy.stats.current_health) is float
+    assert type(enemy.stats.detach().current_stamina) is int
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from src.map.area_table import SummedAreaTable
+
+
+def make_mask(width=30, height=22, density=0.2, seed=5):
+    return np.random.default_rng(seed).random((width, height)) < density
+
+
+def test_counts_match_brute_force_sums():
+    mask = make_mask()
+    table = SummedAreaTable(mask)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        x0, x1 = sorted(rng.integers(-3, 34, 2))
+        y0, y1 = sorted(rng.integers(-3, 26, 2))
+        clipped = mask[max(x0, 0):max(x1, 0), max(y0, 0):max(y1, 0)]
+        assert table.count(x0, y0, x1, y1) == clipped.sum()
+        inside = x0 >= 0 and y0 >= 0 and x1 <= 30 and y1 <= 22
+        assert table.is_clear(x0, y0, x1, y1) == (inside and not clipped.any())
+
+
+@pytest.mark.parametrize("width,height,margin", [(1, 1, 0), (3, 2, 0), (4, 4, 1), (2, 5, 2)])
+def test_clear_positions_match_brute_force_windows(width, height, margin):
+    mask = make_mask(density=0.03)
+    valid = SummedAreaTable(mask).clear_positions(width, height, margin)
+    expected = np.zeros(mask.shape, dtype=bool)
+    for x in range(mask.shape[0]):
+        for y in range(mask.shape[1]):
+            x0, y0 = x - margin, y - margin
+            x1, y1 = x + width + margin, y + height + margin
+            if x0 >= 0 and y0 >= 0 and x1 <= mask.shape[0] and y1 <= mask.shape[1]:
+                expected[x, y] = not mask[x0:x1, y0:y1].any()
+    assert expected.any()
+    assert np.array_equal(valid, expected)
+
+
+def test_footprint_larger_than_the_mask_fits_nowhere():
+    table = SummedAreaTable(np.zeros((6, 4), dtype=bool))
+    assert table.clear_positions(4, 4).sum() == 3
+    assert not table.clear_positions(5, 5).any()
+    assert not table.clear_positions(3, 3, margin=1).any()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from src.map.atlas import WorldAtlas, bake_atlas, ATLAS_MAGIC
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TILE_LAYERS
+
+SEED = 2024
+# Away from the wilderness start zone, whose bandits cannot be built yet
+POSITIONS = [(1, 0), (2, 0), (1, 1)]
+
+
+@pytest.fixture(scope="module")
+def atlas_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("atlas") / "world.atlas")
+    assert bake_atlas(path, SEED, POSITIONS, workers=2) == len(POSITIONS)
+    return path
+
+
+def make_generator(tmp_path):
+    generator = MapGenerator(10, 10, max_resident_zones=1, spill_dir=str(tmp_path))
+    generator.seed = SEED
+    return generator
+
+
+def mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_atlas_zones_match_generated_ones(atlas_path, tmp_path):
+    atlas = WorldAtlas(atlas_path)
+    assert atlas.seed == SEED and len(atlas) == len(POSITIONS)
+    assert atlas.zone_type(0, 0) is None
+
+    baked = make_generator(tmp_path / "baked")
+    baked.load_atlas(atlas_path, seed=SEED)
+    fresh = make_generator(tmp_path / "fresh")
+    for pos in POSITIONS:
+        assert baked.is_baked(*pos, "forest")
+        zone = baked.generate_zone(*pos, "forest")
+        expected = fresh.generate_zone(*pos, "forest")
+        for layer in TILE_LAYERS:
+            assert mapped(getattr(zone.store, layer)), layer
+            assert np.array_equal(getattr(zone.store, layer),
+                                  getattr(expected.store, layer)), layer
+        assert [(e.x, e.y) for e in zone.entities] == [(e.x, e.y) for e in expected.entities]
+        assert zone.anomalies == expected.anomalies
+    assert baked.profiler.zones == {}
+
+
+def test_edited_atlas_zone_spills_without_changing_the_file(atlas_path, tmp_path):
+    with open(atlas_path, "rb") as f:
+        before = f.read()
+    generator = make_generator(tmp_path)
+    generator.load_atlas(atlas_path)
+    zone = generator.generate_zone(1, 0, "forest")
+    zone.fill_rect(3, 4, 2, 2, "wall")
+    generator.generate_zone(2, 0, "forest")  # Spills (1, 0)
+
+    restored = generator.zones[(1, 0)]
+    assert np.array_equal(restored.store.terrain, zone.store.terrain)
+    assert generator.profiler.zones == {}  # Diffed against the atlas, not a rebuild
+    assert generator.zones.stats.spill_bytes < zone.store.terrain.nbytes
+    with open(atlas_path, "rb") as f:
+        assert f.read() == before
+    generator.zones.close()
+
+
+def test_atlas_is_rejected_on_a_different_format_or_seed(atlas_path, tmp_path):
+    with pytest.raises(ValueError):
+        make_generator(tmp_path).load_atlas(atlas_path, seed=SEED + 1)
+
+    stale = tmp_path / "stale.atlas"
+    with open(atlas_path, "rb") as f:
+        data = f.read()
+    stale.write_bytes(b"STKATLS0" + data[len(ATLAS_MAGIC):])
+    with pytest.raises(ValueError):
+        WorldAtlas(str(stale))
+    with pytest.raises(ValueError):
+        make_generator(tmp_path).load_atlas(str(stale))
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TERRAIN_IDS
+
+POSITIONS = [(2, 3), (5, 1), (7, 7)]
+
+
+def build(zone_type, pos, disabled=()):
+    generator = MapGenerator(10, 10)
+    generator.seed = 99
+    for name in disabled:
+        generator.pipeline.set_enabled(zone_type, name, False)
+    return generator.build_zone(*pos, zone_type)
+
+
+def road_grid(zone):
+    grid = np.zeros((zone.width, zone.height), dtype=bool)
+    grid[::8, :] = True
+    grid[:, ::8] = True
+    return grid
+
+
+@pytest.mark.parametrize("pos", POSITIONS)
+def test_swamp_pools_flood_walkable_ground_only(pos):
+    before = build("swamp", pos, ["swamp_pools", "spawn_enemies", "hazards"])
+    after = build("swamp", pos, ["spawn_enemies", "hazards"])
+    pools = after.store.radiation_level != before.store.radiation_level
+    walkable = ~before.store.blocks_movement
+    assert not (pools & ~walkable).any()
+    assert 0.25 < pools.sum() / walkable.sum() < 0.35
+    assert after.store.is_water[pools].all()
+    assert (after.store.terrain[pools] == TERRAIN_IDS["water"]).all()
+    assert np.array_equal(after.store.terrain[~pools], before.store.terrain[~pools])
+
+
+@pytest.mark.parametrize("pos", POSITIONS)
+def test_roads_follow_the_grid_and_houses_stay_off_them(pos):
+    bare = build("urban", pos, ["roads", "buildings", "spawn_enemies"])
+    roads = build("urban", pos, ["buildings", "spawn_enemies"])
+    town = build("urban", pos, ["spawn_enemies"])
+    grid = road_grid(bare)
+
+    paved = grid & ~bare.store.blocks_movement
+    assert (roads.store.terrain[paved] == TERRAIN_IDS["floor"]).all()
+    assert not roads.store.is_water[paved].any()
+    unchanged = ~paved
+    assert np.array_equal(roads.store.terrain[unchanged], bare.store.terrain[unchanged])
+
+    assert np.array_equal(town.store.terrain[grid], roads.store.terrain[grid])
+    assert (town.store.terrain[~grid] == TERRAIN_IDS["wall"]).sum() > \
+        (roads.store.terrain[~grid] == TERRAIN_IDS["wall"]).sum()
@@ -0,0 +1,97 @@
+from collections import deque
+import numpy as np
+import pytest
+from src.map.bitboard import Bitboard
+from src.map.connectivity import label_components
+
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONALS = NEIGHBOURS + [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def random_mask(seed, shape=(23, 17), density=0.55):
+    return np.random.default_rng(seed).random(shape) < density
+
+
+def flood(mask, start, diagonal=False):
+    """Reference breadth-first flood fill"""
+    reached = np.zeros_like(mask)
+    reached[start] = True
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in DIAGONALS if diagonal else NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if (0 <= nx < mask.shape[0] and 0 <= ny < mask.shape[1] and
+                    mask[nx, ny] and not reached[nx, ny]):
+                reached[nx, ny] = True
+                queue.append((nx, ny))
+    return reached
+
+
+def regions(mask, diagonal=False):
+    left = mask.copy()
+    found = []
+    while left.any():
+        region = flood(mask, tuple(np.argwhere(left)[0]), diagonal)
+        found.append(region)
+        left &= ~region
+    return found
+
+
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_flood_fill_matches_breadth_first_search(diagonal):
+    for seed in range(20):
+        mask = random_mask(seed)
+        board = Bitboard.from_mask(mask)
+        start = tuple(np.argwhere(mask)[seed % mask.sum()])
+        seeds = Bitboard.from_cells(*mask.shape, [start])
+        assert np.array_equal(board.flood_fill(seeds, diagonal=diagonal).to_mask(),
+                              flood(mask, start, diagonal))
+
+
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_largest_region_matches_labelling(diagonal):
+    for seed in range(20):
+        mask = random_mask(seed)
+        largest = Bitboard.from_mask(mask).largest_region(diagonal).to_mask()
+        sizes = sorted(region.sum() for region in regions(mask, diagonal))
+        assert largest.sum() == sizes[-1]
+        assert any(np.array_equal(largest, region) for region in regions(mask, diagonal))
+
+        labels, label_sizes, biggest = label_components(mask, diagonal)
+        assert sorted(label_sizes[1:].tolist()) == sizes
+        assert label_sizes[biggest] == sizes[-1]
+        # Every labelled region is one of the flood-filled ones
+        for label in range(1, len(label_sizes)):
+            region = labels == label
+            assert np.array_equal(flood(mask, tuple(np.argwhere(region)[0]), diagonal), region)
+
+
+def test_set_operations_match_masks():
+    a, b = random_mask(1), random_mask(2)
+    board_a, board_b = Bitboard.from_mask(a), Bitboard.from_mask(b)
+    assert np.array_equal((board_a & board_b).to_mask(), a & b)
+    assert np.array_equal((board_a | board_b).to_mask(), a | b)
+    assert np.array_equal((board_a ^ board_b).to_mask(), a ^ b)
+    assert np.array_equal((board_a - board_b).to_mask(), a & ~b)
+    assert np.array_equal((~board_a).to_mask(), ~a)
+    assert board_a.popcount() == a.sum()
+    assert sorted(board_a.cells()) == sorted(map(tuple, np.argwhere(a).tolist()))
+    assert Bitboard.from_mask(a) == board_a
+
+
+def test_shift_and_dilate_match_masks():
+    mask = random_mask(4)
+    board = Bitboard.from_mask(mask)
+    for dx, dy in [(1, 0), (-2, 0), (0, 3), (-1, -1), (2, -3)]:
+        expected = np.zeros_like(mask)
+        w, h = mask.shape
+        expected[max(dx, 0):w + min(dx, 0), max(dy, 0):h + min(dy, 0)] = \
+            mask[max(-dx, 0):w - max(dx, 0), max(-dy, 0):h - max(dy, 0)]
+        assert np.array_equal(board.shift(dx, dy).to_mask(), expected)
+
+    padded = np.pad(mask, 1)
+    grown = padded[1:-1, 1:-1].copy()
+    for dx, dy in NEIGHBOURS:
+        grown |= padded[1 + dx:padded.shape[0] - 1 + dx, 1 + dy:padded.shape[1] - 1 + dy]
+    assert np.array_equal(board.dilate().to_mask(), grown)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from src.map.cave_generator import (
+    drunkard_walks, cellular_caves, neighbour_counts, carve_l_corridor
+)
+from src.map.connectivity import label_components
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TERRAIN_IDS
+from src.map.zone import TIER_TERRAIN
+
+POSITIONS = [(0, 3), (4, 4), (6, 1), (9, 8)]
+
+
+def build(pos, cellular, connect=True):
+    generator = MapGenerator(10, 10)
+    generator.seed = 1234
+    generator.cellular_caves = cellular
+    generator.pipeline.set_enabled("underground", "connectivity", connect)
+    return generator.build_zone(*pos, "underground", tier=TIER_TERRAIN)
+
+
+@pytest.mark.parametrize("cellular", [False, True])
+@pytest.mark.parametrize("pos", POSITIONS)
+def test_underground_is_one_walkable_region(pos, cellular):
+    zone = build(pos, cellular)
+    walkable = zone.store.walkable_mask()
+    assert label_components(walkable)[0].max() == 1
+    assert walkable.sum() > zone.width * zone.height // 10
+
+    # Only the pockets cut off from the main region were walled in
+    raw = build(pos, cellular, connect=False).store.walkable_mask()
+    raw_labels, _, raw_largest = label_components(raw)
+    assert np.array_equal(walkable, raw_labels == raw_largest)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_walks_stay_in_the_border_and_join_up(seed):
+    floor = drunkard_walks(40, 30, np.random.default_rng(seed), num_walks=6)
+    border = floor.copy()
+    border[1:-1, 1:-1] = False
+    assert border.sum() <= 6  # Only where a walk started
+    # Each walk moves at most one tile per axis per step, so with diagonal
+    # moves every walk is one region
+    assert 1 <= label_components(floor, diagonal=True)[0].max() <= 6
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_cellular_caves_keep_a_solid_border(seed):
+    floor = cellular_caves(48, 40, np.random.default_rng(seed))
+    assert not floor[[0, -1], :].any() and not floor[:, [0, -1]].any()
+    assert 0.2 < floor.mean() < 0.8
+    again = cellular_caves(48, 40, np.random.default_rng(seed))
+    assert np.array_equal(floor, again)
+
+
+@pytest.mark.parametrize("outside", [False, True])
+def test_neighbour_counts_match_brute_force(outside):
+    mask = np.random.default_rng(3).random((12, 9)) < 0.5
+    counts = neighbour_counts(mask, outside=outside)
+    for x in range(12):
+        for y in range(9):
+            expected = 0
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if dx or dy:
+                        nx, ny = x + dx, y + dy
+                        inside = 0 <= nx < 12 and 0 <= ny < 9
+                        expected += mask[nx, ny] if inside else outside
+            assert counts[x, y] == expected
+
+
+@pytest.mark.parametrize("horizontal_first", [False, True])
+def test_l_corridor_joins_its_ends(horizontal_first):
+    floor = np.zeros((20, 20), dtype=bool)
+    carve_l_corridor(floor, 15, 3, 2, 17, horizontal_first)
+    assert floor[15, 3] and floor[2, 17]
+    assert floor[(2, 3) if horizontal_first else (15, 17)]
+    assert floor.sum() == 14 + 15 - 1
+    assert label_components(floor)[0].max() == 1
@@ -0,0 +1,82 @@
+from collections import deque
+import numpy as np
+import pytest
+from src.map.connectivity import DisjointSet, label_components
+
+STRAIGHT = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONAL = STRAIGHT + [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def flood_fill_regions(mask, diagonal):
+    """Reference: the set of cells in each region, found one BFS at a time"""
+    width, height = mask.shape
+    seen = np.zeros(mask.shape, dtype=bool)
+    regions = []
+    for x in range(width):
+        for y in range(height):
+            if not mask[x, y] or seen[x, y]:
+                continue
+            region = set()
+            queue = deque([(x, y)])
+            seen[x, y] = True
+            while queue:
+                cx, cy = queue.popleft()
+                region.add((cx, cy))
+                for dx, dy in DIAGONAL if diagonal else STRAIGHT:
+                    nx, ny = cx + dx, cy + dy
+                    if (0 <= nx < width and 0 <= ny < height and
+                            mask[nx, ny] and not seen[nx, ny]):
+                        seen[nx, ny] = True
+                        queue.append((nx, ny))
+            regions.append(frozenset(region))
+    return regions
+
+
+def labelled_regions(labels):
+    return [frozenset(zip(*np.nonzero(labels == label)))
+            for label in range(1, labels.max() + 1)]
+
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("density", [0.3, 0.55, 0.8])
+def test_labels_match_a_flood_fill(diagonal, density):
+    rng = np.random.default_rng(int(density * 100))
+    mask = rng.random((48, 40)) < density
+    labels, sizes, largest = label_components(mask, diagonal=diagonal)
+    regions = labelled_regions(labels)
+    expected = flood_fill_regions(mask, diagonal)
+
+    assert labels.dtype == np.int32 and labels.shape == mask.shape
+    assert not labels[~mask].any() and labels[mask].all()
+    assert set(regions) == set(expected) and len(regions) == len(expected)
+    assert list(sizes[1:]) == [len(region) for region in regions] and sizes[0] == 0
+    assert sizes[largest] == max(len(region) for region in expected)
+
+
+def test_regions_joined_only_by_a_corner():
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[0, 0] = mask[1, 1] = mask[2, 2] = True
+    mask[3, 0] = True
+    assert label_components(mask)[0].max() == 4
+    labels, sizes, largest = label_components(mask, diagonal=True)
+    assert labels.max() == 2
+    assert sizes[largest] == 3 and labels[3, 0] != largest
+
+
+def test_empty_and_full_masks():
+    labels, sizes, largest = label_components(np.zeros((5, 3), dtype=bool))
+    assert not labels.any() and list(sizes) == [0] and largest == 0
+    labels, sizes, largest = label_components(np.ones((5, 3), dtype=bool))
+    assert (labels == 1).all() and list(sizes) == [0, 15] and largest == 1
+
+
+def test_disjoint_set_unions_by_size():
+    regions = DisjointSet(6)
+    assert regions.union(0, 1) and regions.union(2, 1)
+    assert not regions.union(0, 2)
+    assert regions.union(3, 4)
+    roots = regions.roots()
+    assert roots[0] == roots[1] == roots[2] == regions.find(1)
+    assert roots[3] == roots[4] != roots[0]
+    assert roots[5] == 5
+    assert regions.size[regions.find(0)] == 3
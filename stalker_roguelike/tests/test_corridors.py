@@ -0,0 +1,59 @@
+import random
+import numpy as np
+import pytest
+from src.map.connectivity import DisjointSet, label_components
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TERRAIN_IDS
+from src.map.zone import Zone
+
+
+def manhattan(centers, i, j):
+    return int(np.abs(centers[i] - centers[j]).sum())
+
+
+def prim_weight(centers):
+    """Reference: total length of a minimum spanning tree, by Prim's algorithm"""
+    inside = {0}
+    total = 0
+    while len(inside) < len(centers):
+        weight, j = min((manhattan(centers, i, j), j) for i in inside
+                        for j in range(len(centers)) if j not in inside)
+        inside.add(j)
+        total += weight
+    return total
+
+
+@pytest.mark.parametrize("count", [2, 5, 15, 40])
+def test_tree_spans_every_room_with_minimum_length(count):
+    generator = MapGenerator(10, 10)
+    centers = np.random.default_rng(count).integers(0, 64, (count, 2))
+    edges = generator._corridor_edges(centers)
+    tree, loops = edges[:count - 1], edges[count - 1:]
+
+    regions = DisjointSet(count)
+    assert all(regions.union(i, j) for i, j in tree)  # No cycles
+    assert len(set(regions.roots())) == 1
+    assert sum(manhattan(centers, i, j) for i, j in tree) == prim_weight(centers)
+
+    assert len(loops) == int(count * generator.corridor_loop_fraction)
+    assert len(set(edges)) == len(edges)
+    assert all(i < j for i, j in edges)
+
+
+def test_fewer_than_two_rooms_need_no_corridors():
+    generator = MapGenerator(10, 10)
+    assert generator._corridor_edges(np.zeros((0, 2), dtype=np.int64)) == []
+    assert generator._corridor_edges(np.array([[4, 4]])) == []
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_connected_rooms_form_one_region(seed):
+    generator = MapGenerator(10, 10)
+    zone = Zone(64, 64, "underground")
+    zone.fill_rect(0, 0, 64, 64, "wall")
+    rng = random.Random(seed)
+    rooms = generator._generate_rooms(zone, rng)
+    generator._connect_rooms(zone, rooms, rng)
+    assert len(rooms) > 1
+    floor = zone.store.terrain == TERRAIN_IDS["floor"]
+    assert label_components(floor)[0].max() == 1
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from src.constants import TERRAIN_WALL
+from src.map.fov import shadowcast, view_radius, MIN_LIGHT
+from src.map.tile import WALL_PROPERTIES
+from src.map.zone import Zone
+
+
+def random_walls(seed, shape=(19, 15), density=0.25):
+    return np.random.default_rng(seed).random(shape) < density
+
+
+def cast(walls, x, y, radius):
+    return shadowcast(walls.tobytes(), walls.shape[0], walls.shape[1], x, y, radius)
+
+
+def disc(shape, x, y, radius):
+    xs, ys = np.indices(shape)
+    return (xs - x) ** 2 + (ys - y) ** 2 <= radius * radius
+
+
+@pytest.mark.parametrize("radius", [3, 7, 30])
+def test_open_tiles_see_each_other_both_ways(radius):
+    for seed in range(6):
+        walls = random_walls(seed)
+        open_tiles = [tuple(cell) for cell in np.argwhere(~walls).tolist()]
+        views = {cell: cast(walls, *cell, radius) for cell in open_tiles}
+        seen = np.array([[views[a][b] for b in open_tiles] for a in open_tiles])
+        assert np.array_equal(seen, seen.T)
+
+
+def test_view_mirrors_with_the_map():
+    for seed in range(10):
+        walls = random_walls(seed)
+        w, h = walls.shape
+        x, y = np.argwhere(~walls)[seed]
+        view = cast(walls, x, y, 8)
+        assert view[x, y]
+        assert np.array_equal(cast(walls[::-1].copy(), w - 1 - x, y, 8), view[::-1])
+        assert np.array_equal(cast(walls[:, ::-1].copy(), x, h - 1 - y, 8), view[:, ::-1])
+        assert np.array_equal(cast(walls.T.copy(), y, x, 8), view.T)
+
+
+def test_open_ground_sees_the_whole_radius():
+    walls = np.zeros((25, 25), dtype=bool)
+    for radius in range(0, 12):
+        assert np.array_equal(cast(walls, 12, 12, radius), disc(walls.shape, 12, 12, radius))
+    # Clipped by the map edge, never beyond it
+    assert np.array_equal(cast(walls, 1, 2, 6), disc(walls.shape, 1, 2, 6))
+    assert not cast(walls, -1, 5, 6).any()
+
+
+def test_walls_block_sight_but_are_seen():
+    walls = np.zeros((20, 20), dtype=bool)
+    walls[10, 3:17] = True
+    view = cast(walls, 5, 10, 15)
+    assert view[10, 7:14].all()  # The face of the wall
+    assert not view[11:, 8:13].any()  # Straight behind it
+    assert view[11:, 0:2].any() and view[11:, 18:].any()  # Around its ends
+
+    # Walls inside the radius still limit it, visible or not
+    random = random_walls(3)
+    for x, y in np.argwhere(~random)[:20]:
+        view = cast(random, x, y, 6)
+        assert not (view & ~disc(random.shape, x, y, 6)).any()
+
+
+def test_zone_caches_views_until_tiles_change():
+    zone = Zone(20, 20, "wilderness")
+    before = zone.field_of_view(5, 10, 12)
+    assert zone.field_of_view(5, 10, 12.9) is before
+    assert not before.flags.writeable
+    assert zone.can_see(5, 10, 15, 10, 12)
+
+    zone.fill_rect(10, 3, 1, 14, TERRAIN_WALL, WALL_PROPERTIES)
+    after = zone.field_of_view(5, 10, 12)
+    assert after is not before
+    assert not zone.can_see(5, 10, 15, 10, 12)
+    assert not zone.can_see(15, 10, 5, 10, 12)
+    assert not zone.can_see(5, 10, 40, 10, 50)
+
+    zone.update_visibility(5, 10, 12)
+    zone.update_visibility(15, 10, 12)
+    assert np.array_equal(zone.visible_tiles, zone.field_of_view(15, 10, 12))
+    assert np.array_equal(zone.explored_tiles, after | zone.visible_tiles)
+
+
+def test_view_radius_scales_with_weather_and_light():
+    assert view_radius(10, 1.0, 1.0) == 10
+    assert view_radius(10, 0.5, 1.0) == 5
+    assert view_radius(10, 1.0, 0.0) == pytest.approx(10 * MIN_LIGHT)
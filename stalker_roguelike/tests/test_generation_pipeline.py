@@ -0,0 +1,118 @@
+import tracemalloc
+import pytest
+from src.map.generation_pipeline import GenerationPipeline, GenerationProfiler
+from src.map.map_generator import MapGenerator
+from src.map.zone import Zone, TIER_TERRAIN, TIER_FULL
+
+
+def recorder(calls, name):
+    def run(zone, zone_x, zone_y):
+        calls.append(name)
+    return run
+
+
+def stepped(calls, name):
+    def run(zone, zone_x, zone_y):
+        for fraction in (0.25, 0.5, 0.75):
+            calls.append(name)
+            yield fraction
+    return run
+
+
+def make_pipeline(calls):
+    pipeline = GenerationPipeline()
+    pipeline.register("forest", "a", recorder(calls, "a"), TIER_TERRAIN)
+    pipeline.register("forest", "c", recorder(calls, "c"), TIER_FULL)
+    pipeline.register("forest", "b", recorder(calls, "b"), TIER_TERRAIN, before="c")
+    pipeline.register("wilderness", "w", recorder(calls, "w"), TIER_TERRAIN)
+    return pipeline
+
+
+def run_all(pipeline, zone_type, profiler=None):
+    profiler = profiler or GenerationProfiler()
+    zone = Zone(8, 8, zone_type)
+    for gen_pass in pipeline.passes(zone_type):
+        for _ in profiler.run_pass(zone_type, gen_pass, zone, 0, 0):
+            pass
+    return profiler
+
+
+def test_passes_run_in_order_and_can_be_switched():
+    calls = []
+    pipeline = make_pipeline(calls)
+    assert [p.name for p in pipeline.passes("forest")] == ["a", "b", "c"]
+    assert [p.name for p in pipeline.passes("swamp")] == ["w"]  # Default zone type
+    assert pipeline.zone_types() == ["forest", "wilderness"]
+
+    pipeline.set_enabled("forest", "b", False)
+    run_all(pipeline, "forest")
+    assert calls == ["a", "c"]
+    assert [p.name for p in pipeline.registered("forest")] == ["a", "b", "c"]
+
+    pipeline.set_enabled("forest", "b", True)
+    previous = pipeline.replace("forest", "b", recorder(calls, "faster b"))
+    calls.clear()
+    run_all(pipeline, "forest")
+    assert calls == ["a", "faster b", "c"]
+    previous(None, 0, 0)
+    assert calls[-1] == "b"
+
+
+def test_unknown_and_duplicate_names_are_rejected():
+    pipeline = make_pipeline([])
+    with pytest.raises(ValueError):
+        pipeline.register("forest", "a", recorder([], "a"), TIER_TERRAIN)
+    with pytest.raises(KeyError):
+        pipeline.replace("forest", "missing", recorder([], "x"))
+    with pytest.raises(KeyError):
+        pipeline.set_enabled("swamp", "w", False)
+
+
+def test_profiler_counts_calls_through_stepped_passes():
+    calls = []
+    pipeline = GenerationPipeline()
+    pipeline.register("forest", "steps", stepped(calls, "steps"), TIER_TERRAIN)
+    pipeline.register("forest", "plain", recorder(calls, "plain"), TIER_TERRAIN)
+    profiler = GenerationProfiler()
+    fractions = list(profiler.run_pass("forest", pipeline.passes("forest")[0],
+                                       Zone(8, 8, "forest"), 0, 0))
+    assert fractions == [0.25, 0.5, 0.75]
+    run_all(pipeline, "forest", profiler)
+    assert profiler.stats[("forest", "steps")].calls == 2
+    assert profiler.stats[("forest", "plain")].calls == 1
+    stats = profiler.stats[("forest", "steps")]
+    assert 0 <= stats.max_seconds <= stats.seconds
+
+
+def test_report_lists_every_pass_and_profilers_merge():
+    generator = MapGenerator(10, 10)
+    generator.seed = 11
+    generator.generate_zone(1, 1, "forest")
+    generator.generate_zone(2, 1, "underground")
+    report = generator.profiler.report()
+    lines = report.splitlines()
+    assert lines[0] == "Zone generation profile"
+    assert any(line.startswith("forest: 1 zones") for line in lines)
+    assert any(line.startswith("underground: 1 zones") for line in lines)
+    for gen_pass in generator.pipeline.passes("underground"):
+        assert any(line.split()[:1] == [gen_pass.name] for line in lines), gen_pass.name
+    assert "peak KiB" not in report
+
+    other = GenerationProfiler()
+    other.merge(generator.profiler)
+    other.merge(generator.profiler)
+    assert other.zones == {"forest": 2, "underground": 2}
+    assert other.stats[("forest", "terrain_noise")].calls == 2
+    other.reset()
+    assert other.report(title="Empty").splitlines() == ["Empty", "  no zones generated"]
+
+
+def test_allocations_are_tracked_when_asked():
+    generator = MapGenerator(10, 10)
+    generator.profiler = GenerationProfiler(track_allocations=True)
+    try:
+        generator.generate_zone(1, 1, "forest")
+    finally:
+        tracemalloc.stop()
+    assert generator.profiler.stats[("forest", "terrain_noise")].peak_bytes > 0
+    assert "peak KiB" in generator.profiler.report()
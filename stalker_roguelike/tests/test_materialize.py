@@ -0,0 +1,90 @@
+import pickle
+import numpy as np
+import pytest
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TILE_LAYERS
+from src.map.zone import TIER_FIELDS, TIER_TERRAIN, TIER_FULL
+from src.map.zone_streamer import run_steps
+
+# Wilderness spawns bandits, whose template cannot be built yet
+ZONE_TYPES = ["forest", "underground", "swamp", "urban"]
+POS = (3, 4)
+
+
+def make_generator():
+    generator = MapGenerator(10, 10)
+    generator.seed = 31337
+    return generator
+
+
+def triggers(zone):
+    return [[tuple((volume.kind, sorted(volume.data.items()))
+                   for volume in zone.triggers.volumes_at(x, y))
+             for y in range(zone.height)] for x in range(zone.width)]
+
+
+def assert_same_zone(zone, expected):
+    assert zone.tier == expected.tier == TIER_FULL
+    for layer in TILE_LAYERS:
+        assert np.array_equal(getattr(zone.store, layer), getattr(expected.store, layer)), layer
+    for name in ("elevation", "forest_density", "radiation", "anomaly"):
+        assert np.array_equal(getattr(zone.fields, name), getattr(expected.fields, name)), name
+    assert [pickle.dumps(entity) for entity in zone.entities] == \
+           [pickle.dumps(entity) for entity in expected.entities]
+    assert zone.anomalies == expected.anomalies
+    assert triggers(zone) == triggers(expected)
+
+
+@pytest.mark.parametrize("zone_type", ZONE_TYPES)
+def test_promoted_zone_matches_a_direct_build(zone_type):
+    expected = make_generator().build_zone(*POS, zone_type)
+
+    generator = make_generator()
+    fields = generator.materialize(*POS, zone_type, TIER_FIELDS)
+    assert fields.tier == TIER_FIELDS and fields.fields is not None
+    assert not fields.store.blocks_movement.any()
+    terrain = generator.materialize(*POS, zone_type, TIER_TERRAIN)
+    assert terrain is fields and terrain.tier == TIER_TERRAIN
+    assert not terrain.entities and not terrain.anomalies
+    assert generator.has_tier(*POS, zone_type, TIER_TERRAIN)
+    assert not generator.has_tier(*POS, zone_type, TIER_FULL)
+
+    zone = generator.generate_zone(*POS, zone_type)
+    assert zone is terrain
+    assert POS not in generator.partial_zones
+    assert_same_zone(zone, expected)
+
+
+@pytest.mark.parametrize("zone_type", ZONE_TYPES)
+def test_banded_tier_by_tier_steps_match_a_direct_build(zone_type):
+    expected = make_generator().build_zone(*POS, zone_type)
+
+    generator = make_generator()
+    zone = None
+    for tier in (TIER_FIELDS, TIER_TERRAIN, TIER_FULL):
+        zone = run_steps(generator.build_zone_steps(*POS, zone_type, rows_per_step=7,
+                                                    tier=tier, zone=zone))
+        assert zone.tier == tier
+    assert_same_zone(zone, expected)
+
+
+def test_partial_zones_drop_the_least_recently_used():
+    generator = make_generator()
+    assert generator.max_partial_zones == 64
+    positions = [(x, 0) for x in range(64)]
+    for pos in positions:
+        generator.materialize(*pos, "forest", TIER_FIELDS)
+    oldest = generator.partial_zones[positions[0]]
+    generator.materialize(*positions[0], "forest", TIER_FIELDS)  # Used again
+
+    generator.materialize(0, 1, "forest", TIER_FIELDS)
+    assert len(generator.partial_zones) == 64
+    assert positions[1] not in generator.partial_zones
+    assert generator.partial_zones[positions[0]] is oldest
+    assert list(generator.partial_zones)[-1] == (0, 1)
+
+    # An evicted tier is simply built again
+    again = generator.materialize(*positions[1], "forest", TIER_FIELDS)
+    assert positions[2] not in generator.partial_zones
+    expected = make_generator().build_zone(*positions[1], "forest", tier=TIER_FIELDS)
+    assert np.array_equal(again.fields.elevation, expected.fields.elevation)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from src.map.noise_engine import pnoise2, noise_grid
+
+
+def sample_points(count=500):
+    rng = np.random.default_rng(0)
+    return rng.uniform(-300, 300, count), rng.uniform(-300, 300, count)
+
+
+def test_matches_reference_pnoise2_at_base_0():
+    noise = pytest.importorskip("noise")
+    xs, ys = sample_points()
+    for octaves in (1, 4):
+        expected = np.array([noise.pnoise2(x, y, octaves=octaves, persistence=0.5,
+                                           lacunarity=2.0, repeatx=1024,
+                                           repeaty=1024, base=0)
+                             for x, y in zip(xs, ys)], dtype=np.float32)
+        assert np.array_equal(pnoise2(xs, ys, octaves=octaves), expected)
+
+
+def test_seeds_256_apart_differ():
+    xs, ys = sample_points()
+    for seed in (0, 1, 123456):
+        assert not np.allclose(pnoise2(xs, ys, octaves=4, base=seed),
+                               pnoise2(xs, ys, octaves=4, base=seed + 256))
+
+
+def test_same_base_is_deterministic():
+    first = noise_grid(3, -2, 32, 32, 50.0, octaves=4, base=987654)
+    second = noise_grid(3, -2, 32, 32, 50.0, octaves=4, base=987654)
+    assert np.array_equal(first, second)
+    assert first.shape == (32, 32) and first.dtype == np.float32
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from src.map.poisson_disc import poisson_disc, exclusion_kernel, MAX_ROUND_KERNEL
+
+
+def random_mask(seed, shape=(64, 48), density=0.6):
+    return np.random.default_rng(seed).random(shape) < density
+
+
+def pairwise_squared(points):
+    deltas = points[:, None, :] - points[None, :, :]
+    distances = (deltas ** 2).sum(axis=2)
+    np.fill_diagonal(distances, np.iinfo(distances.dtype).max)
+    return distances
+
+
+# Small spacings take the vectorized rounds, large ones the one-by-one path
+SPACINGS = [1.0, 1.4, 2.5, 4.0, 6.0, 11.0]
+
+
+def test_both_sampling_paths_are_covered():
+    sizes = [exclusion_kernel(spacing).sum() for spacing in SPACINGS]
+    assert min(sizes) <= MAX_ROUND_KERNEL < max(sizes)
+
+
+@pytest.mark.parametrize("spacing", SPACINGS)
+def test_points_keep_their_distance_and_stay_on_the_mask(spacing):
+    for seed in range(5):
+        mask = random_mask(seed)
+        points = poisson_disc(mask, spacing, np.random.default_rng(seed))
+        assert len(points)
+        assert mask[points[:, 0], points[:, 1]].all()
+        assert len({tuple(p) for p in points.tolist()}) == len(points)
+        assert pairwise_squared(points).min() >= spacing * spacing
+
+
+@pytest.mark.parametrize("spacing", SPACINGS)
+def test_sample_is_maximal(spacing):
+    mask = random_mask(7)
+    points = poisson_disc(mask, spacing, np.random.default_rng(7))
+    # Every cell left on the mask is too close to some accepted point
+    free = np.argwhere(mask)
+    deltas = free[:, None, :] - points[None, :, :]
+    assert ((deltas ** 2).sum(axis=2) < spacing * spacing).any(axis=1).all()
+
+
+def test_max_points_and_determinism():
+    mask = random_mask(3)
+    first = poisson_disc(mask, 3.0, np.random.default_rng(11), max_points=10)
+    again = poisson_disc(mask, 3.0, np.random.default_rng(11), max_points=10)
+    assert len(first) == 10
+    assert np.array_equal(first, again)
+    assert poisson_disc(mask, 3.0, np.random.default_rng(11), max_points=0).shape == (0, 2)
+    assert poisson_disc(np.zeros((8, 8), dtype=bool), 2.0,
+                        np.random.default_rng(0)).shape == (0, 2)
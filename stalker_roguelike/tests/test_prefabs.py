@@ -0,0 +1,104 @@
+import random
+import numpy as np
+import pytest
+from src.constants import TERRAIN_FLOOR, TERRAIN_WALL
+from src.map.map_generator import MapGenerator
+from src.map.prefabs import PrefabLibrary
+from src.map.tile import FLOOR_PROPERTIES, WALL_PROPERTIES, WRECKAGE_PROPERTIES
+from src.map.tile_store import TILE_LAYERS
+from src.map.zone import Zone
+
+# Central wreckage of a crash site, as the generator stamped it before prefabs
+WRECKAGE_KERNEL = np.add.outer(np.abs(np.arange(-2, 3)), np.abs(np.arange(-2, 3))) <= 3
+
+
+# The procedural building generator that blueprints replaced, kept as the reference
+
+def old_building(zone, x, y, building_type, rng, width, height):
+    zone.fill_rect(x, y, width, height, TERRAIN_FLOOR, FLOOR_PROPERTIES)
+    zone.outline_rect(x, y, width, height, TERRAIN_WALL, WALL_PROPERTIES)
+
+    hallway_x = x + width // 2
+    zone.fill_rect(hallway_x, y + 1, 1, height - 2, TERRAIN_FLOOR, FLOOR_PROPERTIES)
+    for side in [-1, 1]:
+        for room_y in range(y + 2, y + height - 3, 4):
+            if rng.random() < 0.8:
+                room_width = rng.randint(3, 4)
+                room_height = rng.randint(3, 4)
+                if side < 0:
+                    room_x = max(x + 1, hallway_x - room_width - 1)
+                else:
+                    room_x = min(x + width - room_width - 1, hallway_x + 2)
+                old_room(zone, room_x, room_y, room_width, room_height, hallway_x,
+                         building_type, rng)
+
+
+def old_room(zone, x, y, width, height, hallway_x, building_type, rng):
+    zone.outline_rect(x, y, width, height, TERRAIN_WALL, WALL_PROPERTIES)
+    door_x = x + width - 1 if x < hallway_x else x
+    zone.fill_rect(door_x, y + height // 2, 1, 1, TERRAIN_FLOOR, FLOOR_PROPERTIES)
+
+    if building_type == "house":
+        if rng.random() < 0.3:
+            zone.tiles[x + 1][y + 1].add_furniture("bed")
+            zone.tiles[x + 2][y + 1].add_furniture("bed")
+        elif rng.random() < 0.3:
+            for cx in range(x + 1, x + width - 1):
+                zone.tiles[cx][y + 1].add_furniture("counter")
+    elif building_type == "military":
+        if rng.random() < 0.4:
+            for bx in range(x + 1, x + width - 1, 2):
+                zone.tiles[bx][y + 1].add_furniture("bed")
+        elif rng.random() < 0.3:
+            for wx in range(x + 1, x + width - 1):
+                zone.tiles[wx][y + 1].add_furniture("weapon_rack")
+
+
+def assert_same_tiles(a, b):
+    for layer in TILE_LAYERS:
+        assert np.array_equal(getattr(a.store, layer), getattr(b.store, layer)), layer
+
+
+@pytest.mark.parametrize("building_type", ["house", "military"])
+def test_buildings_match_the_procedural_generator(building_type):
+    generator = MapGenerator(1, 1)
+    for seed in range(40):
+        width, height = 8 + seed % 5, 8 + seed // 8
+        expected, stamped = Zone(24, 24, "wilderness"), Zone(24, 24, "wilderness")
+        old_building(expected, 5, 6, building_type, random.Random(seed), width, height)
+        generator._generate_building(stamped, 5, 6, building_type, random.Random(seed),
+                                     width, height)
+        assert_same_tiles(stamped, expected)
+
+
+def test_crash_site_matches_the_wreckage_stamp():
+    expected, stamped = Zone(12, 12, "forest"), Zone(12, 12, "forest")
+    expected.stamp(WRECKAGE_KERNEL, 6, 5, TERRAIN_WALL, WRECKAGE_PROPERTIES)
+    stamped.paint_blueprint(PrefabLibrary().crash_site(), 6 - 2, 5 - 2)
+    assert_same_tiles(stamped, expected)
+
+
+def test_blueprints_clip_at_the_zone_edge():
+    library = PrefabLibrary()
+    rooms = ((1, 2, 3, 3, "barracks"),)
+    whole, clipped = Zone(20, 20, "wilderness"), Zone(20, 20, "wilderness")
+    whole.paint_blueprint(library.building(10, 10, "military", rooms), 0, 0)
+    clipped.paint_blueprint(library.building(10, 10, "military", rooms), -3, -4)
+    assert np.array_equal(clipped.store.terrain[:7, :6], whole.store.terrain[3:10, 4:10])
+    assert np.array_equal(clipped.store.furniture[:7, :6], whole.store.furniture[3:10, 4:10])
+
+
+def test_saved_library_builds_the_same_blueprints(tmp_path):
+    library = PrefabLibrary()
+    library.precompute()
+    path = str(tmp_path / "prefabs.npz")
+    library.save(path)
+    loaded = PrefabLibrary.load(path)
+
+    # Rooms as _roll_interior_rooms draws them for an 11x11 house
+    rooms = ((-1, 2, 4, 3, "bedroom"), (1, 6, 3, 4, "kitchen"))
+    for build in (lambda lib: lib.building(11, 11, "house", rooms),
+                  PrefabLibrary.outpost_perimeter, PrefabLibrary.crash_site):
+        original, restored = build(library), build(loaded)
+        assert np.array_equal(original.cells, restored.cells)
+        assert np.array_equal(original.furniture, restored.furniture)
@@ -0,0 +1,63 @@
+import random
+from types import SimpleNamespace
+from src.entities.entity import Entity
+from src.map.spatial_hash import SpatialHash
+from src.map.zone import Zone
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def scattered(rng, count=300, size=120):
+    points = [Point(rng.randrange(-10, size), rng.randrange(-10, size)) for _ in range(count)]
+    index = SpatialHash(8, points)
+    # Move and remove some after insertion so the buckets have been updated
+    for point in rng.sample(points, count // 3):
+        point.x, point.y = rng.randrange(size), rng.randrange(size)
+        index.update(point)
+    for point in points[:count // 10]:
+        index.remove(point)
+    return index, points[count // 10:]
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(3)
+    index, points = scattered(rng)
+    assert len(index) == len(points)
+    for _ in range(200):
+        x, y = rng.randrange(-20, 130), rng.randrange(-20, 130)
+        x1, y1 = x + rng.randrange(1, 40), y + rng.randrange(1, 40)
+        radius = rng.uniform(0, 30)
+        k = rng.randrange(1, 12)
+
+        assert set(map(id, index.at(x, y))) == {
+            id(p) for p in points if (p.x, p.y) == (x, y)}
+        assert set(map(id, index.in_rect(x, y, x1, y1))) == {
+            id(p) for p in points if x <= p.x < x1 and y <= p.y < y1}
+        assert set(map(id, index.in_radius(x, y, radius))) == {
+            id(p) for p in points if (p.x - x) ** 2 + (p.y - y) ** 2 <= radius * radius}
+
+        def distance(p):
+            return (p.x - x) ** 2 + (p.y - y) ** 2
+        expected = sorted(map(distance, points))[:k]
+        assert [distance(p) for p in index.nearest(x, y, k)] == expected
+        within = [d for d in sorted(map(distance, points)) if d <= radius * radius][:k]
+        assert [distance(p) for p in index.nearest(x, y, k, max_radius=radius)] == within
+
+
+def test_set_position_updates_the_entitys_own_zone():
+    current, other = Zone(32, 32, "wilderness"), Zone(32, 32, "forest")
+    entity = Entity(2, 2, "E", (0, 0, 0))
+    entity.game_state = SimpleNamespace(current_zone=current)
+    other.add_entity(entity)
+
+    entity.set_position(20, 21)
+    assert other.get_entities_at(20, 21) == [entity]
+    assert other.get_entities_at(2, 2) == []
+    assert current.get_entities_at(20, 21) == []
+
+    other.remove_entity(entity)
+    assert entity.zone is None
@@ -0,0 +1,105 @@
+import numpy as np
+from src.map.tile import (Tile, TileProperties, FLOOR_PROPERTIES, WALL_PROPERTIES,
+                          intern_properties)
+from src.map.tile_store import TileStore, TERRAIN_IDS, ANOMALY_IDS, FURNITURE_IDS, TILE_LAYERS
+from src.map.zone import Zone
+
+
+def test_view_writes_land_in_the_arrays():
+    zone = Zone(16, 12, "wilderness")
+    store = zone.store
+    tile = zone.tiles[3][4]
+
+    tile.terrain_type = "water"
+    tile.properties.is_water = True
+    tile.properties.radiation_level = 0.5
+    tile.add_anomaly("gravity", 0.75)
+    tile.add_furniture("bed")
+
+    assert store.terrain[3, 4] == TERRAIN_IDS["water"]
+    assert store.is_water[3, 4]
+    assert store.radiation_level[3, 4] == np.float32(0.5)
+    assert store.anomaly[3, 4] == ANOMALY_IDS["gravity"]
+    assert store.danger_level[3, 4] == np.float32(0.75)
+    assert store.furniture[3, 4] == FURNITURE_IDS["bed"]
+    assert tile.furniture == "bed"
+    # Nothing else was touched
+    assert np.count_nonzero(store.terrain) == 1
+    assert np.count_nonzero(store.radiation_level) == 1
+
+
+def test_array_writes_show_through_views():
+    zone = Zone(16, 12, "wilderness")
+    zone.store.assign((slice(2, 5), 7), "wall", WALL_PROPERTIES)
+    for x in range(2, 5):
+        tile = zone.tiles[x][7]
+        assert tile.terrain_type == "wall"
+        assert tile.properties.blocks_movement and tile.properties.blocks_sight
+    assert zone.tiles[5][7].terrain_type == "floor"
+    assert not zone.tiles[5][7].properties.blocks_movement
+
+
+def test_whole_tiles_and_properties_are_copied_in():
+    zone = Zone(8, 8, "wilderness")
+    zone.tiles[1][2] = Tile("wall", WALL_PROPERTIES)
+    zone.tiles[6][6].properties = TileProperties(is_water=True, moisture_level=0.25)
+
+    assert zone.tiles[1][2].terrain_type == "wall"
+    assert zone.store.blocks_movement[1, 2]
+    assert zone.store.is_water[6, 6]
+    assert zone.store.moisture_level[6, 6] == np.float32(0.25)
+    assert zone.store.get_properties(6, 6) == TileProperties(is_water=True,
+                                                             moisture_level=0.25)
+
+
+def test_make_walkable_and_grid_shape():
+    zone = Zone(10, 6, "underground")
+    zone.store.assign((slice(None), slice(None)), "wall", WALL_PROPERTIES)
+    zone.tiles[4][5].make_walkable()
+    assert not zone.store.blocks_movement[4, 5] and not zone.store.blocks_sight[4, 5]
+    assert np.count_nonzero(~zone.store.blocks_movement) == 1
+
+    assert len(zone.tiles) == 10 and len(zone.tiles[0]) == 6
+    assert [tile.terrain_type for tile in zone.tiles[0]] == ["wall"] * 6
+    assert zone.tiles[-1][-1].terrain_type == "wall"
+
+
+def test_view_writes_reach_the_journal():
+    zone = Zone(8, 8, "wilderness")
+    version = zone.journal.tile_version
+    zone.tiles[2][3].properties.blocks_movement = True
+    assert zone.journal.tile_version > version
+    assert not zone.is_walkable(2, 3)
+
+
+def test_layers_wrap_without_copying():
+    store = TileStore(4, 5)
+    wrapped = TileStore.from_layers({layer: getattr(store, layer) for layer in TILE_LAYERS})
+    wrapped.terrain[1, 1] = TERRAIN_IDS["wall"]
+    assert store.terrain[1, 1] == TERRAIN_IDS["wall"]
+    assert (wrapped.width, wrapped.height) == (4, 5)
+
+
+def test_equal_properties_share_one_instance():
+    wall = intern_properties(TileProperties(blocks_movement=True, blocks_sight=True))
+    assert wall is WALL_PROPERTIES
+    assert Tile("wall", TileProperties(blocks_movement=True, blocks_sight=True)).properties \
+        is WALL_PROPERTIES
+    assert Tile("floor").properties is FLOOR_PROPERTIES
+    # Views hand out the shared instances too
+    zone = Zone(4, 4, "wilderness")
+    assert zone.store.get_properties(0, 0) is FLOOR_PROPERTIES
+
+
+def test_tile_mutators_copy_on_write():
+    first, second = Tile("wall", WALL_PROPERTIES), Tile("wall", WALL_PROPERTIES)
+    first.make_walkable()
+    assert first.properties is FLOOR_PROPERTIES
+    assert second.properties is WALL_PROPERTIES
+    assert WALL_PROPERTIES.blocks_movement
+
+    second.add_anomaly("thermal", 0.5)
+    assert second.properties.anomaly_type == "thermal"
+    assert second.properties is intern_properties(TileProperties(
+        blocks_movement=True, blocks_sight=True, anomaly_type="thermal", danger_level=0.5))
+    assert WALL_PROPERTIES.anomaly_type is None
@@ -0,0 +1,104 @@
+import pickle
+from types import SimpleNamespace
+import numpy as np
+from src.entities.entity import Entity
+from src.map.triggers import TriggerMap, TriggerVolume, ENTER, STAY, EXIT
+from src.map.zone import Zone
+
+
+def walker(x, y):
+    return Entity(x, y, "@", (255, 255, 255))
+
+
+def summary(events):
+    return [(event.kind, event.volume.kind) for event in events]
+
+
+def move(triggers, entity, x, y):
+    entity.x, entity.y = x, y
+    return triggers.move(entity)
+
+
+def test_enter_stay_exit_order():
+    triggers = TriggerMap(20, 20)
+    triggers.add_rect(TriggerVolume("radiation"), 0, 0, 10, 10)
+    triggers.add_rect(TriggerVolume("anomaly"), 5, 5, 10, 10)
+    entity = walker(15, 15)
+    assert triggers.track(entity) == []
+
+    assert summary(move(triggers, entity, 2, 2)) == [(ENTER, "radiation")]
+    assert summary(triggers.stays()) == [(STAY, "radiation")]
+    assert move(triggers, entity, 3, 3) == []  # Same volumes, no events
+
+    # Into the overlap, then out of the first volume only
+    assert summary(move(triggers, entity, 7, 7)) == [(ENTER, "anomaly")]
+    assert sorted(summary(triggers.stays())) == [(STAY, "anomaly"), (STAY, "radiation")]
+    assert summary(triggers.stays("anomaly")) == [(STAY, "anomaly")]
+    assert summary(move(triggers, entity, 12, 12)) == [(EXIT, "radiation")]
+
+    # Leaving one volume while entering another: exits come first
+    assert summary(move(triggers, entity, 2, 2)) == [(EXIT, "anomaly"), (ENTER, "radiation")]
+    assert summary(move(triggers, entity, 19, 0)) == [(EXIT, "radiation")]
+    assert triggers.stays() == []
+
+
+def test_adding_and_removing_volumes_under_an_entity():
+    triggers = TriggerMap(10, 10)
+    entity = walker(4, 4)
+    triggers.track(entity)
+    location = TriggerVolume("location", {"quest_id": "q"})
+    mask = np.zeros((3, 3), dtype=bool)
+    mask[1, 1] = True
+
+    assert summary(triggers.add(location, mask, 3, 3, [entity])) == [(ENTER, "location")]
+    assert triggers.occupants(location) == [entity]
+    assert summary(triggers.remove(location)) == [(EXIT, "location")]
+    assert triggers.volumes_at(4, 4) == ()
+    assert triggers.stays() == []
+
+
+def test_untrack_exits_every_volume():
+    triggers = TriggerMap(10, 10)
+    triggers.add_rect(TriggerVolume("radiation"), 0, 0, 5, 5)
+    triggers.add_rect(TriggerVolume("anomaly"), 0, 0, 2, 2)
+    entity = walker(1, 1)
+    assert sorted(summary(triggers.track(entity))) == [(ENTER, "anomaly"), (ENTER, "radiation")]
+    assert sorted(summary(triggers.untrack(entity))) == [(EXIT, "anomaly"), (EXIT, "radiation")]
+    assert triggers.stays() == []
+
+
+def test_groups_match_a_brute_force_scan():
+    rng = np.random.default_rng(5)
+    triggers = TriggerMap(24, 18)
+    placed = []
+    for i in range(12):
+        volume = TriggerVolume("anomaly", {"id": i})
+        mask = rng.random((rng.integers(1, 9), rng.integers(1, 9))) < 0.7
+        x, y = int(rng.integers(-4, 22)), int(rng.integers(-4, 16))
+        triggers.add(volume, mask, x, y)
+        placed.append((volume, mask, x, y))
+    triggers.remove(placed[3][0])
+    del placed[3]
+
+    for x in range(24):
+        for y in range(18):
+            expected = {id(volume) for volume, mask, vx, vy in placed
+                        if 0 <= x - vx < mask.shape[0] and 0 <= y - vy < mask.shape[1]
+                        and mask[x - vx, y - vy]}
+            assert {id(volume) for volume in triggers.volumes_at(x, y)} == expected
+
+
+def test_zone_moves_fire_triggers_and_survive_pickling():
+    zone = Zone(16, 16, "wilderness")
+    events = []
+    zone.game_state = SimpleNamespace(handle_triggers=events.extend)
+    zone.add_trigger(TriggerVolume("location", {"quest_id": "q"}), 8, 8, 2, 2)
+    entity = walker(0, 0)
+    zone.add_entity(entity)
+    entity.set_position(8, 9)
+    assert summary(events) == [(ENTER, "location")]
+
+    restored = pickle.loads(pickle.dumps(zone))
+    moved = restored.entities[0]
+    assert summary(restored.triggers.stays()) == [(STAY, "location")]
+    assert summary(restored.triggers.untrack(moved)) == [(EXIT, "location")]
@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pytest
+from src.entities.entity import Entity
+from src.map.tile_store import TILE_LAYERS
+from src.map.zone import Zone
+from src.map.zone_cache import ZoneCache
+
+
+def make_zone(i):
+    zone = Zone(16, 16, "forest")
+    zone.fill_rect(i, i, 3, 2, "wall")
+    zone.add_entity(Entity(i, 15 - i, "E", (0, 0, 0)))
+    return zone
+
+
+def assert_same_zone(a, b):
+    for layer in TILE_LAYERS:
+        assert np.array_equal(getattr(a.store, layer), getattr(b.store, layer)), layer
+    assert [(e.x, e.y) for e in a.entities] == [(e.x, e.y) for e in b.entities]
+
+
+def test_zones_past_capacity_spill_and_come_back(tmp_path):
+    loaded = []
+    cache = ZoneCache(2, str(tmp_path), on_load=lambda pos, zone: loaded.append(pos))
+    zones = {(i, 0): make_zone(i) for i in range(4)}
+    for pos, zone in zones.items():
+        cache[pos] = zone
+    assert cache.resident_count == 2
+    assert len(cache) == 4 and set(cache) == set(zones)
+    assert not cache.is_resident((0, 0)) and not cache.is_resident((1, 0))
+    assert sorted(os.listdir(tmp_path)) == ["zone_0_0.dat", "zone_1_0.dat"]
+
+    restored = cache[(0, 0)]
+    assert restored is not zones[(0, 0)]
+    assert_same_zone(restored, zones[(0, 0)])
+    assert restored.entities[0].zone is restored
+    assert loaded == [(0, 0)]
+    assert cache.is_resident((0, 0)) and not cache.is_resident((2, 0))  # Least recent out
+    assert cache[(0, 0)] is restored
+
+    del cache[(1, 0)]
+    assert (1, 0) not in cache
+    with pytest.raises(KeyError):
+        cache[(1, 0)]
+    cache.close()
+    assert not list(tmp_path.iterdir())
+
+
+def test_pinned_zones_are_never_evicted(tmp_path):
+    cache = ZoneCache(1, str(tmp_path))
+    home = make_zone(0)
+    cache[(0, 0)] = home
+    cache.pin((0, 0))
+    for i in range(1, 4):
+        cache[(i, 0)] = make_zone(i)
+        assert cache.is_resident((0, 0))
+    # The newest zone stays too, so the limit is briefly exceeded
+    assert cache.resident_count == 2
+    assert cache[(0, 0)] is home
+
+    cache.unpin((0, 0))  # Just used, so the other zone goes
+    assert cache.resident_count == 1
+    assert not cache.is_resident((3, 0))
+    cache[(4, 0)] = make_zone(4)
+    assert not cache.is_resident((0, 0))
+    cache.close()
+
+
+def test_stats_count_hits_misses_and_spills(tmp_path):
+    cache = ZoneCache(1, str(tmp_path))
+    cache[(0, 0)] = make_zone(0)
+    cache[(1, 0)] = make_zone(1)  # Spills (0, 0)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (0, 0, 1)
+    spilled = os.path.getsize(tmp_path / "zone_0_0.dat")
+    assert cache.stats.spill_bytes == spilled
+
+    cache[(1, 0)]
+    cache[(1, 0)]
+    cache[(0, 0)]  # Reloaded, spilling (1, 0)
+    with pytest.raises(KeyError):
+        cache[(5, 5)]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 2, 2)
+    assert cache.stats.spill_bytes == spilled + os.path.getsize(tmp_path / "zone_1_0.dat")
+
+    # An unchanged zone reuses its spill file instead of writing it again
+    cache[(1, 0)]
+    assert cache.stats.evictions == 3
+    assert cache.stats.spill_bytes == spilled + os.path.getsize(tmp_path / "zone_1_0.dat")
+    cache.close()
@@ -0,0 +1,105 @@
+import pickle
+import random
+import numpy as np
+import pytest
+from src.entities.enemies import Enemy
+from src.map.map_generator import MapGenerator
+from src.map.zone_delta import TILE_LAYERS, apply_delta, diff_zone
+
+
+def spawn_zombies(generator, zone, zone_x, zone_y):
+    # Stands in for _spawn_enemies, whose bandit and military templates
+    # cannot be built yet
+    rng = generator.zone_rng(zone_x, zone_y, "test_spawns")
+    for _ in range(4):
+        enemy = Enemy(rng.randrange(zone.width), rng.randrange(zone.height),
+                      "Z", (0, 255, 0), "zombie")
+        enemy.spawn_id = len(zone.entities)
+        zone.add_entity(enemy)
+
+
+def make_generator(tmp_path, max_resident_zones=1):
+    generator = MapGenerator(10, 10, max_resident_zones, str(tmp_path))
+    generator.seed = 1234
+    for zone_type in generator.pipeline.zone_types():
+        generator.pipeline.replace(
+            zone_type, "spawn_enemies",
+            lambda zone, zone_x, zone_y: spawn_zombies(generator, zone, zone_x, zone_y))
+    return generator
+
+
+def same_tiles(a, b):
+    return all(np.array_equal(getattr(a.store, layer), getattr(b.store, layer))
+               for layer in TILE_LAYERS)
+
+
+def change(zone):
+    zone.fill_rect(5, 5, 2, 3, "wall")
+    zone.entities[1].x += 1
+    zone.entities[2].stats.modify_health(-5)
+    zone.add_entity(Enemy(1, 1, "Z", (0, 255, 0), "zombie"))
+    zone.explored_tiles[3][4] = True
+
+
+def test_round_trip_keeps_untouched_entities_by_spawn_id(tmp_path):
+    generator = make_generator(tmp_path)
+    zone = generator.build_zone(0, 0, "forest")
+    change(zone)
+
+    delta = pickle.loads(pickle.dumps(diff_zone(zone, generator.build_zone(0, 0, "forest"))))
+    assert delta.entities[0] == 0 and delta.entities[3] == 3
+    assert not isinstance(delta.entities[1], int)
+    assert not isinstance(delta.entities[2], int)
+    assert set(delta.tiles) <= set(TILE_LAYERS) and "terrain" in delta.tiles
+
+    baseline = generator.build_zone(0, 0, "forest")
+    untouched = baseline.entities[0]
+    restored = apply_delta(baseline, delta)
+    assert restored.entities[0] is untouched
+    assert same_tiles(restored, zone)
+    assert [(e.x, e.y, e.stats.current_health) for e in restored.entities] == \
+           [(e.x, e.y, e.stats.current_health) for e in zone.entities]
+    assert np.array_equal(restored.explored_tiles, zone.explored_tiles)
+
+
+def test_unchanged_zone_stores_no_tiles_or_entities(tmp_path):
+    generator = make_generator(tmp_path)
+    delta = diff_zone(generator.build_zone(2, 1, "forest"),
+                      generator.build_zone(2, 1, "forest"))
+    assert delta.tiles == {}
+    assert delta.entities == [0, 1, 2, 3]
+    assert delta.anomalies is None
+
+
+@pytest.mark.parametrize("zone_type", ["wilderness", "forest", "underground"])
+def test_rebuilds_ignore_global_random_state(tmp_path, zone_type):
+    generator = make_generator(tmp_path)
+    random.seed(1)
+    np.random.seed(1)
+    first = generator.build_zone(3, 2, zone_type)
+    random.seed(2)
+    np.random.seed(2)
+    delta = diff_zone(first, generator.build_zone(3, 2, zone_type))
+    assert delta.tiles == {}
+    assert delta.entities == list(range(len(first.entities)))
+    assert delta.anomalies is None
+
+
+def test_spilled_zone_reloads_from_its_delta(tmp_path):
+    generator = make_generator(tmp_path)
+    zone = generator.generate_zone(0, 0, "forest")
+    change(zone)
+
+    generator.generate_zone(1, 0, "forest")  # Spills (0, 0)
+    assert not generator.zones.is_resident((0, 0))
+    assert list(tmp_path.iterdir()) == [tmp_path / "zone_0_0.dat"]
+    # Far less than the zone's tiles alone
+    assert generator.zones.stats.spill_bytes < zone.store.terrain.nbytes
+    built = dict(generator.profiler.zones)
+    restored = generator.zones[(0, 0)]
+
+    assert generator.profiler.zones == built  # Rebuilding is not new generation
+    assert restored is not zone
+    assert same_tiles(restored, zone)
+    assert [(e.x, e.y) for e in restored.entities] == [(e.x, e.y) for e in zone.entities]
+    generator.zones.close()
@@ -0,0 +1,87 @@
+import pickle
+import numpy as np
+import pytest
+from src.map.map_generator import MapGenerator
+from src.map.noise_engine import noise_grid
+from src.map.tile_store import TileStore, TILE_LAYERS, TERRAIN_IDS
+from src.map.zone import Zone, TIER_FIELDS, TIER_TERRAIN
+from src.map.zone_fields import ZoneFields
+
+POS = (-2, 5)
+FIELDS = ["elevation", "forest_density", "radiation", "anomaly"]
+
+
+def make_generator():
+    generator = MapGenerator(10, 10)
+    generator.seed = 777
+    return generator
+
+
+def test_fused_fields_match_one_noise_call_per_layer():
+    generator = make_generator()
+    fields = generator.build_zone(*POS, "forest", tier=TIER_FIELDS).fields
+    width, height = generator.zone_width, generator.zone_height
+    seed = generator.seed
+    expected = {
+        "elevation": noise_grid(*POS, width, height, generator.elevation_scale,
+                                octaves=6, base=seed),
+        "forest_density": noise_grid(*POS, width, height, generator.forest_scale,
+                                     octaves=3, base=seed + 1),
+        "radiation": noise_grid(*POS, width, height, generator.radiation_scale,
+                                octaves=3, base=seed + 2),
+        "anomaly": noise_grid(*POS, width, height, generator.anomaly_scale,
+                              octaves=2, base=seed + 3),
+    }
+    for name in FIELDS:
+        layer = getattr(fields, name)
+        assert layer.dtype == np.float32 and layer.shape == (width, height)
+        assert np.array_equal(layer, expected[name]), name
+
+
+@pytest.mark.parametrize("rows_per_step", [1, 7, 64])
+def test_banded_fields_match_a_single_band(rows_per_step):
+    generator = make_generator()
+    whole = generator._generate_fields(Zone(64, 64, "forest"), *POS)
+    zone = Zone(64, 64, "forest")
+    bands = [generator._generate_fields(zone, *POS, x0, x0 + rows_per_step)
+             for x0 in range(0, 64, rows_per_step)]
+    joined = ZoneFields.concatenate(bands)
+    for name in FIELDS:
+        assert np.array_equal(getattr(joined, name), getattr(whole, name)), name
+
+
+def test_crop_and_pickle_keep_every_layer():
+    generator = make_generator()
+    fields = generator._generate_fields(Zone(64, 64, "forest"), *POS)
+    window = fields.crop(5, 10, 20, 12)
+    assert window.shape == (15, 2)
+    restored = pickle.loads(pickle.dumps(fields))
+    for name in FIELDS:
+        assert np.shares_memory(getattr(window, name), getattr(fields, name))
+        assert np.array_equal(getattr(window, name), getattr(fields, name)[5:20, 10:12])
+        assert np.array_equal(getattr(restored, name), getattr(fields, name)), name
+
+
+def test_terrain_is_painted_from_the_field_masks():
+    # Wilderness terrain is the noise classification alone
+    zone = make_generator().build_zone(*POS, "wilderness", tier=TIER_TERRAIN)
+    fields = zone.fields
+    water = fields.water_mask() | fields.swamp_mask()
+    assert not (fields.water_mask() & fields.swamp_mask()).any()
+    assert not (water & fields.forest_mask()).any()
+    assert water.any() and np.array_equal(zone.store.is_water, water)
+    assert (zone.store.terrain[water] == TERRAIN_IDS["water"]).all()
+    trees = zone.store.terrain == TERRAIN_IDS["wall"]
+    assert trees.any() and not (trees & ~fields.forest_mask()).any()
+
+
+def test_tile_layers_round_trip_through_from_layers():
+    zone = make_generator().build_zone(*POS, "forest", tier=TIER_TERRAIN)
+    layers = {layer: getattr(zone.store, layer).copy() for layer in TILE_LAYERS}
+    store = TileStore.from_layers(layers)
+    assert (store.width, store.height) == (zone.width, zone.height)
+    for layer in TILE_LAYERS:
+        assert getattr(store, layer) is layers[layer]
+    for x in range(0, zone.width, 5):
+        for y in range(0, zone.height, 5):
+            assert store.get_properties(x, y) is zone.store.get_properties(x, y)
@@ -0,0 +1,57 @@
+import pickle
+from src.entities.entity import Entity
+from src.map.zone import Zone
+from src.map.zone_journal import (
+    ZoneJournal, TILES, SPAWN, DESPAWN, MOVE, MAX_JOURNAL_CHANGES, MAX_DIRTY_RECTS
+)
+
+
+def test_zone_changes_are_recorded_in_order():
+    zone = Zone(16, 16, "wilderness")
+    start = zone.journal.version
+    seen = []
+    zone.journal.subscribe(seen.append)
+
+    zone.fill_rect(2, 3, 4, 2, "wall")
+    entity = Entity(1, 1, "E", (0, 0, 0))
+    zone.add_entity(entity)
+    entity.set_position(5, 6)
+    zone.tiles[9][9].make_walkable()
+    zone.remove_entity(entity)
+
+    changes = zone.journal.since(start)
+    assert [change.kind for change in changes] == [TILES, SPAWN, MOVE, TILES, DESPAWN]
+    assert [change.version for change in changes] == list(range(start + 1, start + 6))
+    assert changes[0].rect == (2, 3, 4, 2)
+    assert changes[2].obj is entity and changes[2].old_position == (1, 1)
+    assert changes[3].rect == (9, 9, 1, 1)
+    assert seen == changes
+    assert zone.journal.tile_version == start + 4
+
+
+def test_since_gives_up_once_history_is_dropped():
+    journal = ZoneJournal()
+    for i in range(MAX_JOURNAL_CHANGES + 10):
+        journal.spawned(i)
+    assert journal.since(5) is None
+    assert [change.obj for change in journal.since(journal.version - 3)] == [
+        MAX_JOURNAL_CHANGES + 7, MAX_JOURNAL_CHANGES + 8, MAX_JOURNAL_CHANGES + 9]
+    assert journal.since(journal.version) == []
+
+
+def test_dirty_rects_collapse_past_the_limit():
+    journal = ZoneJournal()
+    for i in range(MAX_DIRTY_RECTS + 1):
+        journal.tiles_changed(i * 3, 0, i * 3 + 1, 1)  # Apart from each other
+    assert journal.take_dirty_rects() == [(0, 0, MAX_DIRTY_RECTS * 3 + 1, 1)]
+
+
+def test_reloaded_journal_keeps_its_version_but_not_its_history():
+    zone = Zone(8, 8, "wilderness")
+    zone.fill_rect(0, 0, 2, 2, "wall")
+    zone.journal.subscribe(lambda change: None)
+    restored = pickle.loads(pickle.dumps(zone))
+    assert restored.journal.version == zone.journal.version
+    assert restored.journal.since(0) is None
+    assert restored.journal.since(restored.journal.version) == []
+    assert restored.store.journal is restored.journal
@@ -0,0 +1,66 @@
+import numpy as np
+from src.map.tile import WALL_PROPERTIES
+from src.map.tile_store import TERRAIN_IDS
+from src.map.zone import Zone
+
+WALL = TERRAIN_IDS["wall"]
+
+
+def walls(zone):
+    return zone.store.terrain == WALL
+
+
+def test_fill_rect_is_clipped_and_marked_dirty():
+    zone = Zone(20, 10, "wilderness")
+    zone.fill_rect(-3, 6, 8, 10, "wall", WALL_PROPERTIES)
+
+    expected = np.zeros((20, 10), dtype=bool)
+    expected[0:5, 6:10] = True
+    assert np.array_equal(walls(zone), expected)
+    assert np.array_equal(zone.store.blocks_movement, expected)
+    assert zone.take_dirty_rects() == [(0, 6, 5, 4)]
+    assert zone.take_dirty_rects() == []
+
+
+def test_painting_outside_the_zone_does_nothing():
+    zone = Zone(8, 8, "wilderness")
+    zone.fill_rect(10, 10, 4, 4, "wall")
+    zone.draw_line(-5, -1, 20, -1, "wall")
+    assert not walls(zone).any()
+    assert zone.take_dirty_rects() == []
+
+
+def test_outline_line_and_disc_shapes():
+    zone = Zone(30, 30, "wilderness")
+    zone.outline_rect(2, 2, 5, 4, "wall")
+    expected = np.zeros((30, 30), dtype=bool)
+    expected[2:7, 2:6] = True
+    expected[3:6, 3:5] = False
+    assert np.array_equal(walls(zone), expected)
+
+    zone = Zone(30, 30, "wilderness")
+    zone.draw_line(1, 1, 9, 5, "wall")
+    assert walls(zone)[1, 1] and walls(zone)[9, 5]
+    assert walls(zone).sum() == 9  # One tile per step along the longer axis
+
+    zone = Zone(30, 30, "wilderness")
+    zone.fill_disc(15, 15, 4, "wall")
+    xs, ys = np.indices((30, 30))
+    assert np.array_equal(walls(zone), (xs - 15) ** 2 + (ys - 15) ** 2 <= 16)
+
+
+def test_paint_mask_marks_the_bounding_box():
+    zone = Zone(16, 16, "underground")
+    mask = np.zeros((16, 16), dtype=bool)
+    mask[3, 4] = mask[7, 9] = True
+    zone.paint_mask(mask, "wall", WALL_PROPERTIES)
+    assert np.array_equal(walls(zone), mask)
+    assert zone.take_dirty_rects() == [(3, 4, 5, 6)]
+
+
+def test_dirty_rects_merge_when_they_touch():
+    zone = Zone(40, 40, "wilderness")
+    zone.fill_rect(0, 0, 4, 4, "wall")
+    zone.fill_rect(4, 0, 4, 4, "wall")   # Touches the first
+    zone.fill_rect(20, 20, 2, 2, "wall")  # Apart from both
+    assert sorted(zone.take_dirty_rects()) == [(0, 0, 8, 4), (20, 20, 2, 2)]
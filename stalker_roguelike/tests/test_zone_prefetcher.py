@@ -0,0 +1,74 @@
+import numpy as np
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TILE_LAYERS
+from src.map.zone import Zone, TIER_TERRAIN
+from src.map.zone_prefetcher import ZonePrefetcher, zones_ahead
+
+EAST = (1, 0)
+
+
+def make_generator():
+    generator = MapGenerator(10, 10)
+    generator.seed = 2718
+    return generator
+
+
+def prefetch_east(generator):
+    prefetcher = ZonePrefetcher(generator, lambda x, y: "forest", max_workers=1)
+    generator.prefetcher = prefetcher
+    # The player in zone (0, 0), next to its east edge
+    prefetcher.update(0, 0, Zone(64, 64, "forest"), 62, 30)
+    return prefetcher
+
+
+def assert_same_zone(a, b):
+    for layer in TILE_LAYERS:
+        assert np.array_equal(getattr(a.store, layer), getattr(b.store, layer)), layer
+    assert [(type(e).__name__, e.x, e.y, e.spawn_id) for e in a.entities] == \
+           [(type(e).__name__, e.x, e.y, e.spawn_id) for e in b.entities]
+    assert a.anomalies == b.anomalies
+
+
+def test_zones_ahead_are_nearest_first():
+    zone = Zone(64, 64, "forest")
+    assert zones_ahead(0, 0, zone, 30, 30, 12) == []
+    assert zones_ahead(0, 0, zone, 60, 5, 12) == [(1, 0), (0, -1)]
+
+
+def test_taken_zone_matches_a_main_thread_build():
+    generator = make_generator()
+    prefetcher = prefetch_east(generator)
+    assert prefetcher.enabled and EAST in prefetcher.pending
+    try:
+        zone = generator.generate_zone(*EAST, "forest")  # Waits on the worker
+    finally:
+        prefetcher.shutdown()
+    assert not prefetcher.pending
+    assert generator.zones[EAST] is zone
+    assert_same_zone(zone, make_generator().generate_zone(*EAST, "forest"))
+    # Worker timings were merged into the main profiler
+    assert generator.profiler.stats[("forest", "terrain_noise")].calls == 1
+    assert generator.profiler.zones == {"forest": 1}
+
+
+def test_workers_get_the_main_pipeline():
+    generator = make_generator()
+    generator.pipeline.set_enabled("forest", "forest_cover", False)
+    prefetcher = prefetch_east(generator)
+    try:
+        zone = prefetcher.take(*EAST)
+    finally:
+        prefetcher.shutdown()
+    expected = make_generator()
+    expected.pipeline.set_enabled("forest", "forest_cover", False)
+    assert_same_zone(zone, expected.generate_zone(*EAST, "forest"))
+
+
+def test_unpicklable_pass_falls_back_to_generating_on_demand():
+    generator = make_generator()
+    generator.pipeline.replace("forest", "forest_cover", lambda zone, zone_x, zone_y: None)
+    prefetcher = prefetch_east(generator)
+    assert not prefetcher.enabled and not prefetcher.pending
+    assert prefetcher.take(*EAST) is None
+    zone = generator.generate_zone(*EAST, "forest")
+    assert zone.tier > TIER_TERRAIN
@@ -0,0 +1,77 @@
+import numpy as np
+from src.map.map_generator import MapGenerator
+from src.map.tile_store import TILE_LAYERS
+from src.map.zone import Zone, TIER_TERRAIN, TIER_FULL
+from src.map.zone_streamer import ZoneStreamer
+
+EAST = (1, 0)
+
+
+def make_generator():
+    generator = MapGenerator(10, 10)
+    generator.seed = 4321
+    generator.streamer = ZoneStreamer(generator, generator.zone_type_at)
+    return generator
+
+
+def walk_to(generator, player_x, player_y):
+    # The player in zone (0, 0), heading for its east edge
+    generator.streamer.update(0, 0, Zone(64, 64, "forest"), player_x, player_y)
+
+
+def summary(zone):
+    return ([(type(e).__name__, e.x, e.y, e.spawn_id) for e in zone.entities],
+            [(a["x"], a["y"], a["type"]) for a in zone.anomalies])
+
+
+def assert_same_zone(a, b):
+    for layer in TILE_LAYERS:
+        assert np.array_equal(getattr(a.store, layer), getattr(b.store, layer)), layer
+    assert summary(a) == summary(b)
+
+
+def test_streamed_zone_matches_a_direct_build():
+    generator = make_generator()
+    walk_to(generator, 55, 30)  # Terrain only
+    generator.streamer.run(10 ** 6)
+    assert generator.partial_zones[EAST].tier == TIER_TERRAIN
+
+    walk_to(generator, 62, 30)  # Completion, carrying on from the terrain
+    generator.streamer.run(10 ** 6)
+    assert generator.partial_zones[EAST].tier == TIER_FULL
+    zone = generator.generate_zone(*EAST, "forest")
+    assert EAST not in generator.partial_zones
+    assert_same_zone(zone, make_generator().build_zone(*EAST, "forest"))
+
+
+def test_dropped_completion_leaves_the_cached_tier_untouched():
+    generator = make_generator()
+    terrain = generator.materialize(*EAST, "forest", TIER_TERRAIN)
+    walk_to(generator, 62, 30)
+    steps = generator.streamer.jobs[EAST]
+    # Run the completion until enemies are spawned but hazards are not
+    while next(steps) < 0.5:
+        pass
+    walk_to(generator, 30, 30)  # Turn away
+    assert not generator.streamer.jobs
+    assert generator.partial_zones[EAST] is terrain
+    assert terrain.tier == TIER_TERRAIN and not terrain.entities
+
+    zone = generator.generate_zone(*EAST, "forest")
+    expected = make_generator().build_zone(*EAST, "forest")
+    assert expected.entities
+    assert len(zone.entities) == len(expected.entities)
+    assert len({e.spawn_id for e in zone.entities}) == len(zone.entities)
+    assert_same_zone(zone, expected)
+
+
+def test_finish_registers_the_zone_and_drops_its_cached_tier():
+    generator = make_generator()
+    generator.materialize(*EAST, "forest", TIER_TERRAIN)
+    walk_to(generator, 62, 30)
+    next(generator.streamer.jobs[EAST])
+    zone = generator.generate_zone(*EAST, "forest")  # Finishes the job
+    assert not generator.streamer.jobs
+    assert EAST not in generator.partial_zones
+    assert generator.zones[EAST] is zone
+    assert_same_zone(zone, make_generator().build_zone(*EAST, "forest"))